@@ -7,9 +7,12 @@ Features NoASS mode for roleplay optimization and Gemini image generation.
 from .nodes import (
     SimpleChatConfig,
     SimpleChatText,
+    SimpleChatTextBatch,
     SimpleChatImage,
+    SimpleChatImageBatch,
     SimpleChatNoASS,
     GeminiImageGen,
+    GeminiImageGenSave,
     GeminiImageEdit,
     SimpleChatMustacheVar,
     SimpleChatMustacheRender,
@@ -35,9 +38,12 @@ setup_routes()
 NODE_CLASS_MAPPINGS = {
     "SimpleChatConfig": SimpleChatConfig,
     "SimpleChatText": SimpleChatText,
+    "SimpleChatTextBatch": SimpleChatTextBatch,
     "SimpleChatImage": SimpleChatImage,
+    "SimpleChatImageBatch": SimpleChatImageBatch,
     "SimpleChatNoASS": SimpleChatNoASS,
     "GeminiImageGen": GeminiImageGen,
+    "GeminiImageGenSave": GeminiImageGenSave,
     "GeminiImageEdit": GeminiImageEdit,
     "SimpleChatMustacheVar": SimpleChatMustacheVar,
     "SimpleChatMustacheRender": SimpleChatMustacheRender,
@@ -59,9 +65,12 @@ NODE_CLASS_MAPPINGS = {
 NODE_DISPLAY_NAME_MAPPINGS = {
     "SimpleChatConfig": "API Config",
     "SimpleChatText": "Chat",
+    "SimpleChatTextBatch": "Chat (Batch)",
     "SimpleChatImage": "Chat with Image",
+    "SimpleChatImageBatch": "Chat with Image (Batch)",
     "SimpleChatNoASS": "Chat NoASS",
     "GeminiImageGen": "Gemini Image Gen",
+    "GeminiImageGenSave": "Gemini Image Gen (Save)",
     "GeminiImageEdit": "Gemini Image Edit",
     "SimpleChatMustacheVar": "Mustache Var",
     "SimpleChatMustacheRender": "Mustache Render",
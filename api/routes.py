@@ -1,10 +1,19 @@
 """
 API routes for fetching model lists from various providers.
 """
+import asyncio
 import json
-import aiohttp
 from aiohttp import web
 
+from ..core.session import get_session, close_all_sessions
+from ..core.cache import get_response_cache
+from ..core.image_utils import get_encoded_image_cache
+from ..core.singleflight import get_single_flight
+from ..core.ratelimit import get_rate_limiter
+from ..core.breaker import breaker_stats, reset_breakers
+from ..core.pool import pool_stats
+from ..core.hedge import hedge_stats
+
 try:
     from server import PromptServer
     HAS_SERVER = True
@@ -49,13 +58,14 @@ async def fetch_openai_models(api_key: str, base_url: str) -> list[str]:
     headers = {"Authorization": f"Bearer {api_key}"}
 
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, headers=headers, timeout=10) as resp:
-                if resp.status == 200:
-                    data = await resp.json()
-                    models = [m["id"] for m in data.get("data", [])]
-                    # Return all models, sorted alphabetically
-                    return sorted(models) if models else PREDEFINED_MODELS["openai"]
+        await get_rate_limiter("openai", base_url, api_key).acquire()
+        session = await get_session("openai", base_url)
+        async with session.get(url, headers=headers, timeout=10) as resp:
+            if resp.status == 200:
+                data = await resp.json()
+                models = [m["id"] for m in data.get("data", [])]
+                # Return all models, sorted alphabetically
+                return sorted(models) if models else PREDEFINED_MODELS["openai"]
     except Exception as e:
         print(f"[SimpleChat] Failed to fetch OpenAI models: {e}")
 
@@ -77,29 +87,30 @@ async def fetch_claude_models(api_key: str, base_url: str) -> list[str]:
     }
 
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, headers=headers, timeout=10) as resp:
-                if resp.status == 200:
-                    data = await resp.json()
-                    # Anthropic format: {"data": [{"id": "...", ...}]} similar to OpenAI
-                    # Some proxies might return OpenAI format
-                    models = []
-
-                    # Handle both standard formats just in case
-                    items = data.get("data", []) if "data" in data else data.get("models", [])
-
-                    if isinstance(items, list):
-                        for m in items:
-                            if isinstance(m, dict):
-                                models.append(m.get("id", m.get("name", "")))
-                            elif isinstance(m, str):
-                                models.append(m)
-
-                    # Filter out empty strings
-                    models = [m for m in models if m]
-
-                    if models:
-                        return sorted(models)
+        await get_rate_limiter("claude", base_url, api_key).acquire()
+        session = await get_session("claude", base_url)
+        async with session.get(url, headers=headers, timeout=10) as resp:
+            if resp.status == 200:
+                data = await resp.json()
+                # Anthropic format: {"data": [{"id": "...", ...}]} similar to OpenAI
+                # Some proxies might return OpenAI format
+                models = []
+
+                # Handle both standard formats just in case
+                items = data.get("data", []) if "data" in data else data.get("models", [])
+
+                if isinstance(items, list):
+                    for m in items:
+                        if isinstance(m, dict):
+                            models.append(m.get("id", m.get("name", "")))
+                        elif isinstance(m, str):
+                            models.append(m)
+
+                # Filter out empty strings
+                models = [m for m in models if m]
+
+                if models:
+                    return sorted(models)
     except Exception as e:
         # Silently fail for Claude since it's common for this endpoint to not exist/fail
         pass
@@ -112,20 +123,21 @@ async def fetch_gemini_models(api_key: str, base_url: str) -> list[str]:
     url = f"{base_url.rstrip('/')}/models?key={api_key}"
 
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, timeout=10) as resp:
-                if resp.status == 200:
-                    data = await resp.json()
-                    models = []
-                    for m in data.get("models", []):
-                        name = m.get("name", "")
-                        # Extract model name from full path (models/gemini-xxx)
-                        if name.startswith("models/"):
-                            name = name[7:]
-                        if name:
-                            models.append(name)
-                    # Return all models
-                    return sorted(models) if models else PREDEFINED_MODELS["gemini"]
+        await get_rate_limiter("gemini", base_url, api_key).acquire()
+        session = await get_session("gemini", base_url)
+        async with session.get(url, timeout=10) as resp:
+            if resp.status == 200:
+                data = await resp.json()
+                models = []
+                for m in data.get("models", []):
+                    name = m.get("name", "")
+                    # Extract model name from full path (models/gemini-xxx)
+                    if name.startswith("models/"):
+                        name = name[7:]
+                    if name:
+                        models.append(name)
+                # Return all models
+                return sorted(models) if models else PREDEFINED_MODELS["gemini"]
     except Exception as e:
         print(f"[SimpleChat] Failed to fetch Gemini models: {e}")
 
@@ -145,6 +157,13 @@ def setup_routes():
     if not HAS_SERVER:
         return
 
+    # Close pooled HTTP sessions (server loop) when the server shuts down
+    try:
+        PromptServer.instance.app.on_cleanup.append(close_all_sessions)
+    except RuntimeError:
+        # App signals are frozen once the server has started
+        pass
+
     @PromptServer.instance.routes.get("/simplechat/models/{provider}")
     async def get_models(request):
         """
@@ -198,4 +217,47 @@ def setup_routes():
         """Get all predefined models organized by provider."""
         return web.json_response(PREDEFINED_MODELS)
 
+    @PromptServer.instance.routes.get("/simplechat/cache")
+    async def get_cache_stats(request):
+        """
+        Get response cache statistics (hits, misses, entries, disk usage)
+        plus in-flight coalescing counters (requests deduplicated) and the
+        encoded image cache.
+        """
+        # Walking the disk cache is blocking I/O; keep it off the server loop
+        stats = await asyncio.to_thread(get_response_cache().stats)
+        stats["singleflight"] = get_single_flight().stats()
+        stats["encoded_images"] = get_encoded_image_cache().stats()
+        return web.json_response(stats)
+
+    @PromptServer.instance.routes.post("/simplechat/cache/purge")
+    async def purge_cache(request):
+        """Remove every cached chat response (memory and disk)."""
+        removed = await asyncio.to_thread(get_response_cache().purge)
+        get_encoded_image_cache().clear()
+        return web.json_response({"purged": removed})
+
+    @PromptServer.instance.routes.get("/simplechat/breakers")
+    async def get_breaker_status(request):
+        """
+        Get the circuit breaker of every endpoint used so far: state
+        (closed / open / half_open), rolling-window error rate, time until
+        the next probe and failure / rejection counters.
+        """
+        return web.json_response({"endpoints": breaker_stats()})
+
+    @PromptServer.instance.routes.get("/simplechat/pool")
+    async def get_pool_status(request):
+        """
+        Get load statistics of every endpoint / key pool member: requests in
+        flight, EWMA latency and request count (keys shown as a short hash),
+        plus hedged-request latency percentiles and counters.
+        """
+        return web.json_response({"members": pool_stats(), "hedging": hedge_stats()})
+
+    @PromptServer.instance.routes.post("/simplechat/breakers/reset")
+    async def reset_breaker_status(request):
+        """Close every circuit breaker (e.g. after fixing a proxy)."""
+        return web.json_response({"reset": reset_breakers()})
+
     print("[SimpleChat] API routes registered")
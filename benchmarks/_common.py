@@ -0,0 +1,102 @@
+"""
+Shared helpers for the benchmark scripts.
+
+The repo is a ComfyUI custom node package (relative imports throughout), so
+it is loaded here as a package named `simplechat` regardless of the folder
+name it was cloned into.
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from typing import Any, Callable
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE_NAME = "simplechat"
+
+
+def load_package():
+    """Import the repo as the `simplechat` package (idempotent)."""
+    if PACKAGE_NAME in sys.modules:
+        return sys.modules[PACKAGE_NAME]
+    spec = importlib.util.spec_from_file_location(
+        PACKAGE_NAME,
+        os.path.join(REPO_ROOT, "__init__.py"),
+        submodule_search_locations=[REPO_ROOT],
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[PACKAGE_NAME] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def measure(fn: Callable[[], Any], repeat: int = 5, warmup: int = 1) -> dict[str, float]:
+    """Time `fn` and return summary statistics in milliseconds."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000.0)
+    return {
+        "mean_ms": statistics.fmean(samples),
+        "median_ms": statistics.median(samples),
+        "min_ms": min(samples),
+        "max_ms": max(samples),
+        "repeat": repeat,
+    }
+
+
+def percentiles(samples: list[float], prefix: str = "") -> dict[str, float]:
+    """p50 / p95 / p99 / mean / max of `samples` (keys prefixed with `prefix`)."""
+    if not samples:
+        return {}
+    if len(samples) == 1:
+        q = [samples[0]] * 99
+    else:
+        q = statistics.quantiles(samples, n=100, method="inclusive")
+    return {
+        f"{prefix}p50": q[49],
+        f"{prefix}p95": q[94],
+        f"{prefix}p99": q[98],
+        f"{prefix}mean": statistics.fmean(samples),
+        f"{prefix}max": max(samples),
+    }
+
+
+def base_parser(description: str) -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per case")
+    parser.add_argument("--output", default="", help="Write JSON results to this file (default: stdout)")
+    return parser
+
+
+def environment() -> dict[str, Any]:
+    import torch
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "torch": torch.__version__,
+        "cuda": torch.cuda.is_available(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def emit(name: str, results: list[dict[str, Any]], output: str = "") -> None:
+    """Write benchmark results as one JSON document."""
+    doc = {"benchmark": name, "environment": environment(), "results": results}
+    text = json.dumps(doc, indent=2)
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
@@ -0,0 +1,185 @@
+"""
+Micro-benchmark: the pure hot functions, on fixed synthetic inputs.
+
+Covers template rendering, the JSON extraction helpers of the prompt nodes,
+JSON path lookup, vars flattening, NoASS message building on a 1 MB history,
+base64 image conversion and the grid / XY plot nodes. Inputs are generated
+deterministically, so results from different versions are comparable
+(see benchmarks/compare.py).
+
+    python benchmarks/bench_hot_paths.py [--repeat 5] [--filter json] [--output out.json]
+"""
+
+from __future__ import annotations
+
+import importlib
+import json
+import random
+from typing import Any, Callable
+
+import torch
+
+from _common import base_parser, emit, load_package, measure
+
+SEED = 1234
+
+
+def _module(name: str):
+    return importlib.import_module(f"simplechat.{name}")
+
+
+# --- Synthetic inputs ---
+
+def make_template(rng: random.Random, n_vars: int = 200, size: int = 50_000) -> tuple[str, dict[str, str]]:
+    variables = {f"var_{i}": f"value {i} " * rng.randint(1, 5) for i in range(n_vars)}
+    parts, total = [], 0
+    while total < size:
+        if rng.random() < 0.1:
+            piece = "{{var_%d}} " % rng.randrange(n_vars + 20)  # some unknown placeholders
+        else:
+            piece = "lorem ipsum dolor sit amet "
+        parts.append(piece)
+        total += len(piece)
+    return "".join(parts), variables
+
+
+def make_prompt_json(rng: random.Random, n_items: int = 300) -> dict[str, Any]:
+    return {
+        "prompt": "masterpiece, best quality, " * 10,
+        "negative": "lowres, bad anatomy",
+        "items": [
+            {"id": i, "tags": [f"tag_{rng.randrange(1000)}" for _ in range(8)], "weight": rng.random()}
+            for i in range(n_items)
+        ],
+    }
+
+
+def make_llm_reply(obj: dict[str, Any], trailing_commas: bool = False) -> str:
+    """Prose + fenced JSON, the way chat models usually answer."""
+    body = json.dumps(obj, ensure_ascii=False, indent=2)
+    if trailing_commas:
+        body = body.replace("\n  ]", ",\n  ]")
+    prose = "Sure! Here is the JSON you asked for, with every field filled in. " * 40
+    return f"{prose}\n\n```json\n{body}\n```\n\nLet me know if you need anything else."
+
+
+def make_nested(rng: random.Random, depth: int = 5, width: int = 6) -> dict[str, Any]:
+    if depth == 0:
+        return {f"leaf_{i}": rng.choice([i, f"text {i}", True, None, [1, 2, 3]]) for i in range(width)}
+    return {f"k{depth}_{i}": make_nested(rng, depth - 1, width) for i in range(width)}
+
+
+def make_history(size: int = 1 << 20) -> str:
+    turns, total, i = [], 0, 0
+    while total < size:
+        turn = (f"User: question number {i}, please continue the story.\n\n"
+                f"Assistant: chapter {i}. " + "The night was long and the road was longer. " * 20 + "\n\n")
+        turns.append(turn)
+        total += len(turn)
+        i += 1
+    return "".join(turns)
+
+
+def make_images(batch: int, size: int) -> torch.Tensor:
+    generator = torch.Generator().manual_seed(SEED)
+    ramp = torch.linspace(0, 1, size)
+    base = (ramp[None, :, None] + ramp[:, None, None]) / 2
+    noise = torch.rand((batch, size, size, 3), generator=generator) * 0.1
+    return (base[None] * 0.9 + noise).clamp(0, 1)
+
+
+# --- Cases ---
+
+def build_cases() -> list[tuple[str, Callable[[], Any], dict[str, Any]]]:
+    pkg = load_package()
+    rng = random.Random(SEED)
+    cases: list[tuple[str, Callable[[], Any], dict[str, Any]]] = []
+
+    render_mustache = _module("core.template").render_mustache
+    template, variables = make_template(rng)
+    cases.append(("render_mustache", lambda: render_mustache(template, variables), {"input_chars": len(template)}))
+
+    obj = make_prompt_json(rng)
+    clean = json.dumps(obj)
+    reply = make_llm_reply(obj)
+    sloppy = make_llm_reply(obj, trailing_commas=True)
+    for name in ("prompt_json_unpack", "anima_prompt_router", "anima_prompt_xy_matrix", "json_to_vars"):
+        parse = _module(f"nodes.{name}")._try_parse_json
+        cases.append((f"try_parse_json[{name}]/clean", lambda p=parse: p(clean), {"input_chars": len(clean)}))
+        fence = getattr(_module(f"nodes.{name}"), "_strip_code_fence", None)
+        if fence is not None:
+            cases.append((f"try_parse_json[{name}]/fenced_trailing_commas",
+                          lambda p=parse, f=fence: p(f(sloppy)), {"input_chars": len(sloppy)}))
+        else:
+            cases.append((f"try_parse_json[{name}]/fenced_trailing_commas",
+                          lambda p=parse: p(sloppy), {"input_chars": len(sloppy)}))
+
+    extract = _module("nodes.anima_prompt_xy_matrix")._extract_first_json_object
+    cases.append(("extract_first_json_object", lambda: extract(reply), {"input_chars": len(reply)}))
+
+    json_parse = _module("nodes.json_parse")
+    paths = ["items[0].tags[3]", "prompt", "items[150]['weight']", 'items[299]["tags"][7]', "a.b.c[2].d"] * 2000
+    parsed = obj
+
+    def _paths() -> None:
+        for path in paths:
+            try:
+                json_parse._get_by_tokens(parsed, json_parse._tokenize_path(path))
+            except Exception:
+                pass
+
+    cases.append(("tokenize_path+get_by_tokens", _paths, {"paths": len(paths)}))
+
+    flatten = _module("nodes.json_to_vars")._flatten
+    nested = make_nested(rng)
+    cases.append(("flatten", lambda: flatten("", nested, {}), {"leaves": 6 ** 6}))
+
+    noass = _module("core.noass")
+    history = make_history()
+    cases.append(("build_noass_messages/1MB", lambda: noass.build_noass_messages(
+        "You are a storyteller.", history, "What happens next?", "Chapter"), {"history_chars": len(history)}))
+    cases.append(("build_full_history/1MB", lambda: noass.build_full_history(
+        history, "What happens next?", "Chapter", " the end." * 100), {"history_chars": len(history)}))
+
+    iu = pkg.core.image_utils
+    image = make_images(1, 1024)
+    b64 = iu.tensor_to_base64(image)
+    cache = iu.get_encoded_image_cache()
+
+    def _encode_uncached() -> None:
+        cache.clear()
+        iu.tensor_to_base64(image)
+
+    cases.append(("tensor_to_base64/1024/uncached", _encode_uncached, {"pixels": 1024 * 1024}))
+    cases.append(("tensor_to_base64/1024/cached", lambda: iu.tensor_to_base64(image), {"pixels": 1024 * 1024}))
+    cases.append(("base64_to_tensor/1024", lambda: iu.base64_to_tensor(b64), {"input_chars": len(b64)}))
+
+    grid = _module("nodes.image_grid").SimpleChatImageGrid()
+    tiles = make_images(16, 512)
+    cases.append(("ImageGrid.grid/16x512", lambda: grid.grid(tiles, columns=4, padding=8), {"images": 16}))
+
+    plot = _module("nodes.image_xy_plot").SimpleChatXYPlot()
+    cells = make_images(25, 256)
+    labels_x = "\n".join(f"x = {i}" for i in range(5))
+    labels_y = "\n".join(f"y = {i}" for i in range(5))
+    cases.append(("XYPlot.plot/5x5x256", lambda: plot.plot(
+        [cells], columns=[5], x_labels=[labels_x], y_labels=[labels_y], title=["bench"]), {"images": 25}))
+
+    return cases
+
+
+def main() -> None:
+    parser = base_parser(__doc__.strip().splitlines()[0])
+    parser.add_argument("--filter", default="", help="Only run cases whose name contains this substring")
+    args = parser.parse_args()
+
+    results = []
+    for name, fn, info in build_cases():
+        if args.filter and args.filter not in name:
+            continue
+        results.append({"case": name, **info, **measure(fn, repeat=args.repeat)})
+    emit("hot_paths", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
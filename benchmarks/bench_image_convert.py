@@ -0,0 +1,67 @@
+"""
+Micro-benchmark: tensor <-> image conversion at 1K / 2K / 4K.
+
+Compares the previous numpy path (float copy on the host, scaled float
+array, uint8 array) with the `core.image_utils` fast path (uint8
+quantization on the tensor's device, single-pass decode into a float
+tensor, optionally preallocated).
+
+    python benchmarks/bench_image_convert.py [--repeat 5] [--output out.json]
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import torch
+from PIL import Image
+
+from _common import base_parser, emit, load_package, measure
+
+SIZES = {"1K": 1024, "2K": 2048, "4K": 4096}
+
+
+def legacy_to_pil(t: torch.Tensor) -> Image.Image:
+    arr = (t.cpu().numpy() * 255).astype(np.uint8)
+    return Image.fromarray(arr, mode="RGB")
+
+
+def legacy_to_tensor(image: Image.Image) -> torch.Tensor:
+    arr = np.array(image).astype(np.float32) / 255.0
+    return torch.from_numpy(arr).unsqueeze(0)
+
+
+def main() -> None:
+    parser = base_parser(__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="1K,2K,4K", help="Comma-separated subset of 1K,2K,4K")
+    args = parser.parse_args()
+
+    iu = load_package().core.image_utils
+    devices = ["cpu"] + (["cuda"] if torch.cuda.is_available() else [])
+
+    results = []
+    for label in [s.strip() for s in args.sizes.split(",") if s.strip()]:
+        side = SIZES[label]
+        for device in devices:
+            t = torch.rand(side, side, 3, device=device)
+            image = iu.tensor_to_pil(t)
+            out = iu.empty_image(side, side, 3)
+
+            cases = {
+                "to_pil/legacy": lambda: legacy_to_pil(t),
+                "to_pil/fast": lambda: iu.tensor_to_pil(t),
+                "to_tensor/legacy": lambda: legacy_to_tensor(image),
+                "to_tensor/fast": lambda: iu.pil_to_tensor(image),
+                "to_tensor/fast_prealloc": lambda: iu.pil_to_tensor(image, out=out),
+            }
+            for name, fn in cases.items():
+                if device == "cuda":
+                    def fn(fn=fn):
+                        fn()
+                        torch.cuda.synchronize()
+                results.append({"case": name, "size": label, "device": device, **measure(fn, args.repeat)})
+
+    emit("image_convert", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
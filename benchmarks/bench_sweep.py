@@ -0,0 +1,329 @@
+"""
+End-to-end XY sweep benchmark: the real node classes, no ComfyUI server.
+
+Pipeline per sweep size N (N x N cells):
+
+    Anima XY Matrix -> Prompt JSON Unpack -> Chat (mock API) -> synthetic images
+        -> XY Plot + XY Cell Prefix
+
+List outputs are fanned out the way ComfyUI does (one node call per list
+item; async chat calls run concurrently up to --concurrency). Reports wall
+time, per-stage time and peak RSS (sampled from /proc/self/statm while the
+stage runs) and live tensor memory. Each size runs in a
+fresh subprocess so its peak RSS is its own; the mock API runs in another.
+
+Prompt JSON Unpack builds a SAMPLER object via `comfy.samplers`. Pass
+--comfyui to use a ComfyUI checkout; without one, a placeholder sampler
+(the name string) is used, which doesn't affect the measured stages.
+
+    python benchmarks/bench_sweep.py [--sizes 5,20,50] [--cell-size 128] [--output out.json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import importlib
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any
+
+import torch
+
+from _common import emit, load_package
+from mock_server import add_mock_arguments, spawn_mock_server
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+BASE_PROMPT = {
+    "quality_meta_year_safe": "masterpiece, best quality, newest, safe",
+    "count": "1girl",
+    "character": "",
+    "series": "",
+    "artist": "",
+    "style": "watercolor",
+    "environment": "",
+    "tags": "looking at viewer, smile, upper body",
+    "neg": "lowres, bad anatomy",
+    "width": 1024,
+    "height": 1024,
+    "steps": 30,
+    "cfg": 4.5,
+    "sampler": "er_sde",
+    "seed": 1,
+}
+
+
+def _ensure_comfy_samplers(comfyui: str) -> None:
+    """Make `comfy.samplers` importable: from a ComfyUI checkout, else a placeholder."""
+    if comfyui:
+        sys.path.insert(0, os.path.abspath(comfyui))
+    try:
+        import comfy.samplers  # noqa: F401
+    except ImportError:
+        import types
+
+        comfy = types.ModuleType("comfy")
+        samplers = types.ModuleType("comfy.samplers")
+        samplers.sampler_object = lambda name: name
+        comfy.samplers = samplers
+        sys.modules.setdefault("comfy", comfy)
+        sys.modules["comfy.samplers"] = samplers
+
+
+def _node(module: str, cls: str):
+    return getattr(importlib.import_module(f"simplechat.nodes.{module}"), cls)()
+
+
+def peak_rss_bytes() -> int | None:
+    """Peak resident set size of this process so far."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def current_rss_bytes() -> int | None:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class RssSampler:
+    """Background sampler of the resident set size, for per-stage peaks."""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._peak: int | None = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def _sample(self) -> None:
+        rss = current_rss_bytes()
+        if rss is None:
+            return
+        with self._lock:
+            self._peak = rss if self._peak is None else max(self._peak, rss)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def reset(self) -> None:
+        """Start a new peak from the current RSS."""
+        with self._lock:
+            self._peak = None
+        self._sample()
+
+    def peak(self, rss: int | None = None) -> int | None:
+        """Highest RSS sampled since the last `reset`, including `rss` (None without /proc)."""
+        self._sample()
+        with self._lock:
+            if rss is not None:
+                self._peak = rss if self._peak is None else max(self._peak, rss)
+            return self._peak
+
+
+def live_tensor_bytes() -> int:
+    """Bytes held by live tensors (each storage counted once)."""
+    seen, total = set(), 0
+    for obj in gc.get_objects():
+        try:
+            if type(obj) is torch.Tensor or isinstance(obj, torch.nn.Parameter):
+                storage = obj.untyped_storage()
+                ptr = storage.data_ptr()
+                if ptr and ptr not in seen:
+                    seen.add(ptr)
+                    total += storage.nbytes()
+        except Exception:
+            continue
+    return total
+
+
+def synthetic_image(index: int, size: int) -> torch.Tensor:
+    """Stand-in for a sampler output: a seeded (1, size, size, 3) image."""
+    generator = torch.Generator().manual_seed(index)
+    return torch.rand((1, size, size, 3), generator=generator)
+
+
+async def run_sweep(n: int, args) -> dict[str, Any]:
+    _ensure_comfy_samplers(args.comfyui)
+    load_package()
+    core = importlib.import_module("simplechat.core")
+    config = core.ChatConfig(
+        provider=args.provider,
+        api_key="mock-key",
+        base_url=f"{args.url}/v1",
+        model="mock-small",
+        max_retries=0,
+        raw_response=args.raw_response,
+    )
+    stages: list[dict[str, Any]] = []
+    tensor_peak = 0
+    sampler = RssSampler()
+    sampler.start()
+
+    @contextmanager
+    def stage(name: str):
+        nonlocal tensor_peak
+        sampler.reset()
+        start = time.perf_counter()
+        yield
+        elapsed = time.perf_counter() - start
+        # Before counting tensors, which allocates; the peak includes this sample
+        rss = current_rss_bytes()
+        stage_peak = sampler.peak(rss)
+        tensors = live_tensor_bytes()
+        tensor_peak = max(tensor_peak, tensors)
+        stages.append({
+            "stage": name,
+            "time_s": elapsed,
+            "rss_bytes": rss,
+            # Highest RSS sampled while this stage ran
+            "peak_rss_bytes": stage_peak,
+            "live_tensor_bytes": tensors,
+        })
+
+    if torch.cuda.is_available():
+        torch.cuda.reset_peak_memory_stats()
+    wall_start = time.perf_counter()
+
+    with stage("xy_matrix"):
+        json_list, columns, x_labels, y_labels = _node(
+            "anima_prompt_xy_matrix", "SimpleChatAnimaPromptXYMatrix"
+        ).build(
+            json.dumps(BASE_PROMPT),
+            x_field="artist",
+            x_list="\n".join(f"@artist_{i}" for i in range(n)),
+            y_field="environment",
+            y_list="\n".join(f"scene {i}, detailed background" for i in range(n)),
+        )
+
+    with stage("json_unpack"):
+        unpack = _node("prompt_json_unpack", "SimpleChatPromptJsonUnpack")
+        unpacked = [unpack.unpack(text) for text in json_list]
+
+    with stage("chat"):
+        chat = _node("chat", "SimpleChatText")
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def _one(item) -> str:
+            async with semaphore:
+                (text,) = await chat.chat(
+                    config,
+                    prompt="Write a one-line caption for: {{positive}}",
+                    vars=item[9],
+                    stream=args.stream,
+                    use_cache=False,
+                )
+                return text
+
+        captions = await asyncio.gather(*[_one(item) for item in unpacked])
+
+    with stage("images"):
+        images = [synthetic_image(i, args.cell_size) for i in range(len(captions))]
+
+    with stage("xy_plot"):
+        (plot,) = _node("image_xy_plot", "SimpleChatXYPlot").plot(
+            images, columns=[columns], x_labels=[x_labels], y_labels=[y_labels], title=[f"{n}x{n} sweep"]
+        )
+
+    with stage("cell_prefix"):
+        (prefixes,) = _node("xy_cell_prefix", "SimpleChatXYCellPrefix").build([x_labels], [y_labels])
+
+    wall = time.perf_counter() - wall_start
+    sampler.stop()
+    sampled = [s["peak_rss_bytes"] for s in stages if s["peak_rss_bytes"] is not None]
+    peaks = [p for p in (peak_rss_bytes(), *sampled) if p is not None]
+    return {
+        "case": f"{n}x{n}",
+        "cells": len(json_list),
+        "cell_size": args.cell_size,
+        "wall_s": wall,
+        "stages": stages,
+        # Process-lifetime peak (at least every stage's sampled peak)
+        "peak_rss_bytes": max(peaks) if peaks else None,
+        "tensor_peak_bytes": tensor_peak,
+        "cuda_peak_bytes": torch.cuda.max_memory_allocated() if torch.cuda.is_available() else None,
+        "plot_shape": list(plot.shape),
+        "plot_bytes": plot.element_size() * plot.nelement(),
+        "prefixes": len(prefixes),
+    }
+
+
+def _child_argv(args, n: int, url: str) -> list[str]:
+    return [
+        sys.executable, os.path.abspath(__file__), "--child", "--sizes", str(n), "--url", url,
+        "--cell-size", str(args.cell_size), "--concurrency", str(args.concurrency),
+        "--provider", args.provider, "--raw-response", args.raw_response, "--comfyui", args.comfyui,
+        *(["--stream"] if args.stream else []),
+    ]
+
+
+async def run_all(args) -> list[dict[str, Any]]:
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    proc = None
+    url = args.url.rstrip("/")
+    try:
+        if not url:
+            proc, url = await spawn_mock_server(args)
+        results = []
+        for n in sizes:
+            out = subprocess.run(_child_argv(args, n, url), capture_output=True, text=True)
+            if out.returncode != 0:
+                raise RuntimeError(f"Sweep {n}x{n} failed:\n{out.stderr}")
+            result = json.loads(out.stdout.strip().splitlines()[-1])
+            peak = result["peak_rss_bytes"] or 0
+            print(f"[SimpleChat] {n}x{n}: {result['wall_s']:.2f}s, peak RSS {peak / 2**20:.0f} MB", file=sys.stderr)
+            results.append(result)
+        return results
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="5,20,50", help="Comma-separated sweep sizes (N for N x N)")
+    parser.add_argument("--cell-size", type=int, default=128, help="Synthetic image size per cell (px)")
+    parser.add_argument("--concurrency", type=int, default=16, help="Chat requests in flight")
+    parser.add_argument("--provider", default="openai", choices=["openai", "claude"])
+    parser.add_argument("--stream", action="store_true", help="Use streaming chat requests")
+    parser.add_argument("--raw-response", default="trim", help="ChatConfig.raw_response mode")
+    parser.add_argument("--url", default="", help="Existing mock server root URL (default: start one)")
+    parser.add_argument("--comfyui", default="", help="ComfyUI checkout to import comfy.samplers from")
+    parser.add_argument("--output", default="", help="Write JSON results to this file (default: stdout)")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    add_mock_arguments(parser)
+    args = parser.parse_args()
+
+    if args.child:
+        result = asyncio.run(run_sweep(int(args.sizes), args))
+        print(json.dumps(result))
+        return
+
+    emit("sweep", asyncio.run(run_all(args)), args.output)
+
+
+if __name__ == "__main__":
+    main()
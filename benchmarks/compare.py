@@ -0,0 +1,68 @@
+"""
+Compare two benchmark JSON outputs (e.g. before / after a change).
+
+Results are matched by their string fields (case, size, device, provider...)
+and the chosen metric is compared.
+
+    python benchmarks/compare.py base.json new.json [--metric median_ms] [--threshold 1.1] [--output diff.json]
+
+Exits with status 1 when any case got slower than `--threshold` (ratio),
+so it can gate CI.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from typing import Any
+
+
+def _key(result: dict[str, Any]) -> str:
+    # "case" first, then the other identifying string fields (size, device, provider...)
+    items = sorted(result.items(), key=lambda kv: kv[0] != "case")
+    return " ".join(v if k == "case" else f"{k}={v}" for k, v in items if isinstance(v, str))
+
+
+def compare(base: dict[str, Any], new: dict[str, Any], metric: str = "median_ms") -> list[dict[str, Any]]:
+    base_results = {_key(r): r for r in base.get("results", [])}
+    rows = []
+    for result in new.get("results", []):
+        key = _key(result)
+        old = base_results.get(key)
+        if old is None or metric not in old or metric not in result:
+            continue
+        ratio = result[metric] / old[metric] if old[metric] else float("inf")
+        rows.append({"case": key, "base": old[metric], "new": result[metric], "ratio": ratio})
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("base")
+    parser.add_argument("new")
+    parser.add_argument("--metric", default="median_ms")
+    parser.add_argument("--threshold", type=float, default=0.0,
+                        help="Fail if any ratio exceeds this (0 = report only)")
+    parser.add_argument("--output", default="", help="Write the comparison as JSON")
+    args = parser.parse_args()
+
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.new, encoding="utf-8") as f:
+        new = json.load(f)
+
+    rows = compare(base, new, args.metric)
+    width = max((len(r["case"]) for r in rows), default=4)
+    for r in rows:
+        print(f"{r['case']:<{width}}  {r['base']:>12.3f}  {r['new']:>12.3f}  {r['ratio']:>6.2f}x")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"metric": args.metric, "rows": rows}, f, indent=2)
+
+    if args.threshold and any(r["ratio"] > args.threshold for r in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
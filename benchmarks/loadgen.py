@@ -0,0 +1,178 @@
+"""
+Load generator: drive the real provider classes against a (mock) API.
+
+Sends `--requests` calls per concurrency level through `get_provider()` and
+reports throughput, latency percentiles (and time to first token when
+streaming), error counts and the bytes the server received / sent.
+
+By default a mock server (benchmarks/mock_server.py) is started in a
+subprocess, so it doesn't share the client's event loop; mock options
+(--latency, --tokens-per-sec, --error-rate, ...) are passed through. Use
+--url to target an already running server instead.
+
+    python benchmarks/loadgen.py --provider openai --mode stream --concurrency 1,16,64 --requests 500
+    python benchmarks/loadgen.py --provider gemini --mode image --image-size 2048 --concurrency 8
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+import time
+from typing import Any
+
+import aiohttp
+
+from _common import emit, load_package, percentiles
+from mock_server import add_mock_arguments, mock_config_from_args, spawn_mock_server, start_mock_server
+
+# Path prefix matching each provider's default base URL layout
+BASE_PATHS = {"openai": "/v1", "claude": "/v1", "gemini": "/v1beta"}
+
+
+async def _server_stats(url: str) -> dict[str, Any] | None:
+    try:
+        async with aiohttp.ClientSession() as session:
+            async with session.get(f"{url}/mock/stats") as resp:
+                return await resp.json() if resp.status == 200 else None
+    except aiohttp.ClientError:
+        return None
+
+
+async def run_level(pkg, args, base_url: str, concurrency: int, image) -> dict[str, Any]:
+    """Run `args.requests` calls with at most `concurrency` in flight."""
+    core = pkg.core
+    config = core.ChatConfig(
+        provider=args.provider,
+        api_key=args.api_key,
+        base_url=base_url + BASE_PATHS[args.provider],
+        model=args.model,
+        max_retries=args.retries,
+        raw_response="drop",
+    )
+    provider = core.get_provider(config)
+    messages = [{"role": "user", "content": args.prompt}]
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    first_token: list[float] = []
+    errors: dict[str, int] = {}
+
+    async def _one() -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                if args.mode == "image":
+                    await provider.generate_image(prompt=args.prompt, model=args.model, reference_image=image)
+                elif args.mode == "stream":
+                    first = None
+                    async for delta in provider.chat_stream(messages=messages, model=args.model,
+                                                            images=[image] if image is not None else None):
+                        if first is None and delta:
+                            first = time.perf_counter() - start
+                    if first is not None:
+                        first_token.append(first * 1000.0)
+                else:
+                    await provider.chat(messages=messages, model=args.model,
+                                        images=[image] if image is not None else None)
+            except Exception as e:
+                key = f"{type(e).__name__} {getattr(e, 'status', '')}".strip()
+                errors[key] = errors.get(key, 0) + 1
+                return
+            latencies.append((time.perf_counter() - start) * 1000.0)
+
+    before = await _server_stats(base_url)
+    start = time.perf_counter()
+    await asyncio.gather(*[_one() for _ in range(args.requests)])
+    wall = time.perf_counter() - start
+    after = await _server_stats(base_url)
+
+    result: dict[str, Any] = {
+        "case": f"c{concurrency}",
+        "provider": args.provider,
+        "mode": args.mode,
+        "concurrency": concurrency,
+        "requests": args.requests,
+        "ok": len(latencies),
+        "errors": errors,
+        "wall_s": wall,
+        "throughput_rps": len(latencies) / wall if wall else 0.0,
+        **percentiles(latencies, "latency_ms_"),
+        **percentiles(first_token, "first_token_ms_"),
+    }
+    if before is not None and after is not None:
+        result.update({
+            "server_requests": after["requests"] - before["requests"],
+            "bytes_sent": after["bytes_in"] - before["bytes_in"],
+            "bytes_received": after["bytes_out"] - before["bytes_out"],
+        })
+        result["mb_per_s"] = (result["bytes_sent"] + result["bytes_received"]) / wall / 1e6 if wall else 0.0
+    return result
+
+
+async def run(args) -> list[dict[str, Any]]:
+    pkg = load_package()
+    image = None
+    if args.attach_image:
+        import torch
+
+        generator = torch.Generator().manual_seed(0)
+        image = torch.rand((1, args.attach_image, args.attach_image, 3), generator=generator)
+
+    runner = proc = None
+    base_url = args.url.rstrip("/")
+    try:
+        if not base_url and args.in_process:
+            runner, base_url = await start_mock_server(mock_config_from_args(args))
+        elif not base_url:
+            proc, base_url = await spawn_mock_server(args)
+
+        levels = [int(c) for c in str(args.concurrency).split(",") if c.strip()]
+        results = []
+        for concurrency in levels:
+            result = await run_level(pkg, args, base_url, concurrency, image)
+            print(
+                f"[SimpleChat] c={concurrency}: {result['throughput_rps']:.1f} req/s, "
+                f"p50 {result.get('latency_ms_p50', 0):.0f} ms, p99 {result.get('latency_ms_p99', 0):.0f} ms, "
+                f"errors {sum(result['errors'].values())}",
+                file=sys.stderr,
+            )
+            results.append(result)
+        return results
+    finally:
+        if runner is not None:
+            await runner.cleanup()
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--provider", default="openai", choices=sorted(BASE_PATHS))
+    parser.add_argument("--mode", default="chat", choices=["chat", "stream", "image"],
+                        help="image = Gemini generate_image")
+    parser.add_argument("--concurrency", default="1,8,32", help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per concurrency level")
+    parser.add_argument("--model", default="mock-small")
+    parser.add_argument("--prompt", default="Say something.")
+    parser.add_argument("--attach-image", type=int, default=0,
+                        help="Attach a random NxN image to every request (0 = none)")
+    parser.add_argument("--retries", type=int, default=0, help="Provider max_retries")
+    parser.add_argument("--url", default="", help="Existing server root URL (skips starting the mock)")
+    parser.add_argument("--api-key", default="mock-key")
+    parser.add_argument("--in-process", action="store_true", help="Run the mock server on the client's loop")
+    parser.add_argument("--output", default="", help="Write JSON results to this file (default: stdout)")
+    add_mock_arguments(parser)
+    args = parser.parse_args()
+
+    if args.mode == "image" and args.provider != "gemini":
+        parser.error("--mode image requires --provider gemini")
+
+    results = asyncio.run(run(args))
+    emit("loadgen", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,386 @@
+"""
+Mock LLM API server: OpenAI, Claude and Gemini response shapes, no real model.
+
+Implements the endpoints the providers call, under any base path:
+
+- POST .../chat/completions              OpenAI (JSON or `stream: true` SSE)
+- POST .../messages                      Claude (JSON or `stream: true` SSE)
+- POST .../models/<m>:generateContent    Gemini (inline PNG when IMAGE is requested)
+- POST .../models/<m>:streamGenerateContent?alt=sse
+- GET  .../models                        model list (OpenAI / Claude / Gemini keys)
+- GET  /mock/stats                       request, status and byte counters
+
+Latency, token rate, error / 429 injection and the generated image size are
+configurable, so the real provider classes can be load tested locally.
+
+    python benchmarks/mock_server.py --port 8765 --latency 0.2 --tokens-per-sec 100
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from io import BytesIO
+
+import aiohttp
+from aiohttp import web
+
+
+@dataclass
+class MockConfig:
+    latency: float = 0.05  # seconds before the first byte
+    jitter: float = 0.0  # +/- uniform jitter added to latency
+    tokens_per_sec: float = 0.0  # output pacing (0 = instant)
+    output_tokens: int = 64
+    error_rate: float = 0.0  # fraction of requests answered with 500
+    rate_limit_rate: float = 0.0  # fraction answered with 429 + Retry-After
+    retry_after: float = 0.1
+    image_size: int = 1024  # Gemini image responses (0 = text only)
+    image_format: str = "png"
+    models: list[str] = field(default_factory=lambda: ["mock-small", "mock-large"])
+    seed: int | None = None
+
+
+class MockStats:
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.requests = 0
+        self.status: dict[int, int] = {}
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.started = time.time()
+
+    def record(self, status: int, bytes_in: int, bytes_out: int) -> None:
+        self.requests += 1
+        self.status[status] = self.status.get(status, 0) + 1
+        self.bytes_in += bytes_in
+        self.bytes_out += bytes_out
+
+    def to_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "status": {str(k): v for k, v in sorted(self.status.items())},
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "uptime_s": time.time() - self.started,
+        }
+
+
+def _make_image(size: int, fmt: str) -> bytes:
+    """A noisy gradient: compresses like a real picture, not like a flat fill."""
+    import numpy as np
+    from PIL import Image
+
+    rng = np.random.default_rng(0)
+    ramp = np.linspace(0, 255, size, dtype=np.float32)
+    base = (ramp[None, :, None] + ramp[:, None, None] * np.array([0.3, 0.6, 0.9], dtype=np.float32)) / 2
+    noise = rng.normal(0, 12, (size, size, 3)).astype(np.float32)
+    arr = np.clip(base + noise, 0, 255).astype(np.uint8)
+    buf = BytesIO()
+    Image.fromarray(arr).save(buf, fmt.upper(), **({"quality": 90} if fmt.lower() in ("jpeg", "jpg") else {}))
+    return buf.getvalue()
+
+
+class MockServer:
+    """aiohttp application serving the mock endpoints."""
+
+    def __init__(self, config: MockConfig | None = None):
+        self.config = config or MockConfig()
+        self.stats = MockStats()
+        self._rng = random.Random(self.config.seed)
+        self._image_b64: str | None = None
+        self.app = web.Application(client_max_size=1024 ** 3)
+        self.app.router.add_get("/mock/stats", self._stats)
+        self.app.router.add_post("/mock/stats/reset", self._reset)
+        self.app.router.add_route("*", "/{tail:.*}", self._dispatch)
+
+    # --- helpers ---
+
+    def _words(self) -> list[str]:
+        vocab = ["lorem", "ipsum", "dolor", "sit", "amet", "consectetur", "adipiscing", "elit"]
+        return [vocab[i % len(vocab)] + " " for i in range(self.config.output_tokens)]
+
+    def _image_data(self) -> str:
+        if self._image_b64 is None:
+            data = _make_image(self.config.image_size, self.config.image_format)
+            self._image_b64 = base64.b64encode(data).decode("ascii")
+        return self._image_b64
+
+    async def _first_byte_delay(self) -> None:
+        delay = self.config.latency
+        if self.config.jitter:
+            delay += self._rng.uniform(-self.config.jitter, self.config.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def _token_delay(self, tokens: int) -> None:
+        if self.config.tokens_per_sec > 0 and tokens:
+            await asyncio.sleep(tokens / self.config.tokens_per_sec)
+
+    def _injected_error(self) -> web.Response | None:
+        roll = self._rng.random()
+        if roll < self.config.rate_limit_rate:
+            return web.json_response(
+                {"error": {"type": "rate_limit_error", "message": "mock rate limit"}},
+                status=429,
+                headers={"Retry-After": f"{self.config.retry_after:g}"},
+            )
+        if roll < self.config.rate_limit_rate + self.config.error_rate:
+            return web.json_response({"error": {"type": "api_error", "message": "mock failure"}}, status=500)
+        return None
+
+    def _json(self, body: dict) -> web.Response:
+        return web.Response(body=json.dumps(body).encode("utf-8"), content_type="application/json")
+
+    # --- routes ---
+
+    async def _stats(self, request: web.Request) -> web.Response:
+        return web.json_response({**self.stats.to_dict(), "config": asdict(self.config)})
+
+    async def _reset(self, request: web.Request) -> web.Response:
+        self.stats.reset()
+        return web.json_response({"ok": True})
+
+    async def _dispatch(self, request: web.Request) -> web.StreamResponse:
+        body = await request.read()
+        path = request.path.rstrip("/")
+        if request.method == "GET" and path.endswith("/models"):
+            resp = self._models()
+        elif request.method != "POST":
+            resp = web.json_response({"error": {"message": "not found"}}, status=404)
+        else:
+            payload = json.loads(body or b"{}")
+            resp = self._injected_error()
+            if resp is None:
+                if path.endswith("/chat/completions"):
+                    resp = await self._openai(request, payload)
+                elif path.endswith("/messages"):
+                    resp = await self._claude(request, payload)
+                elif path.endswith(":generateContent"):
+                    resp = await self._gemini(payload)
+                elif path.endswith(":streamGenerateContent"):
+                    resp = await self._gemini_stream(request)
+                else:
+                    resp = web.json_response({"error": {"message": f"unknown endpoint {path}"}}, status=404)
+            else:
+                await self._first_byte_delay()
+
+        sent = getattr(resp, "_mock_bytes_out", None)
+        if sent is None:
+            sent = len(resp.body or b"") if isinstance(resp, web.Response) else 0
+        self.stats.record(resp.status, len(body), sent)
+        return resp
+
+    def _models(self) -> web.Response:
+        return web.json_response({
+            "data": [{"id": m, "object": "model"} for m in self.config.models],
+            "models": [{"name": f"models/{m}"} for m in self.config.models],
+        })
+
+    async def _sse(self, request: web.Request, events: list[tuple[str | None, dict | str]]) -> web.StreamResponse:
+        """Send SSE events, pacing one token per event."""
+        resp = web.StreamResponse(headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache"})
+        await resp.prepare(request)
+        sent = 0
+        for i, (event, data) in enumerate(events):
+            if i:
+                await self._token_delay(1)
+            text = data if isinstance(data, str) else json.dumps(data)
+            chunk = (f"event: {event}\n" if event else "") + f"data: {text}\n\n"
+            encoded = chunk.encode("utf-8")
+            sent += len(encoded)
+            try:
+                await resp.write(encoded)
+            except ConnectionResetError:
+                break  # client went away (timeout / interrupt)
+        else:
+            await resp.write_eof()
+        resp._mock_bytes_out = sent
+        return resp
+
+    async def _openai(self, request: web.Request, payload: dict) -> web.StreamResponse:
+        words = self._words()
+        await self._first_byte_delay()
+        if payload.get("stream"):
+            events = [(None, {"choices": [{"index": 0, "delta": {"content": w}}]}) for w in words]
+            events.append((None, {"choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}))
+            events.append((None, "[DONE]"))
+            return await self._sse(request, events)
+        await self._token_delay(len(words))
+        return self._json({
+            "id": "chatcmpl-mock",
+            "object": "chat.completion",
+            "model": payload.get("model", ""),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": "".join(words)},
+                         "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 10, "completion_tokens": len(words), "total_tokens": 10 + len(words)},
+        })
+
+    async def _claude(self, request: web.Request, payload: dict) -> web.StreamResponse:
+        words = self._words()
+        await self._first_byte_delay()
+        if payload.get("stream"):
+            events = [("message_start", {"type": "message_start", "message": {"id": "msg_mock"}}),
+                      ("content_block_start", {"type": "content_block_start", "index": 0,
+                                               "content_block": {"type": "text", "text": ""}})]
+            events += [("content_block_delta", {"type": "content_block_delta", "index": 0,
+                                                "delta": {"type": "text_delta", "text": w}}) for w in words]
+            events += [("content_block_stop", {"type": "content_block_stop", "index": 0}),
+                       ("message_stop", {"type": "message_stop"})]
+            return await self._sse(request, events)
+        await self._token_delay(len(words))
+        return self._json({
+            "id": "msg_mock",
+            "type": "message",
+            "role": "assistant",
+            "model": payload.get("model", ""),
+            "content": [{"type": "text", "text": "".join(words)}],
+            "stop_reason": "end_turn",
+            "usage": {"input_tokens": 10, "output_tokens": len(words)},
+        })
+
+    async def _gemini(self, payload: dict) -> web.Response:
+        words = self._words()
+        await self._first_byte_delay()
+        await self._token_delay(len(words))
+        parts = [{"text": "".join(words)}]
+        modalities = (payload.get("generationConfig") or {}).get("responseModalities") or []
+        if "IMAGE" in modalities and self.config.image_size > 0:
+            mime = "image/jpeg" if self.config.image_format.lower() in ("jpeg", "jpg") else "image/png"
+            parts.append({"inlineData": {"mimeType": mime, "data": self._image_data()}})
+        count = (payload.get("generationConfig") or {}).get("candidateCount", 1)
+        return self._json({
+            "candidates": [{"content": {"role": "model", "parts": parts}, "finishReason": "STOP", "index": i}
+                           for i in range(count)],
+            "usageMetadata": {"promptTokenCount": 10, "candidatesTokenCount": len(words),
+                              "totalTokenCount": 10 + len(words)},
+        })
+
+    async def _gemini_stream(self, request: web.Request) -> web.StreamResponse:
+        await self._first_byte_delay()
+        events = [(None, {"candidates": [{"content": {"role": "model", "parts": [{"text": w}]}}]})
+                  for w in self._words()]
+        return await self._sse(request, events)
+
+
+async def start_mock_server(config: MockConfig | None = None, host: str = "127.0.0.1", port: int = 0):
+    """Start a mock server on the running loop; returns (runner, base_url). Stop with `runner.cleanup()`."""
+    server = MockServer(config)
+    runner = web.AppRunner(server.app)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    actual_port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://{host}:{actual_port}"
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _mock_argv(args: argparse.Namespace) -> list[str]:
+    return [
+        "--latency", str(args.latency), "--jitter", str(args.jitter),
+        "--tokens-per-sec", str(args.tokens_per_sec), "--output-tokens", str(args.output_tokens),
+        "--error-rate", str(args.error_rate), "--rate-limit-rate", str(args.rate_limit_rate),
+        "--retry-after", str(args.retry_after), "--image-size", str(args.image_size),
+        "--image-format", args.image_format,
+        *(["--seed", str(args.seed)] if args.seed is not None else []),
+    ]
+
+
+async def _wait_ready(url: str, timeout: float = 15.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with aiohttp.ClientSession() as session:
+        while True:
+            try:
+                async with session.get(f"{url}/mock/stats") as resp:
+                    if resp.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Mock server at {url} did not start")
+            await asyncio.sleep(0.1)
+
+
+async def spawn_mock_server(args: argparse.Namespace) -> tuple[subprocess.Popen, str]:
+    """
+    Start the mock server in a subprocess (options from `add_mock_arguments`).
+
+    Keeps the server off the caller's event loop and out of its memory
+    numbers. Returns (process, base_url); stop with `process.terminate()`.
+    """
+    port = _free_port()
+    proc = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "--port", str(port), *_mock_argv(args)],
+        stdout=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        await _wait_ready(base_url)
+    except BaseException:
+        proc.terminate()
+        raise
+    return proc, base_url
+
+
+def add_mock_arguments(parser: argparse.ArgumentParser) -> None:
+    defaults = MockConfig()
+    parser.add_argument("--latency", type=float, default=defaults.latency, help="Seconds before the first byte")
+    parser.add_argument("--jitter", type=float, default=defaults.jitter, help="+/- uniform latency jitter (s)")
+    parser.add_argument("--tokens-per-sec", type=float, default=defaults.tokens_per_sec,
+                        help="Output token pacing (0 = instant)")
+    parser.add_argument("--output-tokens", type=int, default=defaults.output_tokens)
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate, help="Fraction of 500 responses")
+    parser.add_argument("--rate-limit-rate", type=float, default=defaults.rate_limit_rate,
+                        help="Fraction of 429 responses")
+    parser.add_argument("--retry-after", type=float, default=defaults.retry_after)
+    parser.add_argument("--image-size", type=int, default=defaults.image_size,
+                        help="Gemini image response size in px (0 = text only)")
+    parser.add_argument("--image-format", default=defaults.image_format, choices=["png", "jpeg"])
+    parser.add_argument("--seed", type=int, default=None)
+
+
+def mock_config_from_args(args: argparse.Namespace) -> MockConfig:
+    return MockConfig(
+        latency=args.latency,
+        jitter=args.jitter,
+        tokens_per_sec=args.tokens_per_sec,
+        output_tokens=args.output_tokens,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+        image_size=args.image_size,
+        image_format=args.image_format,
+        seed=args.seed,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_mock_arguments(parser)
+    args = parser.parse_args()
+
+    server = MockServer(mock_config_from_args(args))
+    print(f"[SimpleChat] Mock API on http://{args.host}:{args.port} (stats: /mock/stats)", flush=True)
+    web.run_app(server.app, host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
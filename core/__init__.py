@@ -2,22 +2,59 @@
 SimpleChat core module.
 """
 from .providers import (
+    APIError,
     BaseProvider,
     ChatResponse,
     ChatConfig,
+    RequestTimeouts,
+    RequestTimeoutError,
     OpenAIProvider,
     ClaudeProvider,
     GeminiProvider,
     PROVIDERS,
     get_provider,
 )
+from .retry import RetryPolicy
+from .interrupt import ProcessingInterrupted, interruptible, is_interrupted
+from .breaker import BreakerPolicy, CircuitBreaker, CircuitOpenError, get_circuit_breaker, breaker_stats
+from .pool import PoolMember, pick_member, pool_stats
+from .hedge import HedgePolicy, hedge_stats
 from .image_utils import (
     tensor_to_pil,
     pil_to_tensor,
+    tensor_to_uint8,
+    uint8_to_pil,
+    empty_image,
     tensor_to_base64,
     base64_to_tensor,
     create_data_uri,
+    tensor_hash,
+    stack_images,
+    resize_images,
+    ImageEncodeOptions,
+    EncodedImage,
+    encode_image,
+    get_encoded_image_cache,
+    run_in_image_pool,
+    encode_images_async,
+    decode_images_async,
+    bytes_to_tensor,
 )
+from .vision import (
+    VisionLimits,
+    get_vision_limits,
+    prepare_vision_images,
+    prepare_vision_frames,
+    select_frames,
+    perceptual_hash,
+)
+from .cache import (
+    ResponseCache,
+    cached_chat,
+    get_response_cache,
+    make_cache_key,
+)
+from .singleflight import SingleFlight, get_single_flight
 from .noass import (
     format_noass_prompt,
     build_noass_messages,
@@ -28,6 +65,7 @@ from .noass import (
 
 __all__ = [
     # Providers
+    "APIError",
     "BaseProvider",
     "ChatResponse",
     "ChatConfig",
@@ -36,12 +74,60 @@ __all__ = [
     "GeminiProvider",
     "PROVIDERS",
     "get_provider",
+    "RetryPolicy",
+    "RequestTimeouts",
+    "RequestTimeoutError",
+    # Interrupt
+    "ProcessingInterrupted",
+    "interruptible",
+    "is_interrupted",
+    # Circuit breaker
+    "BreakerPolicy",
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "get_circuit_breaker",
+    "breaker_stats",
+    # Endpoint / key pools
+    "PoolMember",
+    "pick_member",
+    "pool_stats",
+    # Hedged requests
+    "HedgePolicy",
+    "hedge_stats",
     # Image utils
     "tensor_to_pil",
     "pil_to_tensor",
+    "tensor_to_uint8",
+    "uint8_to_pil",
+    "empty_image",
     "tensor_to_base64",
     "base64_to_tensor",
     "create_data_uri",
+    "tensor_hash",
+    "stack_images",
+    "resize_images",
+    "ImageEncodeOptions",
+    "EncodedImage",
+    "encode_image",
+    "get_encoded_image_cache",
+    "run_in_image_pool",
+    "encode_images_async",
+    "decode_images_async",
+    "bytes_to_tensor",
+    # Vision preprocessing
+    "VisionLimits",
+    "get_vision_limits",
+    "prepare_vision_images",
+    "prepare_vision_frames",
+    "select_frames",
+    "perceptual_hash",
+    # Response cache
+    "ResponseCache",
+    "cached_chat",
+    "get_response_cache",
+    "make_cache_key",
+    "SingleFlight",
+    "get_single_flight",
     # NoASS
     "format_noass_prompt",
     "build_noass_messages",
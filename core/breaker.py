@@ -0,0 +1,223 @@
+"""
+Process-wide circuit breaker per endpoint (provider, base_url).
+
+When an endpoint (typically a custom proxy) goes down, every queued request
+would otherwise wait out its own connect / first-byte timeout and retries.
+The breaker watches attempt outcomes and fails fast instead:
+
+- closed: requests pass; outcomes go into a rolling time window. Once the
+  window holds at least `min_requests` outcomes and the error rate reaches
+  `error_rate`, the breaker opens.
+- open: requests fail immediately with `CircuitOpenError` for `cooldown`
+  seconds.
+- half-open: after the cooldown one request is let through as a probe
+  (everything else still fails fast). A successful probe closes the breaker
+  and clears the window; a failed probe opens it again.
+
+Only signs of a dead or broken endpoint count as failures: connection
+errors, timeouts and 5xx responses. 4xx answers (bad request, auth, 429)
+mean the endpoint is up, and are left to the retry policy / rate limiter.
+
+Like the rate limiter, breakers hold no asyncio primitives, so one breaker
+is shared by the server loop and the per-prompt loops.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """The endpoint's circuit breaker is open; the request was not sent."""
+
+    def __init__(self, provider: str, base_url: str, retry_in: float):
+        super().__init__(
+            f"{provider} endpoint {base_url} is unavailable (circuit open, next probe in {retry_in:.0f}s)"
+        )
+        self.base_url = base_url
+        self.retry_in = retry_in
+
+
+@dataclass(frozen=True)
+class BreakerPolicy:
+    """When an endpoint's breaker opens, and for how long."""
+    # Rolling window of attempt outcomes (seconds)
+    window: float = 60.0
+    # Outcomes needed in the window before the error rate is trusted
+    min_requests: int = 5
+    # Error rate (0-1) that opens the breaker
+    error_rate: float = 0.5
+    # Seconds the breaker stays open before letting a probe through
+    cooldown: float = 30.0
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker for one endpoint."""
+
+    def __init__(self, provider: str = "", base_url: str = "", policy: BreakerPolicy | None = None):
+        self._lock = threading.Lock()
+        self.provider = provider
+        self.base_url = base_url
+        self.policy = policy or BreakerPolicy()
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.probing = False
+        # (monotonic time, ok) per attempt within the window
+        self.outcomes: deque[tuple[float, bool]] = deque()
+        self.failures = 0
+        self.total_failures = 0
+        self.total_rejected = 0
+        self.times_opened = 0
+        self.last_error = ""
+
+    def _trim(self, now: float) -> None:
+        cutoff = now - self.policy.window
+        while self.outcomes and self.outcomes[0][0] < cutoff:
+            if not self.outcomes.popleft()[1]:
+                self.failures -= 1
+
+    def _open(self, now: float) -> None:
+        self.state = OPEN
+        self.opened_at = now
+        self.probing = False
+        self.times_opened += 1
+
+    def acquire(self) -> bool:
+        """
+        Take permission to send one attempt.
+
+        Returns True if the attempt is the half-open probe; raises
+        `CircuitOpenError` when the request must fail fast.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self.state == OPEN and now - self.opened_at >= self.policy.cooldown:
+                self.state = HALF_OPEN
+            if self.state == CLOSED:
+                return False
+            if self.state == HALF_OPEN and not self.probing:
+                self.probing = True
+                return True
+            self.total_rejected += 1
+            retry_in = max(0.0, self.opened_at + self.policy.cooldown - now)
+        raise CircuitOpenError(self.provider, self.base_url, retry_in)
+
+    def available(self) -> bool:
+        """Whether `acquire()` would currently let a request through."""
+        with self._lock:
+            if self.state == OPEN:
+                return time.monotonic() - self.opened_at >= self.policy.cooldown
+            return self.state == CLOSED or not self.probing
+
+    def record(self, ok: bool, probe: bool = False, error: BaseException | None = None) -> None:
+        """Record the outcome of an attempt started with `acquire()`."""
+        with self._lock:
+            now = time.monotonic()
+            if not ok:
+                self.total_failures += 1
+                self.last_error = str(error or "")[:200]
+            if probe:
+                self.probing = False
+                if ok:
+                    self.state = CLOSED
+                    self.outcomes.clear()
+                    self.failures = 0
+                else:
+                    self._open(now)
+                return
+            if self.state != CLOSED:
+                return  # stragglers sent before the breaker opened
+            self.outcomes.append((now, ok))
+            if not ok:
+                self.failures += 1
+            self._trim(now)
+            total = len(self.outcomes)
+            if not ok and total >= self.policy.min_requests and self.failures / total >= self.policy.error_rate:
+                self._open(now)
+
+    def release(self, probe: bool) -> None:
+        """Give back an attempt that ended without an outcome (e.g. cancelled)."""
+        if probe:
+            with self._lock:
+                self.probing = False
+
+    def reset(self) -> None:
+        with self._lock:
+            self.state = CLOSED
+            self.probing = False
+            self.outcomes.clear()
+            self.failures = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            now = time.monotonic()
+            self._trim(now)
+            state = self.state
+            if state == OPEN and now - self.opened_at >= self.policy.cooldown:
+                state = HALF_OPEN
+            total = len(self.outcomes)
+            return {
+                "state": state,
+                "window_requests": total,
+                "window_error_rate": self.failures / total if total else 0.0,
+                "retry_in": max(0.0, self.opened_at + self.policy.cooldown - now) if state == OPEN else 0.0,
+                "times_opened": self.times_opened,
+                "failures": self.total_failures,
+                "rejected": self.total_rejected,
+                "last_error": self.last_error,
+            }
+
+
+_BREAKERS: dict[tuple[str, str], CircuitBreaker] = {}
+_BREAKERS_LOCK = threading.Lock()
+
+
+def _breaker_key(provider: str, base_url: str) -> tuple[str, str]:
+    return (provider, (base_url or "").strip().rstrip("/"))
+
+
+def get_circuit_breaker(provider: str, base_url: str, policy: BreakerPolicy | None = None) -> CircuitBreaker:
+    """
+    Get the shared breaker for (provider, base_url).
+
+    Passing a policy (re)configures it; None leaves the current one alone.
+    """
+    key = _breaker_key(provider, base_url)
+    with _BREAKERS_LOCK:
+        breaker = _BREAKERS.get(key)
+        if breaker is None:
+            breaker = _BREAKERS[key] = CircuitBreaker(*key, policy=policy)
+        elif policy is not None:
+            breaker.policy = policy
+    return breaker
+
+
+def is_available(provider: str, base_url: str) -> bool:
+    """Whether the endpoint's breaker (if it has one yet) lets requests through."""
+    with _BREAKERS_LOCK:
+        breaker = _BREAKERS.get(_breaker_key(provider, base_url))
+    return breaker is None or breaker.available()
+
+
+def breaker_stats() -> list[dict]:
+    """State of every endpoint breaker (for the status route)."""
+    with _BREAKERS_LOCK:
+        breakers = list(_BREAKERS.values())
+    return [{"provider": b.provider, "base_url": b.base_url, **b.stats()} for b in breakers]
+
+
+def reset_breakers() -> int:
+    """Close every breaker; returns how many were reset."""
+    with _BREAKERS_LOCK:
+        breakers = list(_BREAKERS.values())
+    for breaker in breakers:
+        breaker.reset()
+    return len(breakers)
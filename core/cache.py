@@ -0,0 +1,376 @@
+"""
+Content-addressed response cache for chat requests.
+
+Two tiers:
+- In-memory LRU (fast, per process)
+- On-disk JSON store with TTL and size-bounded eviction (survives restarts)
+
+Keys are a stable SHA-256 over everything that determines the answer:
+provider, base_url, model, normalized messages, temperature, max_tokens,
+stop sequences, the content hashes of attached image tensors and their
+upload encoding.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable
+
+import torch
+
+from .image_utils import DEFAULT_ENCODE_OPTIONS, run_in_image_pool, tensor_hash
+from .providers import BaseProvider, ChatResponse
+from .singleflight import get_single_flight
+
+
+DEFAULT_MEMORY_ENTRIES = 256
+DEFAULT_DISK_BYTES = 256 * 1024 * 1024  # 256 MB
+DEFAULT_TTL = 7 * 24 * 3600  # 7 days
+
+# Once over the size limit, evict down to this fraction of it, so a full
+# cache doesn't rescan the directory on every write
+DISK_LOW_WATERMARK = 0.9
+
+
+def _default_cache_dir() -> str:
+    try:
+        import folder_paths
+        return os.path.join(folder_paths.get_user_directory(), "simplechat_cache")
+    except Exception:
+        return os.path.join(tempfile.gettempdir(), "simplechat_cache")
+
+
+def make_cache_key(
+    provider: str,
+    base_url: str,
+    model: str,
+    messages: list[dict[str, Any]],
+    temperature: float,
+    max_tokens: int,
+    stop: list[str] | None = None,
+    images: list[torch.Tensor] | None = None,
+    image_encoding: str | None = None,
+    image_detail: str | None = None,
+) -> str:
+    """Build a stable hash key for a chat request."""
+    material = {
+        "provider": provider,
+        "base_url": (base_url or "").rstrip("/"),
+        "model": model,
+        "messages": messages,
+        "temperature": round(float(temperature), 6),
+        "max_tokens": int(max_tokens),
+        "stop": list(stop) if stop else None,
+        "images": [tensor_hash(img) for img in images] if images else None,
+    }
+    # Default PNG uploads leave keys unchanged so existing cache entries stay valid
+    if images and image_encoding and image_encoding != DEFAULT_ENCODE_OPTIONS.key():
+        material["image_encoding"] = image_encoding
+    if images and image_detail in ("low", "high"):
+        material["image_detail"] = image_detail
+    blob = json.dumps(material, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Two-tier (memory LRU + disk) cache of chat response text."""
+
+    def __init__(
+        self,
+        cache_dir: str | None = None,
+        memory_entries: int = DEFAULT_MEMORY_ENTRIES,
+        disk_bytes: int = DEFAULT_DISK_BYTES,
+        ttl: float = DEFAULT_TTL,
+    ):
+        self.cache_dir = cache_dir or _default_cache_dir()
+        self.memory_entries = memory_entries
+        self.disk_bytes = disk_bytes
+        self.ttl = ttl
+
+        self._memory: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._disk_total: int | None = None  # lazily scanned, then tracked on write / remove
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    # ---- memory tier ----
+
+    def _memory_get(self, key: str) -> str | None:
+        with self._lock:
+            item = self._memory.get(key)
+            if item is None:
+                return None
+            created, text = item
+            if time.time() - created > self.ttl:
+                del self._memory[key]
+                return None
+            self._memory.move_to_end(key)
+            return text
+
+    def _memory_put(self, key: str, created: float, text: str) -> None:
+        with self._lock:
+            self._memory[key] = (created, text)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    # ---- disk tier ----
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def _disk_get(self, key: str) -> tuple[float, str] | None:
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        created = float(entry.get("created", 0))
+        if time.time() - created > self.ttl:
+            with self._disk_lock:
+                try:
+                    size = os.path.getsize(path)
+                    os.remove(path)
+                except OSError:
+                    return None
+                if self._disk_total is not None:
+                    self._disk_total = max(0, self._disk_total - size)
+            return None
+
+        # Bump mtime so disk eviction is least-recently-used
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        return created, entry.get("text", "")
+
+    def _disk_put(self, key: str, created: float, text: str) -> None:
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"created": created, "text": text}, f, ensure_ascii=False)
+            written = os.path.getsize(tmp)
+        except OSError as e:
+            print(f"[SimpleChat] Failed to write response cache: {e}")
+            return
+
+        with self._disk_lock:
+            try:
+                # Overwriting a key replaces its old file; count only the difference
+                try:
+                    replaced = os.path.getsize(path)
+                except OSError:
+                    replaced = 0
+                os.replace(tmp, path)
+            except OSError as e:
+                print(f"[SimpleChat] Failed to write response cache: {e}")
+                try:
+                    os.remove(tmp)
+                except OSError:
+                    pass
+                return
+
+            if self._disk_total is None:
+                self._disk_total = sum(size for _, size, _ in self._disk_entries())
+            else:
+                self._disk_total = max(0, self._disk_total + written - replaced)
+            if self._disk_total > self.disk_bytes:
+                self._evict_disk(int(self.disk_bytes * DISK_LOW_WATERMARK))
+
+    def _disk_entries(self) -> list[tuple[float, int, str]]:
+        entries = []
+        if not os.path.isdir(self.cache_dir):
+            return entries
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def _evict_disk(self, target: int) -> None:
+        """Remove least-recently-used entries until at most `target` bytes remain."""
+        entries = self._disk_entries()
+        total = sum(size for _, size, _ in entries)
+        entries.sort()  # oldest mtime first
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                self._stats["evictions"] += 1
+            except OSError:
+                pass
+        self._disk_total = total
+
+    # ---- public API ----
+
+    def _lookup_memory(self, key: str) -> str | None:
+        text = self._memory_get(key)
+        if text is not None:
+            self._stats["memory_hits"] += 1
+        return text
+
+    def _lookup_disk(self, key: str) -> str | None:
+        entry = self._disk_get(key)
+        if entry is not None:
+            created, text = entry
+            self._memory_put(key, created, text)
+            self._stats["disk_hits"] += 1
+            return text
+
+        self._stats["misses"] += 1
+        return None
+
+    def get(self, key: str) -> str | None:
+        text = self._lookup_memory(key)
+        return text if text is not None else self._lookup_disk(key)
+
+    def put(self, key: str, text: str) -> None:
+        created = time.time()
+        self._memory_put(key, created, text)
+        self._disk_put(key, created, text)
+        self._stats["stores"] += 1
+
+    async def get_async(self, key: str) -> str | None:
+        """Like `get`, with the disk tier read in a worker thread."""
+        text = self._lookup_memory(key)
+        return text if text is not None else await asyncio.to_thread(self._lookup_disk, key)
+
+    async def put_async(self, key: str, text: str) -> None:
+        """Like `put`, with the disk write (and any eviction) in a worker thread."""
+        created = time.time()
+        self._memory_put(key, created, text)
+        await asyncio.to_thread(self._disk_put, key, created, text)
+        self._stats["stores"] += 1
+
+    def purge(self) -> int:
+        """Remove every cached entry. Returns the number of disk entries removed."""
+        with self._lock:
+            self._memory.clear()
+        removed = 0
+        with self._disk_lock:
+            for _, _, path in self._disk_entries():
+                try:
+                    os.remove(path)
+                    removed += 1
+                except OSError:
+                    pass
+            self._disk_total = None
+        return removed
+
+    def stats(self) -> dict[str, Any]:
+        entries = self._disk_entries()
+        with self._lock:
+            memory_count = len(self._memory)
+        return {
+            **self._stats,
+            "memory_entries": memory_count,
+            "memory_max_entries": self.memory_entries,
+            "disk_entries": len(entries),
+            "disk_bytes": sum(size for _, size, _ in entries),
+            "disk_max_bytes": self.disk_bytes,
+            "ttl": self.ttl,
+            "cache_dir": self.cache_dir,
+        }
+
+
+_CACHE: ResponseCache | None = None
+
+
+def get_response_cache() -> ResponseCache:
+    """Get the process-wide response cache."""
+    global _CACHE
+    if _CACHE is None:
+        _CACHE = ResponseCache()
+    return _CACHE
+
+
+async def cached_chat(
+    provider: BaseProvider,
+    messages: list[dict[str, Any]],
+    model: str,
+    temperature: float = 1.0,
+    max_tokens: int = 2048,
+    images: list[torch.Tensor] | None = None,
+    use_cache: bool = True,
+    on_delta: Callable[[str], None] | None = None,
+    **kwargs,
+) -> ChatResponse:
+    """
+    Send a chat request through the response cache.
+
+    If `on_delta` is given the request is streamed (see `BaseProvider.collect_stream`);
+    a cache hit reports the whole cached text as a single delta.
+
+    With `use_cache`, concurrent identical requests are also coalesced into one
+    API call (see `SingleFlight`). Disabling the cache disables both, so callers
+    that want independent samples of the same prompt still get them.
+    """
+    request = dict(
+        messages=messages,
+        model=model,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        images=images,
+        **kwargs,
+    )
+
+    if not use_cache:
+        if on_delta is not None:
+            return await provider.collect_stream(on_delta, **request)
+        return await provider.chat(**request)
+
+    cache = get_response_cache()
+    # Hashing attached images is CPU-bound; keep it off the event loop
+    key = await run_in_image_pool(
+        make_cache_key,
+        provider.name,
+        # Members of an endpoint pool share cache entries
+        provider.pool_member.pool if provider.pool_member is not None else provider.base_url,
+        model,
+        messages,
+        temperature,
+        max_tokens,
+        stop=kwargs.get("stop"),
+        images=images,
+        image_encoding=provider.image_options.key(),
+        image_detail=kwargs.get("image_detail"),
+    )
+
+    text = await cache.get_async(key)
+    if text is not None:
+        if on_delta is not None:
+            on_delta(text)
+        return ChatResponse(text=text)
+
+    async def _fetch() -> ChatResponse:
+        if on_delta is not None:
+            response = await provider.collect_stream(on_delta, **request)
+        else:
+            response = await provider.chat(**request)
+
+        # Don't pin empty answers (filtered / truncated responses)
+        if response.text:
+            await cache.put_async(key, response.text)
+        return response
+
+    # Concurrent identical misses share one request (only the first caller streams)
+    return await get_single_flight().do(key, _fetch)
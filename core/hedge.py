@@ -0,0 +1,136 @@
+"""
+Hedged requests: cut tail latency by racing a duplicate.
+
+If the attempt in flight hasn't got a response within a threshold, a
+duplicate is sent (to another pool member when the config has an endpoint /
+key pool, else to the same endpoint). Only time on the wire counts: rate
+limiter waits and retry backoff don't, and each retry restarts the clock.
+Whichever response arrives first is used and the other request is cancelled
+and its connection released. Non-streaming APIs answer once generation is
+done, so this races complete responses; for streams it races the opening of
+the stream.
+
+The threshold is either fixed or the observed p95 time-to-response of
+recent requests of the same shape (endpoint pool, path, model, stream);
+until enough samples exist, percentile-based hedging stays off.
+
+Extra requests are capped by a budget: every request earns `budget` of a
+hedge token (e.g. 0.05 = at most ~5% extra requests), each hedge spends a
+whole token, and unused tokens are capped so a quiet period can't be
+cashed in as a burst of duplicates.
+
+State is process-wide and lock-protected, like the rate limiter.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Any
+
+
+# Latency samples kept per request shape
+SAMPLE_WINDOW = 256
+
+# Most hedge tokens that can be saved up
+MAX_BUDGET_TOKENS = 10.0
+
+
+@dataclass(frozen=True)
+class HedgePolicy:
+    """When to send a duplicate request, and how many."""
+    # Fixed threshold in seconds; 0 = use the observed percentile
+    delay: float = 0.0
+    percentile: float = 0.95
+    # Samples needed before the percentile is trusted
+    min_samples: int = 20
+    # Extra requests allowed, as a fraction of requests
+    budget: float = 0.05
+
+
+class LatencyTracker:
+    """Recent time-to-response samples and hedge budget for one request shape."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples: deque[float] = deque(maxlen=SAMPLE_WINDOW)
+        self.tokens = 1.0
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def observe(self, latency: float) -> None:
+        with self._lock:
+            self.samples.append(latency)
+
+    def quantile(self, q: float, min_samples: int = 1) -> float | None:
+        with self._lock:
+            if len(self.samples) < max(1, min_samples):
+                return None
+            ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def threshold(self, policy: HedgePolicy) -> float | None:
+        """Seconds to wait before hedging, or None to not hedge yet."""
+        if policy.delay > 0:
+            return policy.delay
+        return self.quantile(policy.percentile, policy.min_samples)
+
+    def deposit(self, budget: float) -> None:
+        """Count one request and earn its share of the hedge budget."""
+        with self._lock:
+            self.requests += 1
+            self.tokens = min(MAX_BUDGET_TOKENS, self.tokens + max(0.0, budget))
+
+    def withdraw(self) -> bool:
+        """Spend one hedge token; False if the budget is exhausted."""
+        with self._lock:
+            if self.tokens < 1.0:
+                return False
+            self.tokens -= 1.0
+            self.hedges += 1
+            return True
+
+    def won(self) -> None:
+        with self._lock:
+            self.hedge_wins += 1
+
+    def stats(self) -> dict:
+        p50 = self.quantile(0.5)
+        p95 = self.quantile(0.95)
+        with self._lock:
+            return {
+                "samples": len(self.samples),
+                "p50": p50,
+                "p95": p95,
+                "requests": self.requests,
+                "hedges": self.hedges,
+                "hedge_wins": self.hedge_wins,
+                "budget_tokens": self.tokens,
+            }
+
+
+_TRACKERS: dict[tuple[str, str, str, bool], LatencyTracker] = {}
+_TRACKERS_LOCK = threading.Lock()
+
+
+def get_latency_tracker(provider: str, url: str, payload: dict[str, Any]) -> LatencyTracker:
+    """Get the shared tracker for this request shape (provider, pool URL + path, model, stream)."""
+    # Query strings may carry the API key (Gemini); never keep them in keys
+    key = (provider, url.split("?", 1)[0], str(payload.get("model", "")), bool(payload.get("stream")))
+    with _TRACKERS_LOCK:
+        tracker = _TRACKERS.get(key)
+        if tracker is None:
+            tracker = _TRACKERS[key] = LatencyTracker()
+    return tracker
+
+
+def hedge_stats() -> list[dict]:
+    """Latency percentiles and hedge counters per request shape (for the status route)."""
+    with _TRACKERS_LOCK:
+        items = list(_TRACKERS.items())
+    return [
+        {"provider": provider, "url": url, "model": model, "stream": stream, **tracker.stats()}
+        for (provider, url, model, stream), tracker in items
+    ]
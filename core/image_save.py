@@ -0,0 +1,138 @@
+"""
+Save provider image bytes to disk without decoding them.
+
+Generated images arrive already encoded (usually PNG). Archiving them via
+IMAGE -> SaveImage decodes to a float32 tensor only to encode it again.
+These helpers write the original bytes instead, with metadata inserted at
+the container level:
+
+- PNG: tEXt chunks before IEND (same keys ComfyUI's SaveImage uses)
+- JPEG: the metadata as JSON in COM segments (split over consecutive
+  segments when longer than one segment holds; concatenate them to read it)
+- other formats: written unchanged
+
+A small preview tensor can be decoded separately (PIL draft mode + thumbnail).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import struct
+import zlib
+from io import BytesIO
+from typing import Any
+
+import torch
+from PIL import Image
+
+from .image_utils import pil_to_tensor
+
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# Largest JPEG marker segment payload (the 16-bit length counts itself)
+_JPEG_SEGMENT_MAX = 0xFFFF - 2
+
+_MIME_EXTENSIONS = {
+    "image/png": "png",
+    "image/jpeg": "jpg",
+    "image/webp": "webp",
+    "image/gif": "gif",
+}
+
+
+def extension_for(mime_type: str) -> str:
+    """File extension for an image MIME type."""
+    return _MIME_EXTENSIONS.get(mime_type.lower(), mime_type.rpartition("/")[2] or "bin")
+
+
+def _png_chunk(kind: bytes, payload: bytes) -> bytes:
+    crc = zlib.crc32(kind + payload) & 0xFFFFFFFF
+    return struct.pack(">I", len(payload)) + kind + payload + struct.pack(">I", crc)
+
+
+def embed_png_text(data: bytes, texts: dict[str, str]) -> bytes:
+    """Insert tEXt (or iTXt for non-Latin-1 text) chunks before IEND of a PNG."""
+    if not data.startswith(_PNG_SIGNATURE):
+        raise ValueError("Not a PNG file")
+    # IEND is always the last 12 bytes of a well-formed PNG
+    iend = len(data) - 12
+    if data[iend + 4 : iend + 8] != b"IEND":
+        iend = data.rindex(b"IEND") - 4
+    chunks = []
+    for key, value in texts.items():
+        keyword = key.encode("latin-1")[:79]
+        try:
+            chunks.append(_png_chunk(b"tEXt", keyword + b"\x00" + value.encode("latin-1")))
+        except UnicodeEncodeError:
+            chunks.append(_png_chunk(b"iTXt", keyword + b"\x00\x00\x00\x00\x00" + value.encode("utf-8")))
+    return b"".join([data[:iend], *chunks, data[iend:]])
+
+
+def embed_jpeg_comment(data: bytes, comment: str) -> bytes:
+    """
+    Insert COM segments right after the JPEG SOI marker.
+
+    A segment holds at most 65533 bytes, so a longer comment is split over
+    consecutive segments (never truncated); their payloads concatenated in
+    file order are the UTF-8 comment.
+    """
+    if not data.startswith(b"\xff\xd8"):
+        raise ValueError("Not a JPEG file")
+    payload = comment.encode("utf-8")
+    step = _JPEG_SEGMENT_MAX
+    segments = [
+        b"\xff\xfe" + struct.pack(">H", len(part) + 2) + part
+        for part in (payload[i : i + step] for i in range(0, max(len(payload), 1), step))
+    ]
+    return b"".join([data[:2], *segments, data[2:]])
+
+
+def embed_metadata(data: bytes, mime_type: str, metadata: dict[str, Any]) -> bytes:
+    """
+    Embed metadata into encoded image bytes without re-encoding the pixels.
+
+    Args:
+        data: Encoded image bytes
+        mime_type: MIME type of `data`
+        metadata: Key -> value; non-string values are stored as JSON
+
+    Returns:
+        New image bytes (unchanged for formats without metadata support)
+    """
+    if not metadata:
+        return bytes(data)
+    texts = {k: v if isinstance(v, str) else json.dumps(v, ensure_ascii=False) for k, v in metadata.items()}
+    if mime_type == "image/png":
+        return embed_png_text(data, texts)
+    if mime_type == "image/jpeg":
+        return embed_jpeg_comment(data, json.dumps(texts, ensure_ascii=False))
+    return bytes(data)
+
+
+def write_image_file(path: str, data: bytes, mime_type: str, metadata: dict[str, Any] | None = None) -> str:
+    """Write encoded image bytes (with metadata) to `path`; returns the path."""
+    out = embed_metadata(data, mime_type, metadata or {})
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(out)
+    os.replace(tmp, path)
+    return path
+
+
+def preview_tensor(data: bytes, max_size: int = 256) -> torch.Tensor:
+    """
+    Decode a small preview of encoded image bytes.
+
+    JPEG previews use PIL's draft mode (DCT scaling), so the full-resolution
+    image is never materialized for them.
+
+    Returns:
+        ComfyUI image tensor (1, h, w, 3) with the long edge at most `max_size`
+    """
+    image = Image.open(BytesIO(data))
+    image.draft("RGB", (max_size, max_size))
+    image = image.convert("RGB")
+    image.thumbnail((max_size, max_size), Image.Resampling.BILINEAR)
+    return pil_to_tensor(image)
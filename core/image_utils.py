@@ -1,13 +1,258 @@
 """
 Image conversion utilities for ComfyUI tensors.
 """
+import asyncio
 import base64
+import functools
+import hashlib
+import os
+import threading
+import warnings
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from io import BytesIO
 import torch
 import numpy as np
 from PIL import Image
 
 
+# Float scratch size per chunk when quantizing CPU tensors (stays in cache)
+_QUANT_CHUNK_BYTES = 1 << 20
+
+_FORMAT_MIME = {
+    "PNG": "image/png",
+    "JPEG": "image/jpeg",
+    "WEBP": "image/webp",
+}
+
+# Threads for CPU-heavy image work (encode, decode, hashing). zlib, libjpeg
+# and torch release the GIL, so threads use several cores without pickling
+# tensors to another process.
+IMAGE_WORKERS = min(8, os.cpu_count() or 4)
+
+
+def tensor_hash(tensor: torch.Tensor) -> str:
+    """
+    Content hash of an image tensor (shape + dtype + raw bytes).
+
+    Used for cache keys; hashes the buffer in place without an extra copy
+    when the tensor is already a contiguous CPU tensor.
+    """
+    t = tensor.detach()
+    if t.device.type != "cpu":
+        t = t.cpu()
+    arr = t.contiguous().numpy()
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{tuple(arr.shape)}|{arr.dtype}".encode("ascii"))
+    h.update(memoryview(arr).cast("B"))
+    return h.hexdigest()
+
+
+@dataclass(frozen=True)
+class ImageEncodeOptions:
+    """How images are encoded for upload to a provider."""
+    format: str = "PNG"  # PNG, JPEG or WEBP
+    quality: int = 90  # JPEG / WEBP quality (1-100)
+    compress_level: int = 6  # PNG zlib level (0-9); lower is faster, larger
+
+    @classmethod
+    def from_name(cls, name: str = "png", quality: int = 90, compress_level: int = 6) -> "ImageEncodeOptions":
+        fmt = (name or "png").upper()
+        if fmt == "JPG":
+            fmt = "JPEG"
+        if fmt not in _FORMAT_MIME:
+            raise ValueError(f"Unsupported image format: {name}")
+        return cls(
+            format=fmt,
+            quality=max(1, min(100, int(quality))),
+            compress_level=max(0, min(9, int(compress_level))),
+        )
+
+    @property
+    def mime_type(self) -> str:
+        return _FORMAT_MIME[self.format]
+
+    def key(self) -> str:
+        """Short label identifying these options (used in cache keys)."""
+        if self.format == "PNG":
+            return f"png:{self.compress_level}"
+        return f"{self.format.lower()}:{self.quality}"
+
+
+DEFAULT_ENCODE_OPTIONS = ImageEncodeOptions()
+
+
+@dataclass(frozen=True)
+class EncodedImage:
+    """Encoded image bytes ready for upload."""
+    data: bytes
+    mime_type: str
+
+    def b64(self) -> str:
+        return base64.b64encode(self.data).decode("ascii")
+
+    def data_uri(self) -> str:
+        return f"data:{self.mime_type};base64,{self.b64()}"
+
+
+class EncodedImageCache:
+    """Thread-safe LRU of encoded images, bounded by total encoded size."""
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._items: OrderedDict[tuple[str, ImageEncodeOptions], EncodedImage] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key: tuple[str, ImageEncodeOptions]) -> EncodedImage | None:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                self._misses += 1
+                return None
+            self._items.move_to_end(key)
+            self._hits += 1
+            return item
+
+    def put(self, key: tuple[str, ImageEncodeOptions], item: EncodedImage) -> None:
+        size = len(item.data)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old.data)
+            self._items[key] = item
+            self._bytes += size
+            while self._bytes > self.max_bytes and self._items:
+                _, evicted = self._items.popitem(last=False)
+                self._bytes -= len(evicted.data)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._items),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+            }
+
+
+_ENCODED_CACHE = EncodedImageCache()
+
+
+def get_encoded_image_cache() -> EncodedImageCache:
+    """Get the process-wide encoded image cache."""
+    return _ENCODED_CACHE
+
+
+def _encode_pil(image: Image.Image, options: ImageEncodeOptions) -> bytes:
+    if options.format == "JPEG" and image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+
+    buffer = BytesIO()
+    if options.format == "PNG":
+        image.save(buffer, format="PNG", compress_level=options.compress_level)
+    elif options.format == "JPEG":
+        image.save(buffer, format="JPEG", quality=options.quality)
+    else:
+        image.save(buffer, format=options.format, quality=options.quality)
+    return buffer.getvalue()
+
+
+def _uint8_hash(arr: np.ndarray) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"u8|{arr.shape}".encode("ascii"))
+    h.update(memoryview(np.ascontiguousarray(arr)).cast("B"))
+    return h.hexdigest()
+
+
+def encode_image(
+    tensor: torch.Tensor,
+    options: ImageEncodeOptions | None = None,
+    use_cache: bool = True,
+) -> EncodedImage:
+    """
+    Encode a ComfyUI image tensor for upload, reusing earlier encodings.
+
+    Results are cached by a hash of the quantized uint8 pixels + options, so
+    the same image sent to several requests (XY sweeps, batches, retries) is
+    encoded once. The quantized array is needed for encoding anyway, and
+    hashing it covers every pixel at a quarter of the float32 size.
+
+    Args:
+        tensor: Shape (B, H, W, C) or (H, W, C); only the first image is used
+        options: Format / quality settings (default: PNG)
+        use_cache: Look up and store the result in the shared cache
+
+    Returns:
+        EncodedImage with raw bytes and MIME type
+    """
+    options = options or DEFAULT_ENCODE_OPTIONS
+    if tensor.dim() == 4:
+        tensor = tensor[0]
+
+    arr = tensor_to_uint8(tensor)
+    key = None
+    if use_cache:
+        key = (_uint8_hash(arr), options)
+        cached = _ENCODED_CACHE.get(key)
+        if cached is not None:
+            return cached
+
+    encoded = EncodedImage(_encode_pil(uint8_to_pil(arr), options), options.mime_type)
+    if key is not None:
+        _ENCODED_CACHE.put(key, encoded)
+    return encoded
+
+
+def tensor_to_uint8(tensor: torch.Tensor) -> np.ndarray:
+    """
+    Quantize a float image tensor (0-1) to a uint8 numpy array.
+
+    On GPU the scale / clamp / cast run on the device, so the tensor crosses
+    to the host at a quarter of the float32 size. On CPU the work is done in
+    cache-sized row chunks written straight into the uint8 output, avoiding
+    full-size float temporaries. Works on single images and whole batches.
+
+    Args:
+        tensor: Shape (..., H, W, C), values 0-1
+
+    Returns:
+        C-contiguous uint8 array of the same shape
+    """
+    t = tensor.detach()
+    if t.dtype == torch.uint8:
+        return t.cpu().contiguous().numpy()
+    if t.device.type != "cpu":
+        return (t * 255.0).clamp_(0, 255).to(torch.uint8).cpu().numpy()
+
+    src = t.float().contiguous().numpy()
+    out = np.empty(src.shape, dtype=np.uint8)
+    if src.size == 0:
+        return out
+    src2 = src.reshape(-1, src.shape[-2] * src.shape[-1])
+    out2 = out.reshape(src2.shape)
+    rows = max(1, _QUANT_CHUNK_BYTES // (src2.shape[1] * 4))
+    buf = np.empty((min(rows, src2.shape[0]), src2.shape[1]), dtype=np.float32)
+    for start in range(0, src2.shape[0], rows):
+        chunk = src2[start : start + rows]
+        b = buf[: chunk.shape[0]]
+        np.multiply(chunk, np.float32(255.0), out=b)
+        np.clip(b, 0, 255, out=b)
+        out2[start : start + rows] = b
+    return out
+
+
 def tensor_to_pil(tensor: torch.Tensor) -> Image.Image:
     """
     Convert ComfyUI tensor to PIL Image.
@@ -20,14 +265,13 @@ def tensor_to_pil(tensor: torch.Tensor) -> Image.Image:
     """
     if tensor.dim() == 4:
         tensor = tensor[0]  # Take first image from batch
+    return uint8_to_pil(tensor_to_uint8(tensor))
 
-    # Convert to numpy and scale to 0-255
-    arr = (tensor.cpu().numpy() * 255).astype(np.uint8)
 
-    # Handle different channel counts
+def uint8_to_pil(arr: np.ndarray) -> Image.Image:
+    """Wrap an (H, W, C) uint8 array as a PIL Image (L / RGB / RGBA by channel count)."""
     if arr.shape[-1] == 1:
-        arr = arr.squeeze(-1)
-        return Image.fromarray(arr, mode='L')
+        return Image.fromarray(arr[..., 0], mode='L')
     elif arr.shape[-1] == 3:
         return Image.fromarray(arr, mode='RGB')
     elif arr.shape[-1] == 4:
@@ -36,15 +280,42 @@ def tensor_to_pil(tensor: torch.Tensor) -> Image.Image:
         raise ValueError(f"Unsupported channel count: {arr.shape[-1]}")
 
 
-def pil_to_tensor(image: Image.Image) -> torch.Tensor:
+def empty_image(
+    height: int,
+    width: int,
+    channels: int = 3,
+    batch: int = 1,
+    pin_memory: bool = False,
+) -> torch.Tensor:
+    """
+    Allocate an uninitialized (B, H, W, C) float32 image tensor.
+
+    With `pin_memory` (and CUDA available) the buffer is page-locked, so a
+    later `.to("cuda", non_blocking=True)` is a direct async DMA.
+    """
+    pin = pin_memory and torch.cuda.is_available()
+    return torch.empty((batch, height, width, channels), dtype=torch.float32, pin_memory=pin)
+
+
+def pil_to_tensor(
+    image: Image.Image,
+    out: torch.Tensor | None = None,
+    pin_memory: bool = False,
+) -> torch.Tensor:
     """
     Convert PIL Image to ComfyUI tensor.
 
+    The pixel buffer is scaled straight into the float output in one pass,
+    without intermediate float arrays.
+
     Args:
         image: PIL Image
+        out: Optional preallocated float32 tensor, (H, W, C) or (1, H, W, C),
+            e.g. one slot of a batch from `empty_image`
+        pin_memory: Allocate the result in pinned memory (ignored with `out`)
 
     Returns:
-        Tensor shape (1, H, W, C), values 0-1
+        Tensor shape (1, H, W, C), values 0-1 (or `out`)
     """
     # Convert to RGB if needed
     if image.mode == 'RGBA':
@@ -52,16 +323,26 @@ def pil_to_tensor(image: Image.Image) -> torch.Tensor:
     elif image.mode != 'RGB':
         image = image.convert('RGB')
 
-    # Convert to tensor
-    arr = np.array(image).astype(np.float32) / 255.0
-    tensor = torch.from_numpy(arr)
+    # np.asarray takes the one unavoidable copy out of PIL
+    src = np.asarray(image)
+    if src.ndim == 2:  # Grayscale
+        src = src[..., None]
 
-    # Add batch dimension
-    if tensor.dim() == 2:  # Grayscale
-        tensor = tensor.unsqueeze(-1)
-    tensor = tensor.unsqueeze(0)
+    if out is None:
+        h, w, c = src.shape
+        out = empty_image(h, w, c, pin_memory=pin_memory)
+    dst = out[0] if out.dim() == 4 else out
+    if tuple(dst.shape) != src.shape:
+        raise ValueError(f"Output shape {tuple(dst.shape)} does not match image shape {src.shape}")
 
-    return tensor
+    if dst.device.type == "cpu" and dst.dtype == torch.float32 and dst.is_contiguous():
+        np.divide(src, np.float32(255.0), out=dst.numpy())
+    else:
+        # src is read-only but only read from, so torch's warning does not apply
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", UserWarning)
+            dst.copy_(torch.from_numpy(src)).div_(255.0)
+    return out
 
 
 def tensor_to_base64(tensor: torch.Tensor, format: str = "PNG") -> str:
@@ -75,30 +356,46 @@ def tensor_to_base64(tensor: torch.Tensor, format: str = "PNG") -> str:
     Returns:
         Base64 encoded string
     """
-    pil_image = tensor_to_pil(tensor)
+    return encode_image(tensor, ImageEncodeOptions.from_name(format)).b64()
 
-    # Convert RGBA to RGB for JPEG
-    if format.upper() == "JPEG" and pil_image.mode == "RGBA":
-        pil_image = pil_image.convert("RGB")
 
-    buffer = BytesIO()
-    pil_image.save(buffer, format=format)
-    return base64.b64encode(buffer.getvalue()).decode('utf-8')
+def bytes_to_tensor(
+    data: bytes | bytearray,
+    out: torch.Tensor | None = None,
+    pin_memory: bool = False,
+) -> torch.Tensor:
+    """
+    Decode encoded image bytes (PNG, JPEG, WEBP...) to a ComfyUI tensor.
 
+    Args:
+        data: Encoded image bytes
+        out: Optional preallocated float32 tensor to decode into (see `pil_to_tensor`)
+        pin_memory: Allocate the result in pinned memory
 
-def base64_to_tensor(b64_string: str) -> torch.Tensor:
+    Returns:
+        ComfyUI image tensor (1, H, W, C)
+    """
+    image = Image.open(BytesIO(data))
+    return pil_to_tensor(image, out=out, pin_memory=pin_memory)
+
+
+def base64_to_tensor(
+    b64_string: str,
+    out: torch.Tensor | None = None,
+    pin_memory: bool = False,
+) -> torch.Tensor:
     """
     Convert base64 string to ComfyUI tensor.
 
     Args:
         b64_string: Base64 encoded image
+        out: Optional preallocated float32 tensor to decode into (see `pil_to_tensor`)
+        pin_memory: Allocate the result in pinned memory
 
     Returns:
         ComfyUI image tensor (1, H, W, C)
     """
-    image_data = base64.b64decode(b64_string)
-    image = Image.open(BytesIO(image_data))
-    return pil_to_tensor(image)
+    return bytes_to_tensor(base64.b64decode(b64_string), out=out, pin_memory=pin_memory)
 
 
 def create_data_uri(tensor: torch.Tensor, mime_type: str = "image/png") -> str:
@@ -112,11 +409,115 @@ def create_data_uri(tensor: torch.Tensor, mime_type: str = "image/png") -> str:
     Returns:
         Data URI string
     """
-    format_map = {
-        "image/png": "PNG",
-        "image/jpeg": "JPEG",
-        "image/webp": "WEBP",
-    }
+    format_map = {mime: fmt for fmt, mime in _FORMAT_MIME.items()}
     format = format_map.get(mime_type, "PNG")
-    b64 = tensor_to_base64(tensor, format)
-    return f"data:{mime_type};base64,{b64}"
+    return encode_image(tensor, ImageEncodeOptions.from_name(format)).data_uri()
+
+
+def _match_channels(tensor: torch.Tensor, channels: int) -> torch.Tensor:
+    c = tensor.shape[-1]
+    if c == channels:
+        return tensor
+    if c == 1:
+        return tensor.expand(*tensor.shape[:-1], channels)
+    if c == 4 and channels == 3:
+        return tensor[..., :3]
+    if c == 3 and channels == 4:
+        alpha = torch.ones((*tensor.shape[:-1], 1), dtype=tensor.dtype, device=tensor.device)
+        return torch.cat([tensor, alpha], dim=-1)
+    raise ValueError(f"Cannot convert {c} channels to {channels}")
+
+
+def resize_images(tensor: torch.Tensor, height: int, width: int) -> torch.Tensor:
+    """Resize a (B, H, W, C) batch with antialiased bilinear filtering (on its own device)."""
+    # (B, H, W, C) -> (B, C, H, W) for interpolate, then back
+    x = tensor.permute(0, 3, 1, 2)
+    x = torch.nn.functional.interpolate(x, size=(height, width), mode="bilinear", align_corners=False, antialias=True)
+    return x.permute(0, 2, 3, 1).clamp(0.0, 1.0)
+
+
+def stack_images(
+    tensors: list[torch.Tensor],
+    mode: str = "letterbox",
+    fill: float = 0.0,
+) -> torch.Tensor:
+    """
+    Stack images of possibly different sizes into one (B, H, W, C) batch.
+
+    The first image's size is the target. Others are either letterboxed
+    (scaled to fit, aspect preserved, padded with `fill`) or stretched
+    (`mode="resize"`). Channel counts are matched to the first image.
+
+    Args:
+        tensors: List of (H, W, C) or (B, H, W, C) tensors
+        mode: "letterbox" or "resize"
+        fill: Padding value for letterboxing (0 = black)
+
+    Returns:
+        Tensor shape (B, H, W, C)
+    """
+    batches = [t.unsqueeze(0) if t.dim() == 3 else t for t in tensors]
+    if not batches:
+        raise ValueError("No images to stack")
+    if len(batches) == 1:
+        return batches[0]
+
+    _, height, width, channels = batches[0].shape
+    out = []
+    for t in batches:
+        t = _match_channels(t, channels)
+        h, w = t.shape[1], t.shape[2]
+        if (h, w) == (height, width):
+            out.append(t)
+            continue
+
+        if mode == "resize":
+            out.append(resize_images(t, height, width))
+            continue
+
+        scale = min(height / h, width / w)
+        new_h = max(1, min(height, round(h * scale)))
+        new_w = max(1, min(width, round(w * scale)))
+        scaled = resize_images(t, new_h, new_w)
+        canvas = scaled.new_full((t.shape[0], height, width, channels), fill)
+        top = (height - new_h) // 2
+        left = (width - new_w) // 2
+        canvas[:, top : top + new_h, left : left + new_w, :] = scaled
+        out.append(canvas)
+
+    return torch.cat(out, dim=0)
+
+
+_EXECUTOR: ThreadPoolExecutor | None = None
+_EXECUTOR_LOCK = threading.Lock()
+
+
+def get_image_executor() -> ThreadPoolExecutor:
+    """Get the shared, bounded worker pool for image work."""
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = ThreadPoolExecutor(max_workers=IMAGE_WORKERS, thread_name_prefix="simplechat-image")
+        return _EXECUTOR
+
+
+async def run_in_image_pool(fn, *args, **kwargs):
+    """Run a blocking image function in the worker pool without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_image_executor(), functools.partial(fn, *args, **kwargs))
+
+
+async def encode_images_async(
+    tensors: list[torch.Tensor],
+    options: ImageEncodeOptions | None = None,
+) -> list[EncodedImage]:
+    """Encode several images in parallel in the worker pool (see `encode_image`)."""
+    return list(await asyncio.gather(*[run_in_image_pool(encode_image, t, options) for t in tensors]))
+
+
+async def decode_images_async(images: list[str | bytes | bytearray]) -> list[torch.Tensor]:
+    """Decode several images (base64 strings or raw bytes) in parallel in the worker pool."""
+    return list(await asyncio.gather(*[
+        run_in_image_pool(base64_to_tensor if isinstance(data, str) else bytes_to_tensor, data)
+        for data in images
+    ]))
@@ -0,0 +1,118 @@
+"""
+Cancel in-flight provider requests when ComfyUI's Interrupt is pressed.
+
+ComfyUI signals an interrupt by setting a flag
+(`comfy.model_management.processing_interrupted()`); samplers poll it
+between steps, but an awaited HTTP request never looks at it. Request code
+runs inside `interruptible()`: one watcher task per event loop polls the
+flag and cancels every registered task, so the request is aborted and its
+connection released immediately. The cancellation is turned into ComfyUI's
+`InterruptProcessingException`, which the executor reports as an interrupt
+rather than an error.
+
+The flag is left set (ComfyUI resets it when the next prompt starts), so
+every other request of the interrupted prompt is cancelled as well.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import weakref
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+try:
+    import comfy.model_management as _model_management
+except ImportError:
+    _model_management = None
+
+
+# How often the watcher checks the interrupt flag (seconds)
+POLL_INTERVAL = 0.1
+
+if _model_management is not None:
+    ProcessingInterrupted = _model_management.InterruptProcessingException
+else:
+    class ProcessingInterrupted(Exception):
+        """Raised when a request is cancelled by an interrupt (outside ComfyUI)."""
+
+
+def is_interrupted() -> bool:
+    """True while ComfyUI's Interrupt flag is set (always False outside ComfyUI)."""
+    if _model_management is None:
+        return False
+    return bool(_model_management.processing_interrupted())
+
+
+class _Watcher:
+    """Polls the interrupt flag for the tasks registered on one loop."""
+
+    def __init__(self):
+        self.tasks: dict[asyncio.Task, int] = {}
+        self.interrupted: "weakref.WeakSet[asyncio.Task]" = weakref.WeakSet()
+        self.poller: asyncio.Task | None = None
+
+    def register(self, task: asyncio.Task) -> None:
+        self.tasks[task] = self.tasks.get(task, 0) + 1
+        if self.poller is None or self.poller.done():
+            self.poller = asyncio.get_running_loop().create_task(self._poll())
+
+    def unregister(self, task: asyncio.Task) -> None:
+        depth = self.tasks.get(task, 0) - 1
+        if depth > 0:
+            self.tasks[task] = depth
+        else:
+            self.tasks.pop(task, None)
+
+    async def _poll(self) -> None:
+        while self.tasks:
+            if is_interrupted():
+                for task in list(self.tasks):
+                    if task not in self.interrupted and not task.done():
+                        self.interrupted.add(task)
+                        task.cancel()
+            await asyncio.sleep(POLL_INTERVAL)
+
+
+_WATCHERS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _Watcher]" = weakref.WeakKeyDictionary()
+
+
+def _get_watcher() -> _Watcher:
+    loop = asyncio.get_running_loop()
+    watcher = _WATCHERS.get(loop)
+    if watcher is None:
+        watcher = _Watcher()
+        _WATCHERS[loop] = watcher
+    return watcher
+
+
+@asynccontextmanager
+async def interruptible() -> AsyncIterator[None]:
+    """
+    Cancel the enclosed work if ComfyUI is interrupted.
+
+    Raises:
+        ProcessingInterrupted: the work was cancelled by an interrupt
+    """
+    if _model_management is None:
+        yield
+        return
+    if is_interrupted():
+        raise ProcessingInterrupted()
+
+    task = asyncio.current_task()
+    watcher = _get_watcher()
+    watcher.register(task)
+    try:
+        yield
+    except asyncio.CancelledError:
+        if task not in watcher.interrupted:
+            raise
+        watcher.interrupted.discard(task)
+        # Our cancel, not the caller's: don't leave the task marked as cancelling
+        uncancel = getattr(task, "uncancel", None)
+        if uncancel is not None:
+            uncancel()
+        raise ProcessingInterrupted() from None
+    finally:
+        watcher.unregister(task)
@@ -0,0 +1,243 @@
+"""
+Incremental JSON parsing for responses that carry large inline binaries.
+
+Gemini returns generated images as base64 strings inside the JSON body
+(`inlineData.data`). Parsing that with `resp.json()` holds the full body
+text, then the decoded dict, then the decoded bytes. `InlineDataParser` is
+fed the body chunk by chunk instead:
+
+- string values under the configured keys (`data`) of objects under the
+  configured parent keys (`inlineData` / `inline_data`) are base64-decoded
+  on the fly into a byte buffer and never stored as text; a value that
+  turns out not to be base64 is kept as a string
+- everything else is copied into a small "skeleton" document that is parsed
+  with `json.loads` at the end, with the decoded bytes put back in place
+"""
+
+from __future__ import annotations
+
+import binascii
+import json
+import re
+from typing import Any, Iterable
+
+
+_OUT, _STRING, _BINARY = 0, 1, 2
+
+# Strings longer than this are never treated as object keys
+_MAX_KEY_LENGTH = 64
+
+_MARKER = "\x00inline:"
+
+_BASE64_CHARS = re.compile(rb"[A-Za-z0-9+/=]*")
+# What may be left undecoded when a base64 value ends (at most one padded group)
+_BASE64_TAIL = re.compile(rb"(?:[A-Za-z0-9+/]{2}==|[A-Za-z0-9+/]{3}=)?")
+
+_OPENERS = frozenset(b"{[")
+_CLOSERS = frozenset(b"}]")
+_WHITESPACE = frozenset(b" \t\r\n")
+
+
+class InlineDataParser:
+    """
+    Feed a JSON body in chunks; base64 strings under `keys` come back as bytes.
+
+    Only values of objects that are themselves the value of one of
+    `parents` are decoded (`parents=None` decodes `keys` anywhere).
+    """
+
+    def __init__(
+        self,
+        keys: Iterable[str] = ("data",),
+        parents: Iterable[str] | None = ("inlineData", "inline_data"),
+    ):
+        self._keys = {k.encode("utf-8") for k in keys}
+        self._parents = None if parents is None else {p.encode("utf-8") for p in parents}
+        # Per open object / array: (opening byte, key it is the value of)
+        self._stack: list[tuple[int, bytes]] = []
+        self._skeleton = bytearray()
+        self._blobs: list[bytearray] = []
+        self._state = _OUT
+        self._escape = False
+        self._string = bytearray()  # current string (capped), for key detection
+        self._last_string = b""  # last complete string seen outside binaries
+        self._prev = b""  # last significant byte outside strings
+        self._pending = bytearray()  # base64 characters not yet decoded
+
+    @property
+    def binary_bytes(self) -> int:
+        """Decoded binary bytes so far."""
+        return sum(len(b) for b in self._blobs)
+
+    def feed(self, chunk: bytes) -> None:
+        pos, n = 0, len(chunk)
+        while pos < n:
+            if self._state == _OUT:
+                q = chunk.find(b'"', pos)
+                end = n if q == -1 else q
+                seg = chunk[pos:end]
+                self._skeleton += seg
+                self._structure(seg)
+                if q == -1:
+                    return
+                pos = q + 1
+                if self._binary_value():
+                    self._state = _BINARY
+                    self._blobs.append(bytearray())
+                    self._pending.clear()
+                else:
+                    self._state = _STRING
+                    self._skeleton += b'"'
+                    self._string.clear()
+
+            elif self._state == _STRING:
+                if self._escape:
+                    self._skeleton += chunk[pos : pos + 1]
+                    self._capture(chunk[pos : pos + 1])
+                    self._escape = False
+                    pos += 1
+                    continue
+                q = chunk.find(b'"', pos)
+                b = chunk.find(b"\\", pos)
+                if b != -1 and (q == -1 or b < q):
+                    self._skeleton += chunk[pos : b + 1]
+                    self._capture(chunk[pos : b + 1])
+                    self._escape = True
+                    pos = b + 1
+                    continue
+                end = n if q == -1 else q
+                self._skeleton += chunk[pos:end]
+                self._capture(chunk[pos:end])
+                if q == -1:
+                    return
+                self._skeleton += b'"'
+                self._last_string = bytes(self._string) if len(self._string) <= _MAX_KEY_LENGTH else b""
+                self._prev = b'"'
+                self._state = _OUT
+                pos = q + 1
+
+            else:  # _BINARY
+                if self._escape:
+                    # JSON may escape "/" as "\/"; any other escape isn't base64
+                    if chunk[pos : pos + 1] != b"/":
+                        self._to_string(b"\\")
+                        continue
+                    self._escape = False
+                    if not self._add_base64(b"/"):
+                        self._to_string()
+                        continue
+                    pos += 1
+                    continue
+                q = chunk.find(b'"', pos)
+                b = chunk.find(b"\\", pos)
+                end = n if q == -1 else q
+                if b != -1 and b < end:
+                    end = b
+                if not self._add_base64(chunk[pos:end]):
+                    self._to_string()
+                    continue  # re-read this segment as a plain string
+                pos = end
+                if pos == n:
+                    return
+                if chunk[pos] == 0x5C:  # backslash
+                    self._escape = True
+                    pos += 1
+                    continue
+                # Closing quote
+                if not _BASE64_TAIL.fullmatch(self._pending):
+                    self._to_string()
+                    continue
+                if self._pending:
+                    self._blobs[-1] += binascii.a2b_base64(self._pending)
+                    self._pending.clear()
+                marker = json.dumps(f"{_MARKER}{len(self._blobs) - 1}")
+                self._skeleton += marker.encode("ascii")
+                self._last_string = b""
+                self._prev = b'"'
+                self._state = _OUT
+                pos = q + 1
+
+    def _structure(self, seg: bytes) -> None:
+        """Track nesting and the last significant byte in text outside strings."""
+        for c in seg:
+            if c in _WHITESPACE:
+                continue
+            if c in _OPENERS:
+                self._stack.append((c, self._last_string if self._prev == b":" else b""))
+            elif c in _CLOSERS and self._stack:
+                self._stack.pop()
+            self._prev = bytes((c,))
+
+    def _binary_value(self) -> bool:
+        """Whether the string starting now is a value to decode."""
+        if self._prev != b":" or self._last_string not in self._keys:
+            return False
+        if self._parents is None:
+            return True
+        return bool(self._stack) and self._stack[-1][0] == 0x7B and self._stack[-1][1] in self._parents
+
+    def _add_base64(self, seg: bytes) -> bool:
+        """Decode base64 text as it arrives; False if the value can't be base64."""
+        if not seg:
+            return True
+        if not _BASE64_CHARS.fullmatch(seg):
+            return False
+        pending = self._pending
+        if b"=" in pending and seg.strip(b"="):
+            return False  # data after padding
+        pending += seg
+        eq = pending.find(b"=")
+        usable = (len(pending) if eq == -1 else eq) // 4 * 4
+        if usable:
+            self._blobs[-1] += binascii.a2b_base64(memoryview(pending)[:usable])
+            del pending[:usable]
+        return True
+
+    def _to_string(self, carry: bytes = b"") -> None:
+        """
+        Not base64 after all: emit what was consumed as a normal string and
+        continue in string mode. Only whole unpadded groups were decoded, so
+        re-encoding them gives back the original text.
+        """
+        blob = self._blobs.pop()
+        self._skeleton += b'"' + binascii.b2a_base64(blob, newline=False) + self._pending + carry
+        self._pending.clear()
+        self._string.clear()
+        self._escape = bool(carry)
+        self._state = _STRING
+
+    def _capture(self, seg: bytes) -> None:
+        if len(self._string) <= _MAX_KEY_LENGTH:
+            self._string += seg[: _MAX_KEY_LENGTH + 1]
+
+    def close(self) -> Any:
+        """Finish parsing and return the document, binaries as `bytearray` (no extra copy)."""
+        if self._state != _OUT:
+            raise ValueError("Incomplete JSON response")
+        doc = json.loads(self._skeleton.decode("utf-8"))
+        blobs = self._blobs
+
+        def _restore(value: Any) -> Any:
+            if isinstance(value, str) and value.startswith(_MARKER):
+                return blobs[int(value[len(_MARKER):])]
+            if isinstance(value, dict):
+                return {k: _restore(v) for k, v in value.items()}
+            if isinstance(value, list):
+                return [_restore(v) for v in value]
+            return value
+
+        return _restore(doc)
+
+
+def parse_with_inline_data(
+    body: bytes,
+    keys: Iterable[str] = ("data",),
+    parents: Iterable[str] | None = ("inlineData", "inline_data"),
+    chunk_size: int = 1 << 18,
+) -> Any:
+    """Parse a complete body with `InlineDataParser` (mainly for tests and tools)."""
+    parser = InlineDataParser(keys, parents)
+    view = memoryview(body)
+    for start in range(0, len(view), chunk_size):
+        parser.feed(bytes(view[start : start + chunk_size]))
+    return parser.close()
@@ -0,0 +1,125 @@
+"""
+Streaming JSON request bodies.
+
+Providers put `InlineBase64` placeholders where a payload holds base64 image
+data. When the request is sent, the JSON envelope is serialized on its own
+(small) and the base64 text is produced chunk by chunk from the encoded
+image bytes while the body is written to the socket. No full-size base64
+string or serialized body is ever built, so memory per in-flight request
+stays roughly constant regardless of image size.
+
+The body length is known up front (base64 length is a function of the byte
+count), so requests carry a normal Content-Length instead of relying on
+chunked transfer encoding, which some proxies reject.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+import uuid
+from typing import Any, Iterator
+
+from aiohttp import payload as aiohttp_payload
+
+
+# Raw bytes per base64 chunk (multiple of 3, so chunks concatenate cleanly)
+CHUNK_BYTES = 3 * 64 * 1024
+
+
+class InlineBase64:
+    """A JSON string value `prefix + base64(data)`, encoded lazily at send time."""
+
+    __slots__ = ("data", "prefix")
+
+    def __init__(self, data: bytes, prefix: str = ""):
+        self.data = data
+        self.prefix = prefix
+
+    def __len__(self) -> int:
+        return len(self.prefix) + 4 * ((len(self.data) + 2) // 3)
+
+    def chunks(self, chunk_bytes: int = CHUNK_BYTES) -> Iterator[bytes]:
+        """Yield the value as ASCII bytes, a bounded chunk at a time."""
+        if self.prefix:
+            yield self.prefix.encode("ascii")
+        view = memoryview(self.data)
+        for start in range(0, len(view), chunk_bytes):
+            yield base64.b64encode(view[start : start + chunk_bytes])
+
+    def __str__(self) -> str:
+        return self.prefix + base64.b64encode(self.data).decode("ascii")
+
+
+def has_inline(value: Any) -> bool:
+    """True if a payload contains any `InlineBase64` placeholder."""
+    stack = [value]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, InlineBase64):
+            return True
+        if isinstance(item, dict):
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple)):
+            stack.extend(item)
+    return False
+
+
+def materialize(value: Any) -> Any:
+    """Copy of a payload with placeholders replaced by plain strings (for logging / fallbacks)."""
+    if isinstance(value, InlineBase64):
+        return str(value)
+    if isinstance(value, dict):
+        return {k: materialize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [materialize(v) for v in value]
+    return value
+
+
+def _split_envelope(value: Any) -> list[bytes | InlineBase64]:
+    """Serialize `value` with placeholders cut out: [envelope bytes, placeholder, envelope bytes, ...]."""
+    inlines: dict[str, InlineBase64] = {}
+    token = uuid.uuid4().hex
+
+    def _default(obj: Any) -> str:
+        if isinstance(obj, InlineBase64):
+            marker = f"@@{token}:{len(inlines)}@@"
+            inlines[marker] = obj
+            return marker
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+    text = json.dumps(value, default=_default)
+    parts: list[bytes | InlineBase64] = []
+    pos = 0
+    for marker, inline in inlines.items():
+        idx = text.index(marker, pos)
+        parts.append(text[pos:idx].encode("utf-8"))
+        parts.append(inline)
+        pos = idx + len(marker)
+    parts.append(text[pos:].encode("utf-8"))
+    return parts
+
+
+class StreamingJsonPayload(aiohttp_payload.Payload):
+    """aiohttp request body that streams a JSON payload containing `InlineBase64` values."""
+
+    _autoclose = True
+
+    def __init__(self, value: Any, content_type: str = "application/json", **kwargs: Any):
+        super().__init__(value, content_type=content_type, **kwargs)
+        self._parts = _split_envelope(value)
+        self._size = sum(len(p) for p in self._parts)
+
+    async def write(self, writer) -> None:
+        for part in self._parts:
+            if isinstance(part, bytes):
+                await writer.write(part)
+            else:
+                for chunk in part.chunks():
+                    await writer.write(chunk)
+
+    def decode(self, encoding: str = "utf-8", errors: str = "strict") -> str:
+        return "".join(
+            part.decode(encoding, errors) if isinstance(part, bytes) else str(part)
+            for part in self._parts
+        )
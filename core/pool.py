@@ -0,0 +1,163 @@
+"""
+Endpoint / API key pools with load balancing.
+
+A config may list several base URLs (gateways, vLLM replicas) and several
+API keys. Every (base_url, api_key) combination is a pool member, and
+`get_provider` picks one member per provider instance:
+
+- least_outstanding: fewest requests currently in flight.
+- ewma_latency: lowest EWMA of time-to-response-headers, weighted by the
+  requests in flight (members without samples are tried first).
+
+Ties (members sharing the best score) are broken round-robin with a
+per-pool counter, so a burst of picks made before any request starts is
+still spread evenly. Members whose endpoint circuit breaker is open are
+skipped while any other member is available.
+
+Rate limiters are per (provider, base_url, api_key), so spreading requests
+over N keys gives N times the per-key RPM / TPM budget.
+
+Member state is process-wide and lock-protected (no asyncio primitives),
+like the rate limiter and circuit breaker.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+from typing import Callable
+
+
+BALANCE_STRATEGIES = ["least_outstanding", "ewma_latency"]
+
+# Weight of the newest latency sample in the EWMA
+EWMA_ALPHA = 0.3
+
+# Latency sample (seconds) recorded for a failed attempt, at least; a dead
+# endpoint refusing connections must not look like the fastest one
+FAILURE_LATENCY = 10.0
+
+
+def split_pool(text: str) -> list[str]:
+    """Split a pool field (one entry per line, or comma-separated) into entries."""
+    entries = []
+    for line in (text or "").replace(",", "\n").splitlines():
+        line = line.strip()
+        if line and line not in entries:
+            entries.append(line)
+    return entries
+
+
+class PoolMember:
+    """Load statistics for one (provider, base_url, api_key)."""
+
+    def __init__(self, provider: str, base_url: str, api_key: str, pool: str):
+        self._lock = threading.Lock()
+        self.provider = provider
+        self.base_url = base_url
+        self.api_key = api_key
+        # Primary base_url of the pool (members of one pool answer alike)
+        self.pool = pool
+        self.outstanding = 0
+        self.ewma = 0.0
+        self.requests = 0
+
+    def start(self) -> None:
+        with self._lock:
+            self.outstanding += 1
+            self.requests += 1
+
+    def finish(self) -> None:
+        with self._lock:
+            self.outstanding = max(0, self.outstanding - 1)
+
+    def observe(self, latency: float, failed: bool = False) -> None:
+        """Add a time-to-response-headers sample (seconds)."""
+        if failed:
+            latency = max(latency, FAILURE_LATENCY)
+        with self._lock:
+            self.ewma = latency if not self.ewma else EWMA_ALPHA * latency + (1 - EWMA_ALPHA) * self.ewma
+
+    def score(self, strategy: str) -> float:
+        if strategy == "ewma_latency":
+            return self.ewma * (self.outstanding + 1)
+        return float(self.outstanding)
+
+    def stats(self) -> dict:
+        return {
+            "provider": self.provider,
+            "base_url": self.base_url,
+            "key_id": _key_id(self.api_key)[:8],
+            "outstanding": self.outstanding,
+            "ewma_latency": self.ewma,
+            "requests": self.requests,
+        }
+
+
+_MEMBERS: dict[tuple[str, str, str], PoolMember] = {}
+_MEMBERS_LOCK = threading.Lock()
+# Round-robin position per pool (provider, base_urls, key ids)
+_ROTATIONS: dict[tuple, int] = {}
+
+
+def _key_id(api_key: str) -> str:
+    return hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:16]
+
+
+def get_pool_member(provider: str, base_url: str, api_key: str, pool: str = "") -> PoolMember:
+    """Get the shared member state for (provider, base_url, api_key)."""
+    base_url = (base_url or "").strip().rstrip("/")
+    key = (provider, base_url, _key_id(api_key))
+    with _MEMBERS_LOCK:
+        member = _MEMBERS.get(key)
+        if member is None:
+            member = _MEMBERS[key] = PoolMember(provider, base_url, api_key, pool or base_url)
+    return member
+
+
+def pick_member(
+    provider: str,
+    base_urls: list[str],
+    api_keys: list[str],
+    strategy: str = "least_outstanding",
+    available: Callable[[str], bool] | None = None,
+    avoid: PoolMember | None = None,
+) -> PoolMember:
+    """
+    Pick the member to use from every (base_url, api_key) combination.
+
+    `available(base_url)` reports endpoint health (the circuit breaker);
+    unhealthy members are only picked when no member is healthy. `avoid`
+    (e.g. the member a hedged request is duplicating) is only picked when
+    it is the only choice; such picks don't advance the round-robin.
+    """
+    pool = (base_urls[0] if base_urls else "").strip().rstrip("/")
+    members = [
+        get_pool_member(provider, url, key, pool)
+        for url in base_urls or [""]
+        for key in api_keys or [""]
+    ]
+    if available is not None:
+        healthy = [m for m in members if available(m.base_url)]
+        members = healthy or members
+    if avoid is not None:
+        members = [m for m in members if m is not avoid] or members
+
+    scores = [m.score(strategy) for m in members]
+    best = min(scores)
+    tied = [m for m, score in zip(members, scores) if score == best]
+    if len(tied) == 1:
+        return tied[0]
+    rotation = (provider, tuple(base_urls), tuple(_key_id(k) for k in api_keys))
+    with _MEMBERS_LOCK:
+        position = _ROTATIONS.get(rotation, 0)
+        if avoid is None:
+            _ROTATIONS[rotation] = position + 1
+    return tied[position % len(tied)]
+
+
+def pool_stats() -> list[dict]:
+    """Load statistics of every pool member used so far (for the status route)."""
+    with _MEMBERS_LOCK:
+        members = list(_MEMBERS.values())
+    return [m.stats() for m in members]
@@ -0,0 +1,60 @@
+"""
+Push live progress from running nodes to the frontend.
+
+Streaming chat nodes send their partial text over the ComfyUI websocket
+(`PromptServer.send_sync`); `web/stream_preview.js` renders it on the node.
+"""
+
+from __future__ import annotations
+
+import time
+
+try:
+    from server import PromptServer
+    HAS_SERVER = True
+except ImportError:
+    HAS_SERVER = False
+
+
+STREAM_EVENT = "simplechat.stream"
+
+
+class StreamReporter:
+    """
+    Accumulate streamed text deltas and forward them to the UI.
+
+    Updates are throttled to `min_interval` seconds so long outputs don't
+    flood the websocket; `finish()` always sends the final text.
+    """
+
+    def __init__(self, node_id: str | None, min_interval: float = 0.1):
+        self.node_id = node_id
+        self.min_interval = min_interval
+        self._parts: list[str] = []
+        self._last_sent = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return HAS_SERVER and bool(self.node_id)
+
+    def __call__(self, delta: str) -> None:
+        self._parts.append(delta)
+        now = time.monotonic()
+        if now - self._last_sent >= self.min_interval:
+            self._last_sent = now
+            self._send(done=False)
+
+    def finish(self, text: str | None = None) -> None:
+        if text is not None:
+            self._parts = [text]
+        self._send(done=True)
+
+    def _send(self, done: bool) -> None:
+        if not self.enabled:
+            return
+        server = PromptServer.instance
+        server.send_sync(
+            STREAM_EVENT,
+            {"node": str(self.node_id), "text": "".join(self._parts), "done": done},
+            server.client_id,
+        )
@@ -1,10 +1,13 @@
 """
 Provider implementations for SimpleChat.
 """
-from .base import BaseProvider, ChatResponse, ChatConfig
+from .base import APIError, BaseProvider, ChatResponse, ChatConfig, RequestTimeouts, RequestTimeoutError
 from .openai import OpenAIProvider
 from .claude import ClaudeProvider
 from .gemini import GeminiProvider
+from ..ratelimit import get_rate_limiter
+from ..breaker import get_circuit_breaker, is_available
+from ..pool import PoolMember, pick_member
 
 
 PROVIDERS = {
@@ -14,18 +17,64 @@ PROVIDERS = {
 }
 
 
-def get_provider(config: ChatConfig) -> BaseProvider:
-    """Get provider instance from config."""
+def get_provider(config: ChatConfig, avoid: PoolMember | None = None) -> BaseProvider:
+    """
+    Get provider instance from config.
+
+    With several endpoints / keys configured, each call picks one pool
+    member (see core/pool.py); call it per request to spread load. `avoid`
+    steers the pick away from one member while others are available.
+    """
     provider_cls = PROVIDERS.get(config.provider)
     if not provider_cls:
         raise ValueError(f"Unknown provider: {config.provider}")
-    return provider_cls(api_key=config.api_key, base_url=config.base_url or None)
+    provider = provider_cls(
+        api_key=config.api_key,
+        base_url=config.base_url or None,
+        retry_policy=config.retry_policy(),
+        image_options=config.image_options(),
+        raw_mode=config.raw_response,
+        timeouts=config.timeouts(),
+        hedging=config.hedge_policy(),
+    )
+    urls = config.endpoint_pool()
+    keys = config.key_pool()
+    if len(urls) > 1 or len(keys) > 1:
+        member = pick_member(
+            provider.name,
+            list(dict.fromkeys(url or provider.default_base_url for url in urls)),
+            keys,
+            config.load_balance,
+            available=(lambda url: is_available(provider.name, url)) if config.circuit_breaker else None,
+            avoid=avoid,
+        )
+        provider.base_url = member.base_url
+        provider.api_key = member.api_key
+        provider.pool_member = member
+        # Hedged duplicates go to another member
+        provider.alternate = lambda: get_provider(config, avoid=member)
+    provider.rate_limiter = get_rate_limiter(
+        provider.name,
+        provider.base_url,
+        provider.api_key,
+        rpm=config.rpm,
+        tpm=config.tpm,
+        learn=config.learn_rate_limits,
+    )
+    if config.circuit_breaker:
+        provider.circuit_breaker = get_circuit_breaker(
+            provider.name, provider.base_url, config.breaker_policy()
+        )
+    return provider
 
 
 __all__ = [
+    "APIError",
     "BaseProvider",
     "ChatResponse",
     "ChatConfig",
+    "RequestTimeouts",
+    "RequestTimeoutError",
     "OpenAIProvider",
     "ClaudeProvider",
     "GeminiProvider",
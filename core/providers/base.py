@@ -1,18 +1,70 @@
 """
 Base provider class for LLM API integrations.
 """
+import asyncio
+import json
+import time
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
-from typing import Any
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable
+import aiohttp
 import torch
 
+from ..breaker import BreakerPolicy, CircuitBreaker
+from ..hedge import HedgePolicy, LatencyTracker, get_latency_tracker
+from ..image_utils import EncodedImage, ImageEncodeOptions, encode_images_async
+from ..interrupt import interruptible
+from ..jsonstream import InlineDataParser
+from ..payload import StreamingJsonPayload, has_inline
+from ..pool import PoolMember
+from ..response import ChatResponse
+from ..ratelimit import RateLimiter, estimate_tokens
+from ..retry import RetryPolicy, parse_retry_after
+from ..session import get_session
 
-@dataclass
-class ChatResponse:
-    """Unified response from any LLM provider."""
-    text: str
-    image: torch.Tensor | None = None
-    raw_response: dict | None = None
+
+# Read size when parsing large responses incrementally
+RESPONSE_CHUNK_BYTES = 256 * 1024
+
+
+class APIError(RuntimeError):
+    """Non-200 response from a provider API."""
+
+    def __init__(self, provider: str, status: int, body: str, headers: dict[str, str] | None = None):
+        super().__init__(f"{provider} API error {status}: {body}")
+        self.status = status
+        self.body = body
+        self.headers = headers or {}
+
+
+class RequestTimeoutError(asyncio.TimeoutError):
+    """A request phase (connect, first byte, idle) exceeded its timeout."""
+
+    def __init__(self, provider: str, phase: str, seconds: float):
+        super().__init__(f"{provider} {phase} timeout after {seconds:g}s")
+        self.phase = phase
+        self.seconds = seconds
+
+
+@dataclass(frozen=True)
+class RequestTimeouts:
+    """Per-phase request timeouts in seconds (0 = no limit)."""
+    # TCP connect to the API host
+    connect: float = 30.0
+    # From sending the request (body upload included) to the response headers
+    first_byte: float = 600.0
+    # Longest gap between two chunks of the response body / stream
+    idle: float = 120.0
+    # Whole attempt, connect to last byte
+    total: float = 1200.0
+
+    def client_timeout(self) -> aiohttp.ClientTimeout:
+        # first_byte / idle are enforced around the awaits themselves (see BaseProvider)
+        return aiohttp.ClientTimeout(
+            total=self.total or None,
+            sock_connect=self.connect or None,
+        )
 
 
 @dataclass
@@ -22,6 +74,36 @@ class ChatConfig:
     api_key: str
     base_url: str
     model: str
+    # Retry policy (see core/retry.py)
+    max_retries: int = 3
+    retry_max_elapsed: float = 120.0
+    # Shared rate limit per (provider, base_url, api_key); 0 = unlimited
+    rpm: int = 0
+    tpm: int = 0
+    learn_rate_limits: bool = False
+    # Upload encoding for attached images
+    image_format: str = "png"
+    image_quality: int = 90
+    png_compress_level: int = 6
+    # How ChatResponse keeps the provider JSON (see core/response.py)
+    raw_response: str = "trim"
+    # Per-phase request timeouts in seconds, 0 = no limit (see RequestTimeouts)
+    connect_timeout: float = 30.0
+    first_byte_timeout: float = 600.0
+    idle_timeout: float = 120.0
+    total_timeout: float = 1200.0
+    # Extra endpoints / keys pooled with base_url / api_key (see core/pool.py)
+    base_urls: list[str] = field(default_factory=list)
+    api_keys: list[str] = field(default_factory=list)
+    load_balance: str = "least_outstanding"
+    # Fail fast while the endpoint looks down (see core/breaker.py)
+    circuit_breaker: bool = True
+    breaker_error_rate: float = 0.5
+    breaker_cooldown: float = 30.0
+    # Race a duplicate request when the response is slow (see core/hedge.py)
+    hedge: bool = False
+    hedge_delay: float = 0.0
+    hedge_budget_percent: float = 5.0
 
     def to_dict(self) -> dict:
         return {
@@ -29,15 +111,95 @@ class ChatConfig:
             "api_key": self.api_key,
             "base_url": self.base_url,
             "model": self.model,
+            "max_retries": self.max_retries,
+            "retry_max_elapsed": self.retry_max_elapsed,
+            "rpm": self.rpm,
+            "tpm": self.tpm,
+            "learn_rate_limits": self.learn_rate_limits,
+            "image_format": self.image_format,
+            "image_quality": self.image_quality,
+            "png_compress_level": self.png_compress_level,
+            "raw_response": self.raw_response,
+            "connect_timeout": self.connect_timeout,
+            "first_byte_timeout": self.first_byte_timeout,
+            "idle_timeout": self.idle_timeout,
+            "total_timeout": self.total_timeout,
+            "circuit_breaker": self.circuit_breaker,
+            "breaker_error_rate": self.breaker_error_rate,
+            "breaker_cooldown": self.breaker_cooldown,
+            "base_urls": list(self.base_urls),
+            "api_keys": list(self.api_keys),
+            "load_balance": self.load_balance,
+            "hedge": self.hedge,
+            "hedge_delay": self.hedge_delay,
+            "hedge_budget_percent": self.hedge_budget_percent,
         }
 
+    def endpoint_pool(self) -> list[str]:
+        """base_url followed by the extra pooled endpoints (duplicates removed)."""
+        urls = [self.base_url] + [u for u in self.base_urls if u]
+        return list(dict.fromkeys(u.strip().rstrip("/") for u in urls))
+
+    def key_pool(self) -> list[str]:
+        """api_key followed by the extra pooled keys (duplicates removed)."""
+        return list(dict.fromkeys([self.api_key] + [k for k in self.api_keys if k]))
+
+    def retry_policy(self) -> RetryPolicy:
+        return RetryPolicy(max_retries=self.max_retries, max_elapsed=self.retry_max_elapsed)
+
+    def timeouts(self) -> RequestTimeouts:
+        return RequestTimeouts(
+            connect=self.connect_timeout,
+            first_byte=self.first_byte_timeout,
+            idle=self.idle_timeout,
+            total=self.total_timeout,
+        )
+
+    def hedge_policy(self) -> HedgePolicy | None:
+        if not self.hedge:
+            return None
+        return HedgePolicy(delay=self.hedge_delay, budget=self.hedge_budget_percent / 100.0)
+
+    def breaker_policy(self) -> BreakerPolicy:
+        return BreakerPolicy(error_rate=self.breaker_error_rate, cooldown=self.breaker_cooldown)
+
+    def image_options(self) -> ImageEncodeOptions:
+        return ImageEncodeOptions.from_name(self.image_format, self.image_quality, self.png_compress_level)
+
 
 class BaseProvider(ABC):
     """Abstract base class for LLM providers."""
 
-    def __init__(self, api_key: str, base_url: str | None = None):
+    # Short id used as the session pool key (matches PROVIDERS keys)
+    name: str = ""
+    # Human-readable name used in error messages
+    display_name: str = ""
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str | None = None,
+        retry_policy: RetryPolicy | None = None,
+        rate_limiter: RateLimiter | None = None,
+        image_options: ImageEncodeOptions | None = None,
+        raw_mode: str = "trim",
+        timeouts: RequestTimeouts | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        hedging: HedgePolicy | None = None,
+    ):
         self.api_key = api_key
         self.base_url = base_url or self.default_base_url
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.rate_limiter = rate_limiter
+        self.image_options = image_options or ImageEncodeOptions()
+        self.raw_mode = raw_mode
+        self.timeouts = timeouts or RequestTimeouts()
+        self.circuit_breaker = circuit_breaker
+        # Pool member this instance was picked as (see core/pool.py), if any
+        self.pool_member: PoolMember | None = None
+        self.hedging = hedging
+        # Returns the provider a hedged duplicate goes to (another pool member)
+        self.alternate: Callable[[], BaseProvider] | None = None
 
     @property
     @abstractmethod
@@ -45,6 +207,422 @@ class BaseProvider(ABC):
         """Default API endpoint for this provider."""
         pass
 
+    def _parse_usage(self, data: dict[str, Any]) -> dict[str, int] | None:
+        """Token usage from a response as {input_tokens, output_tokens, total_tokens}."""
+        return None
+
+    def _parse_finish_reason(self, data: dict[str, Any]) -> str | None:
+        """Why generation stopped, as reported by the provider."""
+        return None
+
+    def _response(self, text: str, data: dict[str, Any], image: torch.Tensor | None = None) -> ChatResponse:
+        """Build a ChatResponse, keeping the raw JSON according to `raw_mode`."""
+        return ChatResponse(
+            text=text,
+            image=image,
+            raw_response=data,
+            usage=self._parse_usage(data),
+            finish_reason=self._parse_finish_reason(data),
+            raw_mode=self.raw_mode,
+        )
+
+    async def _encode_images(self, images: list[torch.Tensor] | None) -> list[EncodedImage] | None:
+        """Encode attached images with this provider's upload options, in the worker pool."""
+        if not images:
+            return None
+        return await encode_images_async(images, self.image_options)
+
+    async def _send(
+        self,
+        url: str,
+        headers: dict[str, str],
+        payload: dict[str, Any],
+    ) -> aiohttp.ClientResponse:
+        """
+        Send one POST attempt; return the open 200 response or raise `APIError`.
+
+        Payloads holding inline images are streamed (see `core/payload.py`).
+        Raises `RequestTimeoutError` if the response headers don't arrive
+        within the first-byte timeout.
+        """
+        session = await get_session(self.name, self.base_url)
+        timeouts = self.timeouts
+        if has_inline(payload):
+            post = session.post(url, headers=headers, data=StreamingJsonPayload(payload),
+                                timeout=timeouts.client_timeout())
+        else:
+            post = session.post(url, headers=headers, json=payload, timeout=timeouts.client_timeout())
+        if timeouts.first_byte:
+            try:
+                resp = await asyncio.wait_for(post, timeouts.first_byte)
+            except asyncio.TimeoutError as e:
+                if isinstance(e, aiohttp.ClientError):
+                    raise  # connect timeout from aiohttp itself
+                raise RequestTimeoutError(self.display_name, "first byte", timeouts.first_byte) from None
+        else:
+            resp = await post
+        if resp.status != 200:
+            try:
+                error_text = await resp.text()
+            finally:
+                resp.release()
+            raise APIError(self.display_name, resp.status, error_text, dict(resp.headers))
+        return resp
+
+    @asynccontextmanager
+    async def _in_flight(self) -> AsyncIterator[None]:
+        """Scope of one request (all attempts): interruptible, counted on the pool member."""
+        member = self.pool_member
+        if member is not None:
+            member.start()
+        try:
+            async with interruptible():
+                yield
+        finally:
+            if member is not None:
+                member.finish()
+
+    async def _attempt(
+        self,
+        url: str,
+        headers: dict[str, str],
+        payload: dict[str, Any],
+        tokens: int = 0,
+        on_send: Callable[[bool], None] | None = None,
+    ) -> aiohttp.ClientResponse:
+        """
+        One `_send` attempt, gated by the circuit breaker and rate limiter (if any).
+
+        `on_send(True)` is called once the request actually goes out.
+        """
+        breaker = self.circuit_breaker
+        member = self.pool_member
+        probe = breaker.acquire() if breaker is not None else False
+        sent = time.monotonic()
+        try:
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire(tokens)
+            sent = time.monotonic()
+            if on_send is not None:
+                on_send(True)
+            resp = await self._send(url, headers, payload)
+        except APIError as e:
+            if breaker is not None:
+                # 4xx (including 429) means the endpoint itself is up
+                breaker.record(e.status < 500, probe, e)
+            if member is not None and e.status >= 500:
+                # A replica failing fast must not look like the fastest one
+                member.observe(time.monotonic() - sent, failed=True)
+            raise
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+            if breaker is not None:
+                breaker.record(False, probe, e)
+            if member is not None:
+                member.observe(time.monotonic() - sent, failed=True)
+            raise
+        except BaseException:
+            if breaker is not None:
+                breaker.release(probe)
+            raise
+        if breaker is not None:
+            breaker.record(True, probe)
+        elapsed = time.monotonic() - sent
+        if member is not None:
+            member.observe(elapsed)
+        if self.hedging is not None:
+            self._latency_tracker(url, payload).observe(elapsed)
+        return resp
+
+    async def _request(
+        self,
+        url: str,
+        headers: dict[str, str],
+        payload: dict[str, Any],
+    ) -> aiohttp.ClientResponse:
+        """
+        POST with retries; return the open 200 response (caller must release it).
+
+        With a hedging policy, a duplicate attempt is raced against the
+        request once an attempt has been in flight longer than the hedge
+        threshold; the first response wins and the other request is cancelled
+        (see core/hedge.py). Rate limiter waits and retry backoff don't count
+        towards the threshold, and each retry restarts it.
+        """
+        if self.hedging is None:
+            return await self._request_with_retries(url, headers, payload)
+
+        tracker = self._latency_tracker(url, payload)
+        tracker.deposit(self.hedging.budget)
+        threshold = tracker.threshold(self.hedging)
+        # When the current attempt went out; None while none is in flight
+        sent_at: float | None = None
+        progress = asyncio.Event()
+
+        def on_send(sending: bool) -> None:
+            nonlocal sent_at
+            sent_at = time.monotonic() if sending else None
+            progress.set()
+
+        primary = asyncio.ensure_future(self._request_with_retries(
+            url, headers, payload, on_send if threshold is not None else None
+        ))
+        hedge = None
+        pending = {primary}
+        try:
+            while threshold is not None and not primary.done():
+                wait = None if sent_at is None else sent_at + threshold - time.monotonic()
+                if wait is not None and wait <= 0:
+                    if tracker.withdraw():
+                        print(
+                            f"[SimpleChat] {self.display_name} no response after {threshold:.1f}s; "
+                            f"sending a hedged request"
+                        )
+                        hedge = asyncio.ensure_future(self._hedge_attempt(url, headers, payload))
+                        pending.add(hedge)
+                    break
+                progress.clear()
+                waiter = asyncio.ensure_future(progress.wait())
+                try:
+                    await asyncio.wait({primary, waiter}, timeout=wait, return_when=asyncio.FIRST_COMPLETED)
+                finally:
+                    waiter.cancel()
+
+            error: BaseException | None = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                winner = None
+                for task in done:
+                    if task.exception() is not None:
+                        # Report the primary's error if both fail
+                        if task is primary or error is None:
+                            error = task.exception()
+                    elif winner is None:
+                        winner = task
+                    else:
+                        task.result().release()
+                if winner is not None:
+                    if winner is hedge:
+                        tracker.won()
+                    return winner.result()
+            raise error
+        finally:
+            await self._discard([t for t in (primary, hedge) if t is not None and not t.done()])
+
+    def _latency_tracker(self, url: str, payload: dict[str, Any]) -> LatencyTracker:
+        # One tracker per pool: members share the hedge threshold and budget
+        path = url[len(self.base_url):] if url.startswith(self.base_url) else url
+        scope = self.pool_member.pool if self.pool_member is not None else self.base_url
+        return get_latency_tracker(self.name, scope + path, payload)
+
+    async def _hedge_attempt(
+        self,
+        url: str,
+        headers: dict[str, str],
+        payload: dict[str, Any],
+    ) -> aiohttp.ClientResponse:
+        """One duplicate attempt (no retries), to another pool member if there is one."""
+        target = self.alternate() if self.alternate is not None else self
+        url, headers = self._retarget(url, headers, target)
+        limiter = target.rate_limiter
+        member = target.pool_member
+        if member is not None:
+            member.start()
+        try:
+            resp = await target._attempt(url, headers, payload, estimate_tokens(payload) if limiter else 0)
+        finally:
+            if member is not None:
+                member.finish()
+        if limiter is not None:
+            limiter.observe(resp.headers)
+        return resp
+
+    def _retarget(
+        self,
+        url: str,
+        headers: dict[str, str],
+        target: "BaseProvider",
+    ) -> tuple[str, dict[str, str]]:
+        """Point a request built for this instance's endpoint / key at `target`'s."""
+        if target.base_url != self.base_url and url.startswith(self.base_url):
+            url = target.base_url + url[len(self.base_url):]
+        if target.api_key != self.api_key and self.api_key:
+            # Header auth (Bearer / x-api-key) or Gemini's `key=` query parameter
+            url = url.replace(f"key={self.api_key}", f"key={target.api_key}")
+            headers = {k: v.replace(self.api_key, target.api_key) for k, v in headers.items()}
+        return url, headers
+
+    @staticmethod
+    async def _discard(tasks: list[asyncio.Future]) -> None:
+        """Cancel losing / abandoned attempts and release any response they still got."""
+        for task in tasks:
+            task.cancel()
+        for result in await asyncio.gather(*tasks, return_exceptions=True):
+            if isinstance(result, aiohttp.ClientResponse):
+                result.release()
+
+    async def _request_with_retries(
+        self,
+        url: str,
+        headers: dict[str, str],
+        payload: dict[str, Any],
+        on_send: Callable[[bool], None] | None = None,
+    ) -> aiohttp.ClientResponse:
+        """
+        POST with retries; return the open 200 response (caller must release it).
+
+        The already-built payload is re-sent unchanged on every attempt; each
+        attempt first waits for the shared rate limiter (if any). While the
+        endpoint's circuit breaker is open, `CircuitOpenError` is raised
+        without sending (and without retrying).
+
+        `on_send(True)` is called as each attempt goes out and `on_send(False)`
+        when a failed one is about to be retried.
+        """
+        policy = self.retry_policy
+        limiter = self.rate_limiter
+        tokens = estimate_tokens(payload) if limiter is not None else 0
+        start = time.monotonic()
+        attempt = 0
+        while True:
+            try:
+                resp = await self._attempt(url, headers, payload, tokens, on_send)
+                if limiter is not None:
+                    limiter.observe(resp.headers)
+                return resp
+            except APIError as e:
+                if limiter is not None:
+                    limiter.observe(e.headers)
+                if not policy.is_retryable_status(e.status):
+                    raise
+                error = e
+                retry_after = parse_retry_after(e.headers, e.status)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                error = e
+                retry_after = None
+
+            delay = policy.next_delay(attempt, time.monotonic() - start, retry_after)
+            if delay is None:
+                raise error
+            if on_send is not None:
+                on_send(False)
+            attempt += 1
+            print(
+                f"[SimpleChat] {self.display_name} request failed ({error}); "
+                f"retry {attempt}/{policy.max_retries} in {delay:.1f}s"
+            )
+            await asyncio.sleep(delay)
+
+    async def _iter_body(self, resp: aiohttp.ClientResponse, chunk_bytes: int = 0) -> AsyncIterator[bytes]:
+        """
+        Yield response body chunks as they arrive (at most `chunk_bytes` each, if set).
+
+        Raises `RequestTimeoutError` when no data arrives for the idle timeout.
+        """
+        idle = self.timeouts.idle
+        while True:
+            read = resp.content.read(chunk_bytes) if chunk_bytes else resp.content.readany()
+            if idle:
+                try:
+                    chunk = await asyncio.wait_for(read, idle)
+                except asyncio.TimeoutError:
+                    raise RequestTimeoutError(self.display_name, "idle", idle) from None
+            else:
+                chunk = await read
+            if not chunk:
+                return
+            yield chunk
+
+    async def _post_json(
+        self,
+        url: str,
+        headers: dict[str, str],
+        payload: dict[str, Any],
+    ) -> dict[str, Any]:
+        """POST a JSON payload through the pooled session and return the JSON body."""
+        async with self._in_flight():
+            resp = await self._request(url, headers, payload)
+            async with resp:
+                body = bytearray()
+                async for chunk in self._iter_body(resp):
+                    body += chunk
+                return json.loads(body)
+
+    async def _post_json_inline(
+        self,
+        url: str,
+        headers: dict[str, str],
+        payload: dict[str, Any],
+        binary_keys: tuple[str, ...] = ("data",),
+    ) -> dict[str, Any]:
+        """
+        POST a JSON payload and parse the response incrementally.
+
+        Base64 strings under `binary_keys` of `inlineData` / `inline_data`
+        objects are decoded to bytes while the body streams in (see
+        `core/jsonstream.py`), so large inline images are never held as text.
+        """
+        async with self._in_flight():
+            resp = await self._request(url, headers, payload)
+            async with resp:
+                parser = InlineDataParser(binary_keys)
+                async for chunk in self._iter_body(resp, RESPONSE_CHUNK_BYTES):
+                    parser.feed(chunk)
+                return parser.close()
+
+    async def _post_sse(
+        self,
+        url: str,
+        headers: dict[str, str],
+        payload: dict[str, Any],
+    ) -> AsyncIterator[dict[str, Any]]:
+        """
+        POST a JSON payload and yield each Server-Sent Event `data:` payload as JSON.
+
+        Only opening the stream is retried; a failure mid-stream (including the
+        idle timeout between chunks) is raised.
+        Lines are split manually instead of using `resp.content` line iteration,
+        which rejects lines longer than aiohttp's read buffer.
+        """
+        async with self._in_flight():
+            resp = await self._request(url, headers, payload)
+            async with resp:
+                buffer = bytearray()
+                data_lines: list[str] = []
+
+                async for chunk in self._iter_body(resp):
+                    buffer.extend(chunk)
+                    while True:
+                        nl = buffer.find(b"\n")
+                        if nl == -1:
+                            break
+                        line = buffer[:nl].decode("utf-8").rstrip("\r")
+                        del buffer[: nl + 1]
+
+                        # Blank line dispatches the pending event
+                        if not line:
+                            if data_lines:
+                                data = "\n".join(data_lines)
+                                data_lines = []
+                                if data.strip() == "[DONE]":
+                                    return
+                                yield json.loads(data)
+                            continue
+                        if line.startswith(":"):
+                            continue  # SSE comment / keep-alive
+                        field, _, value = line.partition(":")
+                        if field == "data":
+                            data_lines.append(value[1:] if value.startswith(" ") else value)
+
+                # Stream ended without a trailing blank line
+                if buffer.strip():
+                    line = buffer.decode("utf-8").strip()
+                    if line.startswith("data:"):
+                        data_lines.append(line[5:].lstrip())
+                if data_lines:
+                    data = "\n".join(data_lines)
+                    if data.strip() != "[DONE]":
+                        yield json.loads(data)
+
     @abstractmethod
     async def chat(
         self,
@@ -58,6 +636,51 @@ class BaseProvider(ABC):
         """Send a chat request to the API."""
         pass
 
+    @abstractmethod
+    def chat_stream(
+        self,
+        messages: list[dict[str, Any]],
+        model: str,
+        temperature: float = 1.0,
+        max_tokens: int = 2048,
+        images: list[torch.Tensor] | None = None,
+        **kwargs,
+    ) -> AsyncIterator[str]:
+        """Send a streaming chat request and yield text deltas as they arrive."""
+        pass
+
+    async def collect_stream(
+        self,
+        on_delta: Callable[[str], None] | None,
+        messages: list[dict[str, Any]],
+        model: str,
+        temperature: float = 1.0,
+        max_tokens: int = 2048,
+        images: list[torch.Tensor] | None = None,
+        **kwargs,
+    ) -> ChatResponse:
+        """
+        Run `chat_stream` to completion and return the joined text.
+
+        `on_delta` is called with each text delta as it arrives.
+        """
+        parts: list[str] = []
+        async for delta in self.chat_stream(
+            messages=messages,
+            model=model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            images=images,
+            **kwargs,
+        ):
+            if not delta:
+                continue
+            parts.append(delta)
+            if on_delta is not None:
+                on_delta(delta)
+
+        return ChatResponse(text="".join(parts))
+
     @abstractmethod
     async def generate_image(
         self,
@@ -1,17 +1,20 @@
 """
 Claude/Anthropic provider implementation.
 """
-import aiohttp
-from typing import Any
+from typing import Any, AsyncIterator
 import torch
 
 from .base import BaseProvider, ChatResponse
-from ..image_utils import tensor_to_base64, create_data_uri
+from ..image_utils import EncodedImage
+from ..payload import InlineBase64
 
 
 class ClaudeProvider(BaseProvider):
     """Anthropic Claude API provider."""
 
+    name = "claude"
+    display_name = "Claude"
+
     @property
     def default_base_url(self) -> str:
         return "https://api.anthropic.com/v1"
@@ -19,7 +22,7 @@ class ClaudeProvider(BaseProvider):
     def _build_messages(
         self,
         messages: list[dict[str, Any]],
-        images: list[torch.Tensor] | None = None,
+        images: list[EncodedImage] | None = None,
     ) -> tuple[str | None, list[dict[str, Any]]]:
         """
         Build Claude-format messages with optional images.
@@ -43,13 +46,12 @@ class ClaudeProvider(BaseProvider):
             if role == "user" and images and i == len(messages) - 1:
                 content_parts = []
                 for img in images:
-                    b64 = tensor_to_base64(img)
                     content_parts.append({
                         "type": "image",
                         "source": {
                             "type": "base64",
-                            "media_type": "image/png",
-                            "data": b64,
+                            "media_type": img.mime_type,
+                            "data": InlineBase64(img.data),
                         }
                     })
                 content_parts.append({"type": "text", "text": content})
@@ -59,24 +61,36 @@ class ClaudeProvider(BaseProvider):
 
         return system, result
 
-    async def chat(
-        self,
-        messages: list[dict[str, Any]],
-        model: str,
-        temperature: float = 1.0,
-        max_tokens: int = 2048,
-        images: list[torch.Tensor] | None = None,
-        **kwargs,
-    ) -> ChatResponse:
-        """Send chat request to Claude API."""
-
-        url = f"{self.base_url}/messages"
-        headers = {
+    def _headers(self) -> dict[str, str]:
+        return {
             "x-api-key": self.api_key,
             "anthropic-version": "2023-06-01",
             "Content-Type": "application/json",
         }
 
+    def _parse_usage(self, data: dict[str, Any]) -> dict[str, int] | None:
+        usage = data.get("usage")
+        if not usage:
+            return None
+        input_tokens = usage.get("input_tokens", 0)
+        output_tokens = usage.get("output_tokens", 0)
+        return {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        }
+
+    def _parse_finish_reason(self, data: dict[str, Any]) -> str | None:
+        return data.get("stop_reason")
+
+    def _build_payload(
+        self,
+        messages: list[dict[str, Any]],
+        model: str,
+        temperature: float,
+        max_tokens: int,
+        images: list[EncodedImage] | None,
+    ) -> dict[str, Any]:
         system, claude_messages = self._build_messages(messages, images)
 
         payload = {
@@ -89,13 +103,24 @@ class ClaudeProvider(BaseProvider):
         if system:
             payload["system"] = system
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, headers=headers, json=payload) as resp:
-                if resp.status != 200:
-                    error_text = await resp.text()
-                    raise RuntimeError(f"Claude API error {resp.status}: {error_text}")
+        return payload
 
-                data = await resp.json()
+    async def chat(
+        self,
+        messages: list[dict[str, Any]],
+        model: str,
+        temperature: float = 1.0,
+        max_tokens: int = 2048,
+        images: list[torch.Tensor] | None = None,
+        **kwargs,
+    ) -> ChatResponse:
+        """Send chat request to Claude API."""
+
+        url = f"{self.base_url}/messages"
+        encoded = await self._encode_images(images)
+        payload = self._build_payload(messages, model, temperature, max_tokens, encoded)
+
+        data = await self._post_json(url, self._headers(), payload)
 
         # Extract text from response
         text = ""
@@ -103,7 +128,32 @@ class ClaudeProvider(BaseProvider):
             if block.get("type") == "text":
                 text += block.get("text", "")
 
-        return ChatResponse(text=text, raw_response=data)
+        return self._response(text, data)
+
+    async def chat_stream(
+        self,
+        messages: list[dict[str, Any]],
+        model: str,
+        temperature: float = 1.0,
+        max_tokens: int = 2048,
+        images: list[torch.Tensor] | None = None,
+        **kwargs,
+    ) -> AsyncIterator[str]:
+        """Stream text deltas from Claude Messages API (SSE)."""
+
+        url = f"{self.base_url}/messages"
+        encoded = await self._encode_images(images)
+        payload = self._build_payload(messages, model, temperature, max_tokens, encoded)
+        payload["stream"] = True
+
+        async for event in self._post_sse(url, self._headers(), payload):
+            event_type = event.get("type")
+            if event_type == "error":
+                raise RuntimeError(f"Claude API error: {event.get('error')}")
+            if event_type == "content_block_delta":
+                delta = event.get("delta") or {}
+                if delta.get("type") == "text_delta" and delta.get("text"):
+                    yield delta["text"]
 
     async def generate_image(
         self,
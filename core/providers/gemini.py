@@ -2,17 +2,20 @@
 Google Gemini provider implementation.
 Supports chat and image generation (Nano Banana / Nano Banana Pro).
 """
-import aiohttp
-from typing import Any
+from typing import Any, AsyncIterator
 import torch
 
 from .base import BaseProvider, ChatResponse
-from ..image_utils import tensor_to_base64, base64_to_tensor
+from ..image_utils import EncodedImage, decode_images_async, run_in_image_pool, stack_images
+from ..payload import InlineBase64
 
 
 class GeminiProvider(BaseProvider):
     """Google Gemini API provider with image generation support."""
 
+    name = "gemini"
+    display_name = "Gemini"
+
     @property
     def default_base_url(self) -> str:
         return "https://generativelanguage.googleapis.com/v1beta"
@@ -20,7 +23,7 @@ class GeminiProvider(BaseProvider):
     def _build_contents(
         self,
         messages: list[dict[str, Any]],
-        images: list[torch.Tensor] | None = None,
+        images: list[EncodedImage] | None = None,
     ) -> tuple[str | None, list[dict[str, Any]]]:
         """
         Build Gemini-format contents.
@@ -49,11 +52,10 @@ class GeminiProvider(BaseProvider):
             # Add images to last user message
             if role == "user" and images and i == len(messages) - 1:
                 for img in images:
-                    b64 = tensor_to_base64(img)
                     parts.append({
                         "inline_data": {
-                            "mime_type": "image/png",
-                            "data": b64,
+                            "mime_type": img.mime_type,
+                            "data": InlineBase64(img.data),
                         }
                     })
 
@@ -62,28 +64,91 @@ class GeminiProvider(BaseProvider):
 
         return system, contents
 
-    async def chat(
+    def _collect_parts(
         self,
-        messages: list[dict[str, Any]],
-        model: str,
-        temperature: float = 1.0,
-        max_tokens: int = 2048,
-        images: list[torch.Tensor] | None = None,
-        enable_image_generation: bool = False,
-        **kwargs,
-    ) -> ChatResponse:
-        """Send chat request to Gemini API."""
+        data: dict[str, Any],
+        all_candidates: bool = True,
+    ) -> tuple[str, list[EncodedImage]]:
+        """
+        Collect text and every inline image from a generateContent response, undecoded.
+
+        Returns:
+            Tuple of (text, images) where images hold the bytes as returned by the API
+        """
+        texts = []
+        encoded = []
 
-        url = f"{self.base_url}/models/{model}:generateContent"
+        candidates = data.get("candidates", [])
+        if not all_candidates:
+            candidates = candidates[:1]
+
+        for candidate in candidates:
+            text = ""
+            for part in candidate.get("content", {}).get("parts", []):
+                if "text" in part:
+                    text += part["text"]
+                elif "inlineData" in part:
+                    inline = part["inlineData"]
+                    mime_type = inline.get("mimeType", "")
+                    if mime_type.startswith("image/"):
+                        encoded.append(EncodedImage(inline["data"], mime_type))
+            if text:
+                texts.append(text)
+
+        return "\n\n".join(texts), encoded
+
+    async def _extract_parts(
+        self,
+        data: dict[str, Any],
+        all_candidates: bool = True,
+    ) -> tuple[str, list[torch.Tensor]]:
+        """
+        Collect text and every inline image from a generateContent response.
+
+        Inline image data arrives as bytes (see `_post_json_inline`) and is
+        decoded in parallel in the image worker pool.
+
+        Returns:
+            Tuple of (text, images) where images are (1, H, W, C) tensors
+        """
+        text, encoded = self._collect_parts(data, all_candidates)
+        images = await decode_images_async([img.data for img in encoded]) if encoded else []
+        return text, images
+
+    def _parse_usage(self, data: dict[str, Any]) -> dict[str, int] | None:
+        usage = data.get("usageMetadata")
+        if not usage:
+            return None
+        return {
+            "input_tokens": usage.get("promptTokenCount", 0),
+            "output_tokens": usage.get("candidatesTokenCount", 0),
+            "total_tokens": usage.get("totalTokenCount", 0),
+        }
+
+    def _parse_finish_reason(self, data: dict[str, Any]) -> str | None:
+        candidates = data.get("candidates") or []
+        return candidates[0].get("finishReason") if candidates else None
+
+    def _model_url(self, model: str, method: str, query: str = "") -> str:
+        url = f"{self.base_url}/models/{model}:{method}"
+        if query:
+            url += f"?{query}"
 
         # Add API key as query parameter
         if "?" in url:
             url += f"&key={self.api_key}"
         else:
             url += f"?key={self.api_key}"
+        return url
 
-        headers = {"Content-Type": "application/json"}
-
+    def _build_chat_payload(
+        self,
+        messages: list[dict[str, Any]],
+        temperature: float,
+        max_tokens: int,
+        images: list[EncodedImage] | None,
+        enable_image_generation: bool = False,
+    ) -> dict[str, Any]:
         system, contents = self._build_contents(messages, images)
 
         payload = {
@@ -101,30 +166,60 @@ class GeminiProvider(BaseProvider):
         if enable_image_generation:
             payload["generationConfig"]["responseModalities"] = ["TEXT", "IMAGE"]
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, headers=headers, json=payload) as resp:
-                if resp.status != 200:
-                    error_text = await resp.text()
-                    raise RuntimeError(f"Gemini API error {resp.status}: {error_text}")
+        return payload
+
+    async def chat(
+        self,
+        messages: list[dict[str, Any]],
+        model: str,
+        temperature: float = 1.0,
+        max_tokens: int = 2048,
+        images: list[torch.Tensor] | None = None,
+        enable_image_generation: bool = False,
+        **kwargs,
+    ) -> ChatResponse:
+        """Send chat request to Gemini API."""
+
+        url = self._model_url(model, "generateContent")
+        headers = {"Content-Type": "application/json"}
+        encoded = await self._encode_images(images)
+        payload = self._build_chat_payload(
+            messages, temperature, max_tokens, encoded, enable_image_generation
+        )
 
-                data = await resp.json()
+        data = await self._post_json_inline(url, headers, payload)
 
         # Extract text and images from response
-        text = ""
-        result_image = None
+        text, result_images = await self._extract_parts(data, all_candidates=False)
+        result_image = await run_in_image_pool(stack_images, result_images) if result_images else None
 
-        candidates = data.get("candidates", [])
-        if candidates:
-            parts = candidates[0].get("content", {}).get("parts", [])
-            for part in parts:
-                if "text" in part:
-                    text += part["text"]
-                elif "inlineData" in part:
-                    inline = part["inlineData"]
-                    if inline.get("mimeType", "").startswith("image/"):
-                        result_image = base64_to_tensor(inline["data"])
+        return self._response(text, data, result_image)
 
-        return ChatResponse(text=text, image=result_image, raw_response=data)
+    async def chat_stream(
+        self,
+        messages: list[dict[str, Any]],
+        model: str,
+        temperature: float = 1.0,
+        max_tokens: int = 2048,
+        images: list[torch.Tensor] | None = None,
+        **kwargs,
+    ) -> AsyncIterator[str]:
+        """Stream text deltas from Gemini API (`streamGenerateContent?alt=sse`)."""
+
+        url = self._model_url(model, "streamGenerateContent", "alt=sse")
+        headers = {"Content-Type": "application/json"}
+        encoded = await self._encode_images(images)
+        payload = self._build_chat_payload(messages, temperature, max_tokens, encoded)
+
+        async for event in self._post_sse(url, headers, payload):
+            if "error" in event:
+                raise RuntimeError(f"Gemini API error: {event['error']}")
+            candidates = event.get("candidates") or []
+            if not candidates:
+                continue
+            for part in candidates[0].get("content", {}).get("parts", []):
+                if part.get("text"):
+                    yield part["text"]
 
     async def generate_image(
         self,
@@ -133,11 +228,22 @@ class GeminiProvider(BaseProvider):
         reference_image: torch.Tensor | None = None,
         aspect_ratio: str = "1:1",
         size: str = "1K",
+        candidate_count: int = 1,
+        decode_images: bool = True,
         **kwargs,
     ) -> ChatResponse:
-        """Generate or edit image using Gemini."""
+        """
+        Generate or edit image using Gemini.
+
+        With `candidate_count` > 1 the model is asked for several candidates in
+        one request (not every image model supports this); all returned images
+        are stacked into one (B, H, W, C) batch.
 
-        url = f"{self.base_url}/models/{model}:generateContent?key={self.api_key}"
+        With `decode_images=False` no tensor is built: the response carries the
+        image bytes exactly as returned in `encoded_images` (for saving to disk).
+        """
+
+        url = self._model_url(model, "generateContent")
         headers = {"Content-Type": "application/json"}
 
         # Build parts
@@ -145,11 +251,11 @@ class GeminiProvider(BaseProvider):
 
         # Add reference image if provided
         if reference_image is not None:
-            b64 = tensor_to_base64(reference_image)
+            encoded = (await self._encode_images([reference_image]))[0]
             parts.append({
                 "inline_data": {
-                    "mime_type": "image/png",
-                    "data": b64,
+                    "mime_type": encoded.mime_type,
+                    "data": InlineBase64(encoded.data),
                 }
             })
 
@@ -162,6 +268,9 @@ class GeminiProvider(BaseProvider):
             }
         }
 
+        if candidate_count > 1:
+            payload["generationConfig"]["candidateCount"] = candidate_count
+
         # Add image config if supported
         if aspect_ratio or size:
             payload["generationConfig"]["imageConfig"] = {}
@@ -170,30 +279,21 @@ class GeminiProvider(BaseProvider):
             if size:
                 payload["generationConfig"]["imageConfig"]["imageSize"] = size
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, headers=headers, json=payload) as resp:
-                if resp.status != 200:
-                    error_text = await resp.text()
-                    raise RuntimeError(f"Gemini API error {resp.status}: {error_text}")
+        data = await self._post_json_inline(url, headers, payload)
 
-                data = await resp.json()
+        if not decode_images:
+            text, encoded = self._collect_parts(data)
+            if not encoded:
+                raise RuntimeError("Gemini did not return an image. Try a different prompt or model.")
+            response = self._response(text, data)
+            response.encoded_images = encoded
+            return response
 
-        # Extract text and image
-        text = ""
-        result_image = None
-
-        candidates = data.get("candidates", [])
-        if candidates:
-            parts = candidates[0].get("content", {}).get("parts", [])
-            for part in parts:
-                if "text" in part:
-                    text += part["text"]
-                elif "inlineData" in part:
-                    inline = part["inlineData"]
-                    if inline.get("mimeType", "").startswith("image/"):
-                        result_image = base64_to_tensor(inline["data"])
+        # Extract text and every image (all candidates)
+        text, result_images = await self._extract_parts(data)
 
-        if result_image is None:
+        if not result_images:
             raise RuntimeError("Gemini did not return an image. Try a different prompt or model.")
 
-        return ChatResponse(text=text, image=result_image, raw_response=data)
+        image = await run_in_image_pool(stack_images, result_images)
+        return self._response(text, data, image)
@@ -2,17 +2,20 @@
 OpenAI provider implementation.
 Also works with OpenAI-compatible APIs (e.g., local LLMs, other providers).
 """
-import aiohttp
-from typing import Any
+from typing import Any, AsyncIterator
 import torch
 
 from .base import BaseProvider, ChatResponse
-from ..image_utils import tensor_to_base64, base64_to_tensor, create_data_uri
+from ..image_utils import EncodedImage
+from ..payload import InlineBase64
 
 
 class OpenAIProvider(BaseProvider):
     """OpenAI API provider (and compatible APIs)."""
 
+    name = "openai"
+    display_name = "OpenAI"
+
     @property
     def default_base_url(self) -> str:
         return "https://api.openai.com/v1"
@@ -20,9 +23,10 @@ class OpenAIProvider(BaseProvider):
     def _build_messages(
         self,
         messages: list[dict[str, Any]],
-        images: list[torch.Tensor] | None = None,
+        images: list[EncodedImage] | None = None,
+        detail: str | None = None,
     ) -> list[dict[str, Any]]:
-        """Build OpenAI-format messages with optional images."""
+        """Build OpenAI-format messages with optional images (`detail`: low / high)."""
         if not images:
             return messages
 
@@ -33,9 +37,12 @@ class OpenAIProvider(BaseProvider):
                 # Convert content to multimodal format
                 content = [{"type": "text", "text": msg["content"]}]
                 for img in images:
+                    image_url = {"url": InlineBase64(img.data, f"data:{img.mime_type};base64,")}
+                    if detail in ("low", "high"):
+                        image_url["detail"] = detail
                     content.append({
                         "type": "image_url",
-                        "image_url": {"url": create_data_uri(img)}
+                        "image_url": image_url,
                     })
                 result.append({"role": "user", "content": content})
             else:
@@ -43,6 +50,42 @@ class OpenAIProvider(BaseProvider):
 
         return result
 
+    def _headers(self) -> dict[str, str]:
+        return {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+        }
+
+    def _parse_usage(self, data: dict[str, Any]) -> dict[str, int] | None:
+        usage = data.get("usage")
+        if not usage:
+            return None
+        return {
+            "input_tokens": usage.get("prompt_tokens", 0),
+            "output_tokens": usage.get("completion_tokens", 0),
+            "total_tokens": usage.get("total_tokens", 0),
+        }
+
+    def _parse_finish_reason(self, data: dict[str, Any]) -> str | None:
+        choices = data.get("choices") or []
+        return choices[0].get("finish_reason") if choices else None
+
+    def _build_payload(
+        self,
+        messages: list[dict[str, Any]],
+        model: str,
+        temperature: float,
+        max_tokens: int,
+        images: list[EncodedImage] | None,
+        detail: str | None = None,
+    ) -> dict[str, Any]:
+        return {
+            "model": model,
+            "messages": self._build_messages(messages, images, detail),
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+        }
+
     async def chat(
         self,
         messages: list[dict[str, Any]],
@@ -55,28 +98,42 @@ class OpenAIProvider(BaseProvider):
         """Send chat request to OpenAI API."""
 
         url = f"{self.base_url}/chat/completions"
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-        }
+        encoded = await self._encode_images(images)
+        payload = self._build_payload(
+            messages, model, temperature, max_tokens, encoded, kwargs.get("image_detail")
+        )
 
-        payload = {
-            "model": model,
-            "messages": self._build_messages(messages, images),
-            "temperature": temperature,
-            "max_tokens": max_tokens,
-        }
+        data = await self._post_json(url, self._headers(), payload)
+
+        text = data["choices"][0]["message"]["content"]
+        return self._response(text, data)
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, headers=headers, json=payload) as resp:
-                if resp.status != 200:
-                    error_text = await resp.text()
-                    raise RuntimeError(f"OpenAI API error {resp.status}: {error_text}")
+    async def chat_stream(
+        self,
+        messages: list[dict[str, Any]],
+        model: str,
+        temperature: float = 1.0,
+        max_tokens: int = 2048,
+        images: list[torch.Tensor] | None = None,
+        **kwargs,
+    ) -> AsyncIterator[str]:
+        """Stream chat completion deltas from OpenAI API (`stream=true`)."""
 
-                data = await resp.json()
+        url = f"{self.base_url}/chat/completions"
+        encoded = await self._encode_images(images)
+        payload = self._build_payload(
+            messages, model, temperature, max_tokens, encoded, kwargs.get("image_detail")
+        )
+        payload["stream"] = True
 
-        text = data["choices"][0]["message"]["content"]
-        return ChatResponse(text=text, raw_response=data)
+        async for event in self._post_sse(url, self._headers(), payload):
+            if "error" in event:
+                raise RuntimeError(f"OpenAI API error: {event['error']}")
+            for choice in event.get("choices") or []:
+                delta = choice.get("delta") or {}
+                content = delta.get("content")
+                if content:
+                    yield content
 
     async def generate_image(
         self,
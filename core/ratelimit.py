@@ -0,0 +1,224 @@
+"""
+Process-wide request / token rate limiting per (provider, base_url, api_key).
+
+Each limiter holds two token buckets:
+- requests per minute (RPM)
+- estimated tokens per minute (TPM)
+
+Buckets use reservation-based scheduling: a caller takes its share up front
+(the bucket may go into debt) and sleeps for the time needed to pay it back.
+Later callers queue behind the debt, so concurrent workflows sharing a key
+are spaced out smoothly instead of bursting into 429s. This needs no asyncio
+primitives, so one limiter is safely shared by the server loop and the
+per-prompt loops.
+
+In learned mode, limits are picked up from `x-ratelimit-limit-*` (and
+`anthropic-ratelimit-*-limit`) response headers when not set explicitly.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import threading
+import time
+from typing import Any, Mapping
+
+from .payload import InlineBase64
+
+
+# Bucket capacity, as a fraction of the per-minute limit (allowed burst)
+BURST_WINDOW = 10.0 / 60.0
+
+# Rough token cost of one attached image when estimating TPM usage
+IMAGE_TOKEN_ESTIMATE = 1000
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at `per_minute / 60` per second."""
+
+    def __init__(self, per_minute: float = 0):
+        self._lock = threading.Lock()
+        self.per_minute = 0.0
+        self.capacity = 0.0
+        self.level = 0.0
+        self.updated = time.monotonic()
+        self.set_limit(per_minute)
+
+    @property
+    def enabled(self) -> bool:
+        return self.per_minute > 0
+
+    def set_limit(self, per_minute: float) -> None:
+        with self._lock:
+            per_minute = max(0.0, float(per_minute or 0))
+            if per_minute == self.per_minute:
+                return
+            self.per_minute = per_minute
+            self.capacity = max(1.0, per_minute * BURST_WINDOW) if per_minute else 0.0
+            self.level = self.capacity
+            self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        rate = self.per_minute / 60.0
+        self.level = min(self.capacity, self.level + (now - self.updated) * rate)
+        self.updated = now
+
+    def reserve(self, amount: float) -> float:
+        """Take `amount` now and return how many seconds the caller must wait."""
+        with self._lock:
+            if not self.enabled or amount <= 0:
+                return 0.0
+            now = time.monotonic()
+            self._refill(now)
+            # A single request larger than the burst would otherwise never fit
+            amount = min(amount, self.capacity)
+            self.level -= amount
+            if self.level >= 0:
+                return 0.0
+            return -self.level / (self.per_minute / 60.0)
+
+    def refund(self, amount: float) -> None:
+        with self._lock:
+            if self.enabled:
+                self.level = min(self.capacity, self.level + min(amount, self.capacity))
+
+    def clamp(self, remaining: float) -> None:
+        """Never believe we have more budget than the server says is left."""
+        with self._lock:
+            if self.enabled:
+                self._refill(time.monotonic())
+                self.level = min(self.level, float(remaining))
+
+
+class RateLimiter:
+    """RPM + TPM limiter for one (provider, base_url, api_key)."""
+
+    def __init__(self, rpm: int = 0, tpm: int = 0, learn: bool = False):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.rpm = rpm
+        self.tpm = tpm
+        self.learn = learn
+
+    def configure(self, rpm: int = 0, tpm: int = 0, learn: bool = False) -> None:
+        self.rpm = rpm
+        self.tpm = tpm
+        self.learn = learn
+        # Explicit limits win; in learned mode keep what the headers taught us
+        if rpm or not learn:
+            self.requests.set_limit(rpm)
+        if tpm or not learn:
+            self.tokens.set_limit(tpm)
+
+    async def acquire(self, tokens: float = 0) -> None:
+        """Wait until one request (and `tokens` estimated tokens) fit the budget."""
+        wait_req = self.requests.reserve(1)
+        wait_tok = self.tokens.reserve(tokens)
+        delay = max(wait_req, wait_tok)
+        if delay <= 0:
+            return
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.requests.refund(1)
+            self.tokens.refund(tokens)
+            raise
+
+    def observe(self, headers: Mapping[str, str] | None) -> None:
+        """Learn limits / remaining budget from response headers."""
+        if not headers or not self.learn:
+            return
+        h = {str(k).lower(): v for k, v in headers.items()}
+
+        def _num(*names: str) -> float | None:
+            for name in names:
+                try:
+                    return float(h[name])
+                except (KeyError, ValueError):
+                    continue
+            return None
+
+        limit_req = _num("x-ratelimit-limit-requests", "anthropic-ratelimit-requests-limit")
+        limit_tok = _num("x-ratelimit-limit-tokens", "anthropic-ratelimit-tokens-limit")
+        if limit_req and not self.rpm:
+            self.requests.set_limit(limit_req)
+        if limit_tok and not self.tpm:
+            self.tokens.set_limit(limit_tok)
+
+        remaining_req = _num("x-ratelimit-remaining-requests", "anthropic-ratelimit-requests-remaining")
+        remaining_tok = _num("x-ratelimit-remaining-tokens", "anthropic-ratelimit-tokens-remaining")
+        if remaining_req is not None:
+            self.requests.clamp(remaining_req)
+        if remaining_tok is not None:
+            self.tokens.clamp(remaining_tok)
+
+
+_LIMITERS: dict[tuple[str, str, str], RateLimiter] = {}
+_LIMITERS_LOCK = threading.Lock()
+
+
+def _limiter_key(provider: str, base_url: str, api_key: str) -> tuple[str, str, str]:
+    key_id = hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:16]
+    return (provider, (base_url or "").strip().rstrip("/"), key_id)
+
+
+def get_rate_limiter(
+    provider: str,
+    base_url: str,
+    api_key: str,
+    rpm: int | None = None,
+    tpm: int | None = None,
+    learn: bool | None = None,
+) -> RateLimiter:
+    """
+    Get the shared limiter for (provider, base_url, api_key).
+
+    Passing limits (re)configures it; passing None leaves the current
+    settings alone (used by the model-list routes).
+    """
+    key = _limiter_key(provider, base_url, api_key)
+    with _LIMITERS_LOCK:
+        limiter = _LIMITERS.get(key)
+        if limiter is None:
+            limiter = _LIMITERS[key] = RateLimiter()
+    if rpm is not None or tpm is not None or learn is not None:
+        limiter.configure(
+            rpm=rpm if rpm is not None else limiter.rpm,
+            tpm=tpm if tpm is not None else limiter.tpm,
+            learn=learn if learn is not None else limiter.learn,
+        )
+    return limiter
+
+
+def estimate_tokens(payload: Any) -> int:
+    """
+    Rough token estimate for a request payload (~4 chars per token).
+
+    Inline images count as IMAGE_TOKEN_ESTIMATE each and the requested output
+    budget (max_tokens / maxOutputTokens) is included, as providers count it
+    against TPM limits.
+    """
+    total_chars = 0
+    images = 0
+    max_output = 0
+
+    stack = [payload]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, dict):
+            for key, value in item.items():
+                if key in ("max_tokens", "maxOutputTokens") and isinstance(value, int):
+                    max_output = max(max_output, value)
+                elif isinstance(value, InlineBase64) or (
+                    key in ("data", "url") and isinstance(value, str) and len(value) > 1024
+                ):
+                    images += 1
+                else:
+                    stack.append(value)
+        elif isinstance(item, (list, tuple)):
+            stack.extend(item)
+        elif isinstance(item, str):
+            total_chars += len(item)
+
+    return total_chars // 4 + images * IMAGE_TOKEN_ESTIMATE + max_output
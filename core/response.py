@@ -0,0 +1,136 @@
+"""
+Compact provider responses.
+
+A provider's raw JSON can be large: Gemini image responses carry every
+generated image inline. `ChatResponse` keeps the extracted fields (text,
+image, usage, finish reason) and stores the raw payload according to a mode:
+
+- trim: keep the JSON, with inline binaries / very long strings replaced by
+  a short "<N bytes>" note (default)
+- drop: don't keep it at all
+- spill: write it to a temp file and read it back when accessed; the file is
+  removed when the response is garbage collected
+- keep: keep it as the provider sent it (inline binaries decoded while
+  parsing are turned back into base64 strings)
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+import os
+import tempfile
+import weakref
+from typing import Any
+
+import torch
+
+
+RAW_RESPONSE_MODES = ["trim", "drop", "spill", "keep"]
+
+# Strings longer than this are treated as inline binary when trimming
+TRIM_STRING_CHARS = 4096
+
+
+def trim_raw(value: Any, max_chars: int = TRIM_STRING_CHARS) -> Any:
+    """Copy of a raw payload with bytes and very long strings replaced by a size note."""
+    if isinstance(value, (bytes, bytearray)):
+        return f"<{len(value)} bytes>"
+    if isinstance(value, str) and len(value) > max_chars:
+        return f"<{len(value)} chars>"
+    if isinstance(value, dict):
+        return {k: trim_raw(v, max_chars) for k, v in value.items()}
+    if isinstance(value, list):
+        return [trim_raw(v, max_chars) for v in value]
+    return value
+
+
+def encode_binaries(value: Any) -> Any:
+    """Copy of a raw payload with decoded binaries turned back into base64 strings."""
+    if isinstance(value, (bytes, bytearray)):
+        return base64.b64encode(value).decode("ascii")
+    if isinstance(value, dict):
+        return {k: encode_binaries(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [encode_binaries(v) for v in value]
+    return value
+
+
+def _json_default(obj: Any) -> Any:
+    # Binaries decoded while parsing (see core/jsonstream.py) go back to base64
+    if isinstance(obj, (bytes, bytearray)):
+        return base64.b64encode(obj).decode("ascii")
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _spill_dir() -> str:
+    path = os.path.join(tempfile.gettempdir(), "simplechat_raw")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class ChatResponse:
+    """Unified response from any LLM provider."""
+
+    __slots__ = ("text", "image", "encoded_images", "usage", "finish_reason", "_raw", "_raw_path", "__weakref__")
+
+    def __init__(
+        self,
+        text: str,
+        image: torch.Tensor | None = None,
+        raw_response: dict | None = None,
+        usage: dict[str, int] | None = None,
+        finish_reason: str | None = None,
+        raw_mode: str = "trim",
+    ):
+        self.text = text
+        self.image = image
+        # Undecoded images (bytes as returned by the API), when requested instead of `image`
+        self.encoded_images = None
+        self.usage = usage
+        self.finish_reason = finish_reason
+        self._raw = None
+        self._raw_path = None
+        if raw_response is not None:
+            self._store_raw(raw_response, raw_mode)
+
+    def _store_raw(self, raw: dict, mode: str) -> None:
+        if mode == "drop":
+            return
+        if mode == "keep":
+            self._raw = encode_binaries(raw)
+        elif mode == "spill":
+            fd, path = tempfile.mkstemp(prefix="raw_", suffix=".json", dir=_spill_dir())
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(raw, f, ensure_ascii=False, default=_json_default)
+            self._raw_path = path
+            weakref.finalize(self, _remove, path)
+        elif mode == "trim":
+            self._raw = trim_raw(raw)
+        else:
+            raise ValueError(f"Unknown raw response mode: {mode}")
+
+    @property
+    def raw_response(self) -> dict | None:
+        """Provider JSON as stored by the raw mode (spilled payloads are read back here)."""
+        if self._raw is None and self._raw_path is not None:
+            try:
+                with open(self._raw_path, "r", encoding="utf-8") as f:
+                    return json.load(f)
+            except OSError:
+                return None
+        return self._raw
+
+    def __repr__(self) -> str:
+        image = None if self.image is None else tuple(self.image.shape)
+        return (
+            f"ChatResponse(text={self.text!r}, image={image}, usage={self.usage}, "
+            f"finish_reason={self.finish_reason!r})"
+        )
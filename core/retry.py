@@ -0,0 +1,143 @@
+"""
+Retry policy for provider HTTP requests.
+
+- Retries transient status codes (408/409/425/429/5xx, Anthropic 529) and
+  connection errors.
+- Exponential backoff with full jitter.
+- Honors server hints: `Retry-After` (seconds or HTTP date), `retry-after-ms`
+  and `x-ratelimit-reset-*` (OpenAI-style durations such as "6m0s", "20ms",
+  or an epoch timestamp).
+- Stops once `max_retries` or the `max_elapsed` time budget is exhausted.
+"""
+
+from __future__ import annotations
+
+import random
+import re
+import time
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from typing import Mapping
+
+
+RETRYABLE_STATUS = frozenset({408, 409, 425, 429, 500, 502, 503, 504, 529})
+
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def parse_duration(value: str) -> float | None:
+    """
+    Parse a rate-limit reset value into seconds.
+
+    Accepts plain seconds ("1.5"), epoch timestamps, and Go-style
+    durations ("1m30s", "250ms").
+    """
+    if value is None:
+        return None
+    s = str(value).strip().lower()
+    if not s:
+        return None
+    try:
+        n = float(s)
+    except ValueError:
+        parts = _DURATION_RE.findall(s)
+        if not parts or "".join(a + b for a, b in parts) != s:
+            return None
+        return sum(float(a) * _DURATION_UNITS[b] for a, b in parts)
+
+    # Large numbers are absolute epoch timestamps
+    if n > 1e9:
+        return max(0.0, n - time.time())
+    return max(0.0, n)
+
+
+def parse_retry_after(headers: Mapping[str, str] | None, status: int | None = None) -> float | None:
+    """
+    Return the server-requested wait (seconds) from response headers, if any.
+
+    `x-ratelimit-reset-*` is only used for a 429 (`status`): OpenAI-style APIs
+    send it on every response, where it says nothing about when a 5xx clears.
+    """
+    if not headers:
+        return None
+    headers = {str(k).lower(): v for k, v in headers.items()}
+
+    ms = headers.get("retry-after-ms")
+    if ms:
+        try:
+            return max(0.0, float(ms) / 1000.0)
+        except ValueError:
+            pass
+
+    retry_after = headers.get("retry-after")
+    if retry_after:
+        seconds = parse_duration(retry_after)
+        if seconds is not None:
+            return seconds
+        try:
+            return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+        except (TypeError, ValueError):
+            pass
+
+    if status != 429:
+        return None
+
+    # x-ratelimit-reset-requests / x-ratelimit-reset-tokens / x-ratelimit-reset
+    resets = []
+    for name, value in headers.items():
+        if name.startswith("x-ratelimit-reset"):
+            seconds = parse_duration(value)
+            if seconds is not None:
+                resets.append(seconds)
+    if resets:
+        return max(resets)
+
+    return None
+
+
+@dataclass
+class RetryPolicy:
+    """When and how long to wait before re-sending a failed request."""
+
+    max_retries: int = 3
+    base_delay: float = 1.0
+    max_delay: float = 30.0
+    max_elapsed: float = 120.0
+    retry_status: frozenset[int] = field(default_factory=lambda: RETRYABLE_STATUS)
+
+    def is_retryable_status(self, status: int) -> bool:
+        return status in self.retry_status
+
+    def backoff(self, attempt: int) -> float:
+        """Exponential backoff with full jitter for the given (0-based) attempt."""
+        cap = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return random.uniform(0, cap)
+
+    def next_delay(
+        self,
+        attempt: int,
+        elapsed: float,
+        retry_after: float | None = None,
+    ) -> float | None:
+        """
+        Delay before retry number `attempt + 1`, or None to give up.
+
+        A server-provided `retry_after` is waited out in full instead of backoff
+        (`max_delay` only caps backoff); a wait that would exceed the elapsed
+        budget gives up early.
+        """
+        if attempt >= self.max_retries:
+            return None
+
+        if retry_after is not None:
+            delay = retry_after
+        else:
+            delay = self.backoff(attempt)
+
+        if elapsed + delay > self.max_elapsed:
+            return None
+        return delay
+
+
+NO_RETRY = RetryPolicy(max_retries=0)
@@ -0,0 +1,106 @@
+"""
+Shared aiohttp sessions for provider and route requests.
+
+Opening a fresh `aiohttp.ClientSession()` per request pays a new DNS lookup,
+TCP and TLS handshake every time. Instead, sessions are pooled per
+(provider, base_url) with a tuned `TCPConnector` so keep-alive connections
+and the DNS cache are reused across calls.
+
+aiohttp sessions are bound to the event loop that created them, and ComfyUI
+runs each queued prompt in its own loop, so the pool is kept per loop:
+- Sessions created inside a prompt are closed when that loop shuts down
+  (via an async-generator sentinel finalized by `loop.shutdown_asyncgens()`).
+- Sessions on the server loop are closed by `close_all_sessions()`, which is
+  registered on the aiohttp app's cleanup signal.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import weakref
+
+import aiohttp
+
+
+# Connector tuning (shared by every pooled session)
+CONNECTION_LIMIT = 100
+CONNECTION_LIMIT_PER_HOST = 32
+DNS_CACHE_TTL = 300  # seconds
+KEEPALIVE_TIMEOUT = 60  # seconds
+
+
+class _LoopSessions:
+    """Sessions owned by one event loop."""
+
+    def __init__(self):
+        self.sessions: dict[tuple[str, str], aiohttp.ClientSession] = {}
+        self.sentinel = None
+
+    async def close(self) -> None:
+        sessions = list(self.sessions.values())
+        self.sessions.clear()
+        for session in sessions:
+            if not session.closed:
+                await session.close()
+
+
+_LOOPS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopSessions]" = weakref.WeakKeyDictionary()
+
+
+async def _loop_sentinel(bucket: _LoopSessions):
+    # Suspended forever; `shutdown_asyncgens()` closes it while the loop still runs.
+    try:
+        yield
+    finally:
+        await bucket.close()
+
+
+def _normalize_base_url(base_url: str) -> str:
+    return (base_url or "").strip().rstrip("/")
+
+
+def _create_session() -> aiohttp.ClientSession:
+    connector = aiohttp.TCPConnector(
+        limit=CONNECTION_LIMIT,
+        limit_per_host=CONNECTION_LIMIT_PER_HOST,
+        ttl_dns_cache=DNS_CACHE_TTL,
+        keepalive_timeout=KEEPALIVE_TIMEOUT,
+    )
+    return aiohttp.ClientSession(connector=connector)
+
+
+async def get_session(provider: str, base_url: str) -> aiohttp.ClientSession:
+    """
+    Get the pooled session for (provider, base_url) on the running loop.
+
+    The returned session is shared; callers must NOT close it.
+    """
+    loop = asyncio.get_running_loop()
+    bucket = _LOOPS.get(loop)
+    if bucket is None:
+        bucket = _LoopSessions()
+        sentinel = _loop_sentinel(bucket)
+        await sentinel.__anext__()
+        bucket.sentinel = sentinel
+        _LOOPS[loop] = bucket
+
+    key = (provider, _normalize_base_url(base_url))
+    session = bucket.sessions.get(key)
+    if session is None or session.closed:
+        session = _create_session()
+        bucket.sessions[key] = session
+    return session
+
+
+async def close_all_sessions(app=None) -> None:
+    """
+    Close every pooled session owned by the running loop.
+
+    Accepts an optional `app` argument so it can be used directly as an
+    aiohttp `on_cleanup` / `on_shutdown` handler.
+    """
+    loop = asyncio.get_running_loop()
+    bucket = _LOOPS.get(loop)
+    if bucket is not None:
+        await bucket.close()
+
@@ -0,0 +1,67 @@
+"""
+In-flight request coalescing ("single-flight").
+
+When several concurrent callers issue the same request (e.g. XY sweep cells
+whose chat input only differs on the image-side axis), only the first one
+actually runs; the others await the same future and receive the same result.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable, TypeVar
+
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Share one in-flight call between concurrent callers with the same key."""
+
+    def __init__(self):
+        # Futures are bound to an event loop, so key on (loop, key)
+        self._inflight: dict[tuple[int, str], asyncio.Task] = {}
+        self._stats = {"calls": 0, "executed": 0, "deduplicated": 0}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run `fn()` once per key among concurrent callers and return its result.
+
+        The shared call runs as its own task, so cancelling one waiter does not
+        cancel the request for the others.
+        """
+        loop = asyncio.get_running_loop()
+        slot = (id(loop), key)
+        self._stats["calls"] += 1
+
+        task = self._inflight.get(slot)
+        if task is None:
+            self._stats["executed"] += 1
+            task = loop.create_task(fn())
+            self._inflight[slot] = task
+            task.add_done_callback(lambda t: self._finished(slot, t))
+        else:
+            self._stats["deduplicated"] += 1
+
+        return await asyncio.shield(task)
+
+    def _finished(self, slot: tuple[int, str], task: asyncio.Task) -> None:
+        if self._inflight.get(slot) is task:
+            del self._inflight[slot]
+        # Mark the exception retrieved even if every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict[str, Any]:
+        return {**self._stats, "inflight": len(self._inflight)}
+
+
+_SINGLE_FLIGHT: SingleFlight | None = None
+
+
+def get_single_flight() -> SingleFlight:
+    """Get the process-wide single-flight group for chat requests."""
+    global _SINGLE_FLIGHT
+    if _SINGLE_FLIGHT is None:
+        _SINGLE_FLIGHT = SingleFlight()
+    return _SINGLE_FLIGHT
@@ -0,0 +1,274 @@
+"""
+Vision input preprocessing: fit images to what the target model can use.
+
+Providers downscale oversized images on their side anyway, so uploading a 4K
+reference only costs encode time, upload bytes and latency. Images are
+resized here (never upscaled) to the provider / model's effective maximum:
+
+- Claude: long edge ~1568px, ~1.15 megapixels
+- OpenAI: fit 2048x2048, then short edge 768px (512px tiles); low detail = 512px
+- Gemini: fit 3072x3072 (768px tiles); low detail = one 768px tile
+
+For IMAGE batches (video frames) a subset of frames can be selected first:
+evenly spaced, the largest changes, or perceptual-hash deduplicated. The
+selection runs as batched torch ops on small thumbnails.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+
+import torch
+
+from .image_utils import ImageEncodeOptions, encode_image, resize_images
+
+
+DETAIL_OPTIONS = ["auto", "low", "high", "original"]
+
+# Gemini crops / scales larger images into 768x768 tiles (258 tokens each)
+GEMINI_TILE = 768
+
+
+@dataclass(frozen=True)
+class VisionLimits:
+    """Largest image a model actually looks at (0 = no limit)."""
+    max_long_edge: int = 0
+    max_short_edge: int = 0
+    max_pixels: int = 0
+
+
+PROVIDER_LIMITS = {
+    "claude": VisionLimits(max_long_edge=1568, max_pixels=1_150_000),
+    "openai": VisionLimits(max_long_edge=2048, max_short_edge=768),
+    # At most 4x4 tiles: 16 tiles (~4k tokens) per image
+    "gemini": VisionLimits(max_long_edge=4 * GEMINI_TILE),
+}
+
+LOW_DETAIL_LIMITS = {
+    "claude": VisionLimits(max_long_edge=768),
+    "openai": VisionLimits(max_long_edge=512),
+    "gemini": VisionLimits(max_long_edge=GEMINI_TILE),
+}
+
+# Models whose limits differ from their provider default (matched by prefix)
+MODEL_LIMITS = [
+    # Patch-based OpenAI models: at most 1536 patches of 32x32 px
+    ("gpt-4.1-mini", VisionLimits(max_long_edge=2048, max_pixels=1536 * 32 * 32)),
+    ("gpt-4.1-nano", VisionLimits(max_long_edge=2048, max_pixels=1536 * 32 * 32)),
+    ("o4-mini", VisionLimits(max_long_edge=2048, max_pixels=1536 * 32 * 32)),
+]
+
+
+def get_vision_limits(provider: str, model: str = "", detail: str = "auto", max_edge: int = 0) -> VisionLimits | None:
+    """
+    Resolve the effective input limits for a provider / model.
+
+    Args:
+        provider: Provider id ("openai", "claude", "gemini")
+        model: Model name (for per-model overrides)
+        detail: "auto" / "high" (full limits), "low" (single tile) or "original" (no resizing)
+        max_edge: If > 0, overrides everything with this long-edge cap
+
+    Returns:
+        VisionLimits, or None when images should be sent unchanged
+    """
+    if max_edge and max_edge > 0:
+        return VisionLimits(max_long_edge=int(max_edge))
+    if detail == "original":
+        return None
+    if detail == "low":
+        return LOW_DETAIL_LIMITS.get(provider)
+
+    name = (model or "").lower().split("/")[-1]
+    for prefix, limits in MODEL_LIMITS:
+        if name.startswith(prefix):
+            return limits
+    return PROVIDER_LIMITS.get(provider)
+
+
+def fit_size(height: int, width: int, limits: VisionLimits) -> tuple[int, int]:
+    """Largest size within `limits` with the same aspect ratio (never larger than the input)."""
+    scale = 1.0
+    long_edge, short_edge = max(height, width), min(height, width)
+    if limits.max_long_edge:
+        scale = min(scale, limits.max_long_edge / long_edge)
+    if limits.max_short_edge:
+        scale = min(scale, limits.max_short_edge / short_edge)
+    if limits.max_pixels:
+        scale = min(scale, math.sqrt(limits.max_pixels / (height * width)))
+    if scale >= 1.0:
+        return height, width
+    return max(1, int(height * scale)), max(1, int(width * scale))
+
+
+def fit_image(image: torch.Tensor, limits: VisionLimits | None) -> torch.Tensor:
+    """Downscale an image (or batch) to fit `limits`; returned unchanged if it already fits."""
+    if limits is None:
+        return image
+    batch = image.unsqueeze(0) if image.dim() == 3 else image
+    h, w = batch.shape[1], batch.shape[2]
+    new_h, new_w = fit_size(h, w, limits)
+    if (new_h, new_w) == (h, w):
+        return image
+    resized = resize_images(batch.float(), new_h, new_w)
+    return resized[0] if image.dim() == 3 else resized
+
+
+def prepare_vision_images(
+    images: list[torch.Tensor] | None,
+    provider: str,
+    model: str = "",
+    detail: str = "auto",
+    max_edge: int = 0,
+) -> list[torch.Tensor] | None:
+    """Fit every attached image to the provider / model's effective resolution."""
+    if not images:
+        return images
+    limits = get_vision_limits(provider, model, detail, max_edge)
+    return [fit_image(img, limits) for img in images]
+
+
+# --- Multi-frame selection for IMAGE batches (video frames, sequences) ---
+
+FRAME_MODES = ["first", "uniform", "difference", "dedupe"]
+
+# Frames whose 64-bit perceptual hashes differ in at most this many bits are duplicates
+DEDUPE_THRESHOLD = 10
+
+
+def _uniform_indices(count: int, k: int) -> list[int]:
+    """`k` evenly spaced indices in range(count), first and last included."""
+    if k >= count:
+        return list(range(count))
+    if k <= 1:
+        return [0]
+    return torch.linspace(0, count - 1, k).round().long().unique().tolist()
+
+
+def _gray_thumbnails(batch: torch.Tensor, size: int) -> torch.Tensor:
+    """(B, H, W, C) -> (B, size, size) luma thumbnails, computed on the batch's device."""
+    # Strided subsampling first: thumbnails don't need every source pixel
+    step = max(1, min(batch.shape[1], batch.shape[2]) // (size * 2))
+    x = batch[:, ::step, ::step, :].float()
+    if x.shape[-1] >= 3:
+        weights = torch.tensor([0.299, 0.587, 0.114], dtype=x.dtype, device=x.device)
+        gray = (x[..., :3] * weights).sum(-1)
+    else:
+        gray = x[..., 0]
+    return torch.nn.functional.interpolate(gray.unsqueeze(1), size=(size, size), mode="area")[:, 0]
+
+
+def _dct_matrix(n: int, device: torch.device) -> torch.Tensor:
+    k = torch.arange(n, dtype=torch.float32, device=device)
+    m = torch.cos(math.pi / n * (k[None, :] + 0.5) * k[:, None])
+    m[0] *= 1 / math.sqrt(2)
+    return m * math.sqrt(2 / n)
+
+
+def perceptual_hash(batch: torch.Tensor) -> torch.Tensor:
+    """
+    64-bit DCT perceptual hash of every frame in a (B, H, W, C) batch.
+
+    Returns:
+        Bool tensor (B, 64)
+    """
+    thumbs = _gray_thumbnails(batch, 32)
+    d = _dct_matrix(32, thumbs.device)
+    coeffs = (d @ thumbs @ d.T)[:, :8, :8].reshape(len(thumbs), 64)
+    # Compare to the median of the low frequencies, excluding the DC term
+    median = coeffs[:, 1:].median(dim=1, keepdim=True).values
+    return coeffs > median
+
+
+def select_frames(
+    batch: torch.Tensor,
+    mode: str = "uniform",
+    max_frames: int = 8,
+    dedupe_threshold: int = DEDUPE_THRESHOLD,
+) -> list[int]:
+    """
+    Pick which frames of an IMAGE batch to send to the model.
+
+    Modes:
+        first: only frame 0
+        uniform: `max_frames` evenly spaced frames
+        difference: frame 0 plus the frames that change most from their predecessor
+        dedupe: drop frames whose perceptual hash is close to an already kept frame,
+            then space the survivors evenly if there are still too many
+
+    Returns:
+        Sorted frame indices (at most `max_frames`)
+    """
+    count = batch.shape[0] if batch.dim() == 4 else 1
+    k = max(1, int(max_frames))
+    if mode == "first" or count == 1:
+        return [0]
+    if mode == "uniform":
+        return _uniform_indices(count, k)
+
+    if mode == "difference":
+        if count <= k:
+            return list(range(count))
+        thumbs = _gray_thumbnails(batch, 64)
+        scores = (thumbs[1:] - thumbs[:-1]).abs().mean(dim=(1, 2))
+        top = torch.topk(scores, k - 1).indices + 1 if k > 1 else scores.new_empty(0, dtype=torch.long)
+        return sorted({0, *top.tolist()})
+
+    if mode == "dedupe":
+        bits = perceptual_hash(batch).float()
+        # Pairwise Hamming distances in one matmul
+        dist = (bits @ (1 - bits).T + (1 - bits) @ bits.T).cpu()
+        kept = [0]
+        for i in range(1, count):
+            if dist[i, kept].min() > dedupe_threshold:
+                kept.append(i)
+        return [kept[i] for i in _uniform_indices(len(kept), k)]
+
+    raise ValueError(f"Unknown frame selection mode: {mode}")
+
+
+def limit_total_bytes(
+    frames: list[torch.Tensor],
+    options: ImageEncodeOptions | None,
+    max_bytes: int,
+) -> list[torch.Tensor]:
+    """
+    Keep an evenly spaced subset of `frames` whose encoded size fits `max_bytes`.
+
+    Encodings go through the shared cache, so the provider reuses them when
+    building the request. At least one frame is always kept.
+    """
+    if max_bytes <= 0 or len(frames) <= 1:
+        return frames
+    sizes = [len(encode_image(f, options).data) for f in frames]
+    for k in range(len(frames), 0, -1):
+        idx = _uniform_indices(len(frames), k)
+        if sum(sizes[i] for i in idx) <= max_bytes:
+            return [frames[i] for i in idx]
+    return frames[:1]
+
+
+def prepare_vision_frames(
+    batch: torch.Tensor,
+    provider: str,
+    model: str = "",
+    detail: str = "auto",
+    max_edge: int = 0,
+    mode: str = "first",
+    max_frames: int = 8,
+    options: ImageEncodeOptions | None = None,
+    max_bytes: int = 0,
+) -> list[torch.Tensor]:
+    """
+    Select frames from an IMAGE batch, fit them to the model and cap their total size.
+
+    Returns:
+        List of (1, H, W, C) tensors, one per frame to attach
+    """
+    batch = batch.unsqueeze(0) if batch.dim() == 3 else batch
+    indices = select_frames(batch, mode, max_frames)
+    selected = batch[indices]
+    fitted = fit_image(selected, get_vision_limits(provider, model, detail, max_edge))
+    frames = [fitted[i : i + 1] for i in range(fitted.shape[0])]
+    return limit_total_bytes(frames, options, max_bytes)
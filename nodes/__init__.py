@@ -3,9 +3,12 @@ SimpleChat nodes module.
 """
 from .config import SimpleChatConfig
 from .chat import SimpleChatText
+from .chat_batch import SimpleChatTextBatch
 from .chat_image import SimpleChatImage
+from .chat_image_batch import SimpleChatImageBatch
 from .chat_noass import SimpleChatNoASS
 from .gemini_gen import GeminiImageGen
+from .gemini_gen_save import GeminiImageGenSave
 from .gemini_edit import GeminiImageEdit
 from .mustache_var import SimpleChatMustacheVar
 from .mustache_render import SimpleChatMustacheRender
@@ -25,9 +28,12 @@ from .xy_cell_prefix import SimpleChatXYCellPrefix
 __all__ = [
     "SimpleChatConfig",
     "SimpleChatText",
+    "SimpleChatTextBatch",
     "SimpleChatImage",
+    "SimpleChatImageBatch",
     "SimpleChatNoASS",
     "GeminiImageGen",
+    "GeminiImageGenSave",
     "GeminiImageEdit",
     "SimpleChatMustacheVar",
     "SimpleChatMustacheRender",
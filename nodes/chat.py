@@ -1,8 +1,9 @@
 """
 Chat node - Basic text conversation.
 """
-from ..core import get_provider, ChatConfig
+from ..core import get_provider, cached_chat, ChatConfig
 from ..core.template import render_mustache
+from ..core.progress import StreamReporter
 
 
 class SimpleChatText:
@@ -20,7 +21,20 @@ class SimpleChatText:
                 "vars": ("SIMPLECHAT_VARS",),
                 "temperature": ("FLOAT", {"default": 1.0, "min": 0.0, "max": 2.0, "step": 0.1}),
                 "max_tokens": ("INT", {"default": 2048, "min": 1, "max": 128000}),
-            }
+                "stream": ("BOOLEAN", {
+                    "default": False,
+                    "tooltip": "Stream the response and show partial text on the node while it runs. "
+                               "Requires an endpoint / proxy that supports SSE streaming.",
+                }),
+                "use_cache": ("BOOLEAN", {
+                    "default": True,
+                    "tooltip": "Reuse a cached response for an identical request (same config, messages, "
+                               "sampling settings and images) instead of calling the API again.",
+                }),
+            },
+            "hidden": {
+                "unique_id": "UNIQUE_ID",
+            },
         }
 
     RETURN_TYPES = ("STRING",)
@@ -37,6 +51,9 @@ class SimpleChatText:
         vars=None,
         temperature: float = 1.0,
         max_tokens: int = 2048,
+        stream: bool = False,
+        use_cache: bool = True,
+        unique_id=None,
     ):
         # Template rendering ({{var}}) for prompt/system
         prompt = render_mustache(prompt, vars)
@@ -51,12 +68,19 @@ class SimpleChatText:
         # Get provider and send request
         provider = get_provider(config)
 
-        # Directly await the async provider method
-        response = await provider.chat(
+        # Directly await the async provider method (through the response cache;
+        # streaming pushes partial text to the UI)
+        reporter = StreamReporter(unique_id) if stream else None
+        response = await cached_chat(
+            provider,
             messages=messages,
             model=config.model,
             temperature=temperature,
             max_tokens=max_tokens,
+            use_cache=use_cache,
+            on_delta=reporter,
         )
+        if reporter is not None:
+            reporter.finish(response.text)
 
         return (response.text,)
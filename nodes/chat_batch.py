@@ -0,0 +1,157 @@
+"""
+Chat (Batch) node - run a list of prompts concurrently.
+
+ComfyUI list mapping calls `SimpleChatText.chat` once per item, one request
+at a time. This node takes the whole list (INPUT_IS_LIST) and sends the
+requests concurrently, bounded by `concurrency`, returning outputs in input
+order. A failing item yields an error string instead of aborting the batch.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, List
+
+from ..core import get_provider, cached_chat, ChatConfig, ProcessingInterrupted
+from ..core.template import render_mustache
+
+try:
+    from comfy.utils import ProgressBar
+except ImportError:
+    ProgressBar = None
+
+
+def _first(v: Any, default: Any = None) -> Any:
+    if isinstance(v, (list, tuple)):
+        return v[0] if len(v) > 0 else default
+    return v
+
+
+def _as_list(v: Any) -> list:
+    if v is None:
+        return []
+    if isinstance(v, (list, tuple)):
+        return list(v)
+    return [v]
+
+
+def _batch_size(**lists: list) -> int:
+    """
+    Batch length: single values broadcast, longer lists must agree.
+
+    Raises ValueError when two inputs with more than one item differ in length.
+    """
+    sizes = {name: len(items) for name, items in lists.items() if len(items) > 1}
+    if len(set(sizes.values())) > 1:
+        detail = ", ".join(f"{name}={size}" for name, size in sizes.items())
+        raise ValueError(f"Batch inputs have mismatched lengths ({detail}); use one item or the same count")
+    return max(sizes.values(), default=1)
+
+
+def _pick(items: list, idx: int, default: Any = None) -> Any:
+    """Index into a list, broadcasting single values across the batch."""
+    if not items:
+        return default
+    if len(items) == 1:
+        return items[0]
+    return items[idx]
+
+
+class SimpleChatTextBatch:
+    """Send a list of prompts (and/or vars) to the LLM concurrently."""
+
+    # Receive whole lists instead of being mapped once per item
+    INPUT_IS_LIST = True
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "config": ("SIMPLECHAT_CONFIG",),
+                "prompt": ("STRING", {"multiline": True, "default": ""}),
+            },
+            "optional": {
+                "system": ("STRING", {"multiline": True, "default": ""}),
+                "vars": ("SIMPLECHAT_VARS",),
+                "temperature": ("FLOAT", {"default": 1.0, "min": 0.0, "max": 2.0, "step": 0.1}),
+                "max_tokens": ("INT", {"default": 2048, "min": 1, "max": 128000}),
+                "concurrency": ("INT", {
+                    "default": 8, "min": 1, "max": 256,
+                    "tooltip": "Maximum number of requests in flight at once.",
+                }),
+                "use_cache": ("BOOLEAN", {
+                    "default": True,
+                    "tooltip": "Reuse cached responses and merge identical in-flight requests. "
+                               "Disable to get independent samples for repeated prompts.",
+                }),
+            },
+        }
+
+    RETURN_TYPES = ("STRING",)
+    RETURN_NAMES = ("text",)
+    OUTPUT_IS_LIST = (True,)
+    FUNCTION = "chat"
+    CATEGORY = "SimpleChat"
+    DESCRIPTION = (
+        "Send a list of prompts (or one prompt with a list of vars) concurrently; "
+        "returns texts in input order."
+    )
+
+    async def chat(
+        self,
+        config: Any,
+        prompt: Any,
+        system: Any = "",
+        vars: Any = None,
+        temperature: Any = 1.0,
+        max_tokens: Any = 2048,
+        concurrency: Any = 8,
+        use_cache: Any = True,
+    ):
+        config: ChatConfig = _first(config)
+        prompts: List[str] = [p or "" for p in _as_list(prompt)]
+        systems: List[str] = [s or "" for s in _as_list(system)]
+        vars_list: list = _as_list(vars)
+        temperature = float(_first(temperature, 1.0))
+        max_tokens = int(_first(max_tokens, 2048))
+        concurrency = max(1, int(_first(concurrency, 8)))
+        use_cache = bool(_first(use_cache, True))
+
+        total = _batch_size(prompt=prompts, system=systems, vars=vars_list)
+        semaphore = asyncio.Semaphore(concurrency)
+        pbar = ProgressBar(total) if ProgressBar is not None else None
+
+        async def _one(idx: int) -> str:
+            item_vars = _pick(vars_list, idx)
+            item_prompt = render_mustache(_pick(prompts, idx, ""), item_vars)
+            item_system = render_mustache(_pick(systems, idx, ""), item_vars)
+
+            messages = []
+            if item_system.strip():
+                messages.append({"role": "system", "content": item_system})
+            messages.append({"role": "user", "content": item_prompt})
+
+            try:
+                async with semaphore:
+                    # Pick per request so pooled endpoints / keys share the batch
+                    response = await cached_chat(
+                        get_provider(config),
+                        messages=messages,
+                        model=config.model,
+                        temperature=temperature,
+                        max_tokens=max_tokens,
+                        use_cache=use_cache,
+                    )
+                return response.text
+            except ProcessingInterrupted:
+                raise
+            except Exception as e:
+                # Keep the rest of the batch going; surface the error in place
+                print(f"[SimpleChat] Batch item {idx} failed: {e}")
+                return f"[error] {e}"
+            finally:
+                if pbar is not None:
+                    pbar.update(1)
+
+        results = await asyncio.gather(*[_one(i) for i in range(total)])
+        return (list(results),)
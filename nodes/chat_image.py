@@ -2,8 +2,10 @@
 Chat with Image node - Send image to LLM for analysis.
 """
 import torch
-from ..core import get_provider, ChatConfig
+from ..core import get_provider, cached_chat, run_in_image_pool, ChatConfig
+from ..core.vision import DETAIL_OPTIONS, FRAME_MODES, prepare_vision_frames
 from ..core.template import render_mustache
+from ..core.progress import StreamReporter
 
 
 class SimpleChatImage:
@@ -22,14 +24,53 @@ class SimpleChatImage:
                 "vars": ("SIMPLECHAT_VARS",),
                 "temperature": ("FLOAT", {"default": 1.0, "min": 0.0, "max": 2.0, "step": 0.1}),
                 "max_tokens": ("INT", {"default": 2048, "min": 1, "max": 128000}),
-            }
+                "stream": ("BOOLEAN", {
+                    "default": False,
+                    "tooltip": "Stream the response and show partial text on the node while it runs. "
+                               "Requires an endpoint / proxy that supports SSE streaming.",
+                }),
+                "use_cache": ("BOOLEAN", {
+                    "default": True,
+                    "tooltip": "Reuse a cached response for an identical request (same config, messages, "
+                               "sampling settings and images) instead of calling the API again.",
+                }),
+                "detail": (DETAIL_OPTIONS, {
+                    "default": "auto",
+                    "tooltip": "Downscale the image to what the model can use before upload "
+                               "(auto/high: provider maximum, low: single tile, original: send as is).",
+                }),
+                "max_edge": ("INT", {
+                    "default": 0, "min": 0, "max": 16384,
+                    "tooltip": "Override: cap the image's long edge in pixels (0 = decided by detail).",
+                }),
+                "frames": (FRAME_MODES, {
+                    "default": "first",
+                    "tooltip": "Which frames of an IMAGE batch to send: first only, evenly spaced (uniform), "
+                               "the biggest changes (difference), or near-duplicates removed (dedupe).",
+                }),
+                "max_frames": ("INT", {
+                    "default": 8, "min": 1, "max": 64,
+                    "tooltip": "Maximum number of frames sent from an IMAGE batch.",
+                }),
+                "max_total_mb": ("FLOAT", {
+                    "default": 20.0, "min": 0.0, "max": 500.0, "step": 0.5,
+                    "tooltip": "Cap on the total encoded size of all frames (0 = no cap). "
+                               "Frames are thinned evenly until they fit.",
+                }),
+            },
+            "hidden": {
+                "unique_id": "UNIQUE_ID",
+            },
         }
 
     RETURN_TYPES = ("STRING",)
     RETURN_NAMES = ("text",)
     FUNCTION = "chat"
     CATEGORY = "SimpleChat"
-    DESCRIPTION = "Send an image to LLM for visual analysis and get a text response."
+    DESCRIPTION = (
+        "Send an image (or selected frames of an image batch) to LLM for visual analysis "
+        "and get a text response."
+    )
 
     async def chat(
         self,
@@ -40,6 +81,14 @@ class SimpleChatImage:
         vars=None,
         temperature: float = 1.0,
         max_tokens: int = 2048,
+        stream: bool = False,
+        use_cache: bool = True,
+        detail: str = "auto",
+        max_edge: int = 0,
+        frames: str = "first",
+        max_frames: int = 8,
+        max_total_mb: float = 20.0,
+        unique_id=None,
     ):
         # Template rendering ({{var}}) for prompt/system
         prompt = render_mustache(prompt, vars)
@@ -54,13 +103,36 @@ class SimpleChatImage:
         # Get provider and send request
         provider = get_provider(config)
 
-        # Directly await the async provider method
-        response = await provider.chat(
+        # Select frames from a batch and fit them to the model's effective
+        # resolution (off the event loop)
+        images = await run_in_image_pool(
+            prepare_vision_frames,
+            image,
+            config.provider,
+            config.model,
+            detail,
+            max_edge,
+            frames,
+            max_frames,
+            provider.image_options,
+            int(max_total_mb * 1024 * 1024),
+        )
+
+        # Directly await the async provider method (through the response cache;
+        # streaming pushes partial text to the UI)
+        reporter = StreamReporter(unique_id) if stream else None
+        response = await cached_chat(
+            provider,
             messages=messages,
             model=config.model,
             temperature=temperature,
             max_tokens=max_tokens,
-            images=[image],
+            images=images,
+            image_detail=detail,
+            use_cache=use_cache,
+            on_delta=reporter,
         )
+        if reporter is not None:
+            reporter.finish(response.text)
 
         return (response.text,)
@@ -0,0 +1,143 @@
+"""
+Chat with Image (Batch) node - caption every image of an IMAGE batch concurrently.
+
+One request per image, sent concurrently with at most `concurrency` requests
+in flight. Images are resized and encoded in the image worker pool a little
+ahead of the requests, so encoding overlaps with network I/O. Outputs are
+returned in batch order; a failing image yields an error string instead of
+aborting the batch.
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+import torch
+
+from ..core import get_provider, cached_chat, run_in_image_pool, encode_image, ChatConfig, ProcessingInterrupted
+from ..core.template import render_mustache
+from ..core.vision import DETAIL_OPTIONS, prepare_vision_images
+
+try:
+    from comfy.utils import ProgressBar
+except ImportError:
+    ProgressBar = None
+
+
+class SimpleChatImageBatch:
+    """Send each image of a batch to the LLM with the same prompt, concurrently."""
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "config": ("SIMPLECHAT_CONFIG",),
+                "images": ("IMAGE",),
+                "prompt": ("STRING", {"multiline": True, "default": "Describe this image."}),
+            },
+            "optional": {
+                "system": ("STRING", {"multiline": True, "default": ""}),
+                "vars": ("SIMPLECHAT_VARS",),
+                "temperature": ("FLOAT", {"default": 1.0, "min": 0.0, "max": 2.0, "step": 0.1}),
+                "max_tokens": ("INT", {"default": 2048, "min": 1, "max": 128000}),
+                "concurrency": ("INT", {
+                    "default": 8, "min": 1, "max": 256,
+                    "tooltip": "Maximum number of requests in flight at once.",
+                }),
+                "use_cache": ("BOOLEAN", {
+                    "default": True,
+                    "tooltip": "Reuse cached responses for identical requests (same config, prompt and image).",
+                }),
+                "detail": (DETAIL_OPTIONS, {
+                    "default": "auto",
+                    "tooltip": "Downscale each image to what the model can use before upload "
+                               "(auto/high: provider maximum, low: single tile, original: send as is).",
+                }),
+                "max_edge": ("INT", {
+                    "default": 0, "min": 0, "max": 16384,
+                    "tooltip": "Override: cap each image's long edge in pixels (0 = decided by detail).",
+                }),
+            },
+        }
+
+    RETURN_TYPES = ("STRING",)
+    RETURN_NAMES = ("text",)
+    OUTPUT_IS_LIST = (True,)
+    FUNCTION = "chat"
+    CATEGORY = "SimpleChat"
+    DESCRIPTION = (
+        "Send every image of an IMAGE batch with the same prompt, concurrently; returns one text per image "
+        "in batch order. {{index}} (0-based) and {{count}} are available in the prompt."
+    )
+
+    async def chat(
+        self,
+        config: ChatConfig,
+        images: torch.Tensor,
+        prompt: str,
+        system: str = "",
+        vars=None,
+        temperature: float = 1.0,
+        max_tokens: int = 2048,
+        concurrency: int = 8,
+        use_cache: bool = True,
+        detail: str = "auto",
+        max_edge: int = 0,
+    ):
+        if images.dim() == 3:
+            images = images.unsqueeze(0)
+        total = images.shape[0]
+        concurrency = max(1, int(concurrency))
+
+        image_options = config.image_options()
+        requests = asyncio.Semaphore(concurrency)
+        # Prepare a bounded window of images ahead of the requests (caps memory)
+        prepare = asyncio.Semaphore(concurrency * 2)
+        pbar = ProgressBar(total) if ProgressBar is not None else None
+
+        def _prepare(idx: int) -> list[torch.Tensor]:
+            fitted = prepare_vision_images(
+                [images[idx : idx + 1]], config.provider, config.model, detail, max_edge
+            )
+            # Warm the encoded image cache; the provider reuses this encoding
+            encode_image(fitted[0], image_options)
+            return fitted
+
+        async def _one(idx: int) -> str:
+            item_vars = {**(vars or {}), "index": idx, "count": total}
+            item_prompt = render_mustache(prompt, item_vars)
+            item_system = render_mustache(system, item_vars)
+
+            messages = []
+            if item_system.strip():
+                messages.append({"role": "system", "content": item_system})
+            messages.append({"role": "user", "content": item_prompt})
+
+            try:
+                async with prepare:
+                    item_images = await run_in_image_pool(_prepare, idx)
+                    async with requests:
+                        # Pick per request so pooled endpoints / keys share the batch
+                        response = await cached_chat(
+                            get_provider(config),
+                            messages=messages,
+                            model=config.model,
+                            temperature=temperature,
+                            max_tokens=max_tokens,
+                            images=item_images,
+                            image_detail=detail,
+                            use_cache=use_cache,
+                        )
+                return response.text
+            except ProcessingInterrupted:
+                raise
+            except Exception as e:
+                # Keep the rest of the batch going; surface the error in place
+                print(f"[SimpleChat] Image batch item {idx} failed: {e}")
+                return f"[error] {e}"
+            finally:
+                if pbar is not None:
+                    pbar.update(1)
+
+        results = await asyncio.gather(*[_one(i) for i in range(total)])
+        return (list(results),)
@@ -4,14 +4,18 @@ Chat NoASS node - Roleplay-optimized conversation with NoASS format.
 import torch
 from ..core import (
     get_provider,
+    cached_chat,
     ChatConfig,
     format_noass_prompt,
     build_noass_messages,
     extract_noass_response,
     build_full_history,
     get_stop_sequences,
+    run_in_image_pool,
 )
+from ..core.vision import DETAIL_OPTIONS, prepare_vision_images
 from ..core.template import render_mustache
+from ..core.progress import StreamReporter
 
 
 class SimpleChatNoASS:
@@ -46,14 +50,39 @@ class SimpleChatNoASS:
                 "char_name": ("STRING", {"default": "Assistant"}),
                 "temperature": ("FLOAT", {"default": 1.0, "min": 0.0, "max": 2.0, "step": 0.1}),
                 "max_tokens": ("INT", {"default": 2048, "min": 1, "max": 128000}),
-            }
+                "stream": ("BOOLEAN", {
+                    "default": False,
+                    "tooltip": "Stream the response and show partial text on the node while it runs. "
+                               "Requires an endpoint / proxy that supports SSE streaming.",
+                }),
+                "use_cache": ("BOOLEAN", {
+                    "default": True,
+                    "tooltip": "Reuse a cached response for an identical request (same config, messages, "
+                               "sampling settings and images) instead of calling the API again.",
+                }),
+                "detail": (DETAIL_OPTIONS, {
+                    "default": "auto",
+                    "tooltip": "Downscale the image to what the model can use before upload "
+                               "(auto/high: provider maximum, low: single tile, original: send as is).",
+                }),
+                "max_edge": ("INT", {
+                    "default": 0, "min": 0, "max": 16384,
+                    "tooltip": "Override: cap the image's long edge in pixels (0 = decided by detail).",
+                }),
+            },
+            "hidden": {
+                "unique_id": "UNIQUE_ID",
+            },
         }
 
     RETURN_TYPES = ("STRING", "STRING")
     RETURN_NAMES = ("text", "history")
     FUNCTION = "chat"
     CATEGORY = "SimpleChat"
-    DESCRIPTION = "NoASS (Experimental) - Hardcore Roleplay with Assistant Prefill. Uses single-turn context with giant assistant prefill to force formatting."
+    DESCRIPTION = (
+        "NoASS (Experimental) - Hardcore Roleplay with Assistant Prefill. "
+        "Uses single-turn context with giant assistant prefill to force formatting."
+    )
 
     async def chat(
         self,
@@ -68,6 +97,11 @@ class SimpleChatNoASS:
         char_name: str = "Assistant",
         temperature: float = 1.0,
         max_tokens: int = 2048,
+        stream: bool = False,
+        use_cache: bool = True,
+        detail: str = "auto",
+        max_edge: int = 0,
+        unique_id=None,
     ):
         # Template rendering ({{var}}) for scenario/user/prefill
         scenario_instructions = render_mustache(scenario_instructions, vars)
@@ -99,21 +133,33 @@ class SimpleChatNoASS:
         # Get provider
         provider = get_provider(config)
 
-        # Prepare images
-        images = [image] if image is not None else None
+        # Prepare images (fitted to the model's effective resolution)
+        images = None
+        if image is not None:
+            images = await run_in_image_pool(
+                prepare_vision_images, [image], config.provider, config.model, detail, max_edge
+            )
 
         # Get stop sequences
         stop_sequences = get_stop_sequences(user_name)
 
-        # Directly await the async provider method
-        response = await provider.chat(
+        # Directly await the async provider method (through the response cache;
+        # streaming pushes partial text to the UI)
+        reporter = StreamReporter(unique_id) if stream else None
+        response = await cached_chat(
+            provider,
             messages=messages,
             model=config.model,
             temperature=temperature,
             max_tokens=max_tokens,
             images=images,
             stop=stop_sequences,  # Some providers support this
+            image_detail=detail,
+            use_cache=use_cache,
+            on_delta=reporter,
         )
+        if reporter is not None:
+            reporter.finish(response.text)
 
         # Extract response and build history
         response_text = extract_noass_response(
@@ -2,6 +2,8 @@
 API Config node - Configure API connection with dynamic model selection.
 """
 from ..core.providers import ChatConfig
+from ..core.response import RAW_RESPONSE_MODES
+from ..core.pool import BALANCE_STRATEGIES, split_pool
 
 
 class SimpleChatConfig:
@@ -35,6 +37,109 @@ class SimpleChatConfig:
                     "placeholder": "Leave empty for default URL",
                     "tooltip": "Custom API base URL (for proxies or self-hosted deployments)",
                 }),
+                "max_retries": ("INT", {
+                    "default": 3, "min": 0, "max": 10,
+                    "tooltip": "Retries for transient errors (429, 5xx, connection errors). "
+                               "Uses exponential backoff and honors Retry-After / x-ratelimit-reset headers.",
+                }),
+                "retry_max_elapsed": ("FLOAT", {
+                    "default": 120.0, "min": 0.0, "max": 3600.0, "step": 1.0,
+                    "tooltip": "Total time budget (seconds) for retries of one request.",
+                }),
+                "rpm": ("INT", {
+                    "default": 0, "min": 0, "max": 1000000,
+                    "tooltip": "Requests per minute for this provider + base_url + api_key, shared by all "
+                               "workflows (0 = unlimited). Excess requests queue instead of hitting 429.",
+                }),
+                "tpm": ("INT", {
+                    "default": 0, "min": 0, "max": 100000000,
+                    "tooltip": "Estimated tokens per minute budget (0 = unlimited).",
+                }),
+                "learn_rate_limits": ("BOOLEAN", {
+                    "default": False,
+                    "tooltip": "Learn RPM/TPM from x-ratelimit-limit-* response headers when rpm/tpm are 0.",
+                }),
+                "image_format": (["png", "jpeg", "webp"], {
+                    "default": "png",
+                    "tooltip": "Upload format for attached images. JPEG/WebP are much smaller and faster "
+                               "to encode; PNG is lossless.",
+                }),
+                "image_quality": ("INT", {
+                    "default": 90, "min": 1, "max": 100,
+                    "tooltip": "JPEG/WebP quality.",
+                }),
+                "png_compress_level": ("INT", {
+                    "default": 6, "min": 0, "max": 9,
+                    "tooltip": "PNG compression level (0-9). Lower encodes faster but uploads more bytes.",
+                }),
+                "raw_response": (RAW_RESPONSE_MODES, {
+                    "default": "trim",
+                    "tooltip": "How responses keep the provider's raw JSON: trim (drop inline image data), "
+                               "drop, spill (temp file, read back on access) or keep (full, can be large).",
+                }),
+                "connect_timeout": ("FLOAT", {
+                    "default": 30.0, "min": 0.0, "max": 600.0, "step": 1.0,
+                    "tooltip": "Seconds to establish the connection (0 = no limit).",
+                }),
+                "first_byte_timeout": ("FLOAT", {
+                    "default": 600.0, "min": 0.0, "max": 7200.0, "step": 1.0,
+                    "tooltip": "Seconds from sending a request until the response starts (0 = no limit). "
+                               "Non-streaming requests only respond once generation is done.",
+                }),
+                "idle_timeout": ("FLOAT", {
+                    "default": 120.0, "min": 0.0, "max": 3600.0, "step": 1.0,
+                    "tooltip": "Longest silence allowed between response chunks (0 = no limit).",
+                }),
+                "total_timeout": ("FLOAT", {
+                    "default": 1200.0, "min": 0.0, "max": 7200.0, "step": 1.0,
+                    "tooltip": "Limit for one whole request attempt (0 = no limit). Timed-out attempts are retried.",
+                }),
+                "circuit_breaker": ("BOOLEAN", {
+                    "default": True,
+                    "tooltip": "Fail fast while this endpoint looks down: once too many recent requests fail "
+                               "(connection errors, timeouts, 5xx), further requests error immediately until "
+                               "a probe request succeeds. Status: GET /simplechat/breakers.",
+                }),
+                "breaker_error_rate": ("FLOAT", {
+                    "default": 0.5, "min": 0.05, "max": 1.0, "step": 0.05,
+                    "tooltip": "Error rate over the last minute (at least 5 requests) that opens the breaker.",
+                }),
+                "breaker_cooldown": ("FLOAT", {
+                    "default": 30.0, "min": 1.0, "max": 3600.0, "step": 1.0,
+                    "tooltip": "Seconds to fail fast before letting one probe request through.",
+                }),
+                "extra_base_urls": ("STRING", {
+                    "default": "",
+                    "multiline": True,
+                    "placeholder": "More endpoints, one per line",
+                    "tooltip": "Additional base URLs (gateways / replicas serving the same models) pooled with "
+                               "base_url. Each request picks one endpoint + key.",
+                }),
+                "extra_api_keys": ("STRING", {
+                    "default": "",
+                    "multiline": True,
+                    "placeholder": "More API keys, one per line",
+                    "tooltip": "Additional API keys pooled with api_key (used with every endpoint). Rate limits "
+                               "apply per key, so N keys give N times the rpm / tpm budget.",
+                }),
+                "load_balance": (BALANCE_STRATEGIES, {
+                    "default": "least_outstanding",
+                    "tooltip": "How to pick a pool member: fewest requests in flight, or lowest recent "
+                               "latency (EWMA). Endpoints with an open circuit breaker are skipped.",
+                }),
+                "hedge": ("BOOLEAN", {
+                    "default": False,
+                    "tooltip": "Hedged requests: when a response is slower than the threshold, send a duplicate "
+                               "(to another pool member if any); the first response wins, the other is cancelled.",
+                }),
+                "hedge_delay": ("FLOAT", {
+                    "default": 0.0, "min": 0.0, "max": 600.0, "step": 0.1,
+                    "tooltip": "Seconds to wait before hedging (0 = the observed p95 latency, after 20 requests).",
+                }),
+                "hedge_budget_percent": ("FLOAT", {
+                    "default": 5.0, "min": 0.0, "max": 100.0, "step": 1.0,
+                    "tooltip": "Most extra requests hedging may add, as a percentage of requests.",
+                }),
             }
         }
 
@@ -57,6 +162,28 @@ class SimpleChatConfig:
         api_key: str,
         model: str,
         base_url: str = "",
+        max_retries: int = 3,
+        retry_max_elapsed: float = 120.0,
+        rpm: int = 0,
+        tpm: int = 0,
+        learn_rate_limits: bool = False,
+        image_format: str = "png",
+        image_quality: int = 90,
+        png_compress_level: int = 6,
+        raw_response: str = "trim",
+        connect_timeout: float = 30.0,
+        first_byte_timeout: float = 600.0,
+        idle_timeout: float = 120.0,
+        total_timeout: float = 1200.0,
+        circuit_breaker: bool = True,
+        breaker_error_rate: float = 0.5,
+        breaker_cooldown: float = 30.0,
+        extra_base_urls: str = "",
+        extra_api_keys: str = "",
+        load_balance: str = "least_outstanding",
+        hedge: bool = False,
+        hedge_delay: float = 0.0,
+        hedge_budget_percent: float = 5.0,
     ):
         # Default URLs map
         DEFAULT_URLS = {
@@ -74,6 +201,28 @@ class SimpleChatConfig:
             api_key=api_key,
             base_url=base_url,
             model=model,
+            max_retries=max_retries,
+            retry_max_elapsed=retry_max_elapsed,
+            rpm=rpm,
+            tpm=tpm,
+            learn_rate_limits=learn_rate_limits,
+            image_format=image_format,
+            image_quality=image_quality,
+            png_compress_level=png_compress_level,
+            raw_response=raw_response,
+            connect_timeout=connect_timeout,
+            first_byte_timeout=first_byte_timeout,
+            idle_timeout=idle_timeout,
+            total_timeout=total_timeout,
+            circuit_breaker=circuit_breaker,
+            breaker_error_rate=breaker_error_rate,
+            breaker_cooldown=breaker_cooldown,
+            base_urls=split_pool(extra_base_urls),
+            api_keys=split_pool(extra_api_keys),
+            load_balance=load_balance,
+            hedge=hedge,
+            hedge_delay=hedge_delay,
+            hedge_budget_percent=hedge_budget_percent,
         )
 
         return (config,)
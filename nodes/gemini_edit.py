@@ -2,7 +2,8 @@
 Gemini Image Edit node - Edit images using Gemini.
 """
 import torch
-from ..core import get_provider, ChatConfig
+from ..core import get_provider, run_in_image_pool, ChatConfig
+from ..core.vision import DETAIL_OPTIONS, prepare_vision_images
 from ..core.template import render_mustache
 
 
@@ -20,6 +21,15 @@ class GeminiImageEdit:
             "optional": {
                 "vars": ("SIMPLECHAT_VARS",),
                 "size": (["1K", "2K", "4K"], {"default": "1K"}),
+                "detail": (DETAIL_OPTIONS, {
+                    "default": "auto",
+                    "tooltip": "Downscale the reference image to what the model can use before upload "
+                               "(auto/high: provider maximum, low: single tile, original: send as is).",
+                }),
+                "max_edge": ("INT", {
+                    "default": 0, "min": 0, "max": 16384,
+                    "tooltip": "Override: cap the image's long edge in pixels (0 = decided by detail).",
+                }),
             }
         }
 
@@ -36,6 +46,8 @@ class GeminiImageEdit:
         prompt: str,
         vars=None,
         size: str = "1K",
+        detail: str = "auto",
+        max_edge: int = 0,
     ):
         # Template rendering ({{var}}) for prompt
         prompt = render_mustache(prompt, vars)
@@ -47,11 +59,16 @@ class GeminiImageEdit:
         # Get provider
         provider = get_provider(config)
 
+        # Fit the reference to the model's effective input resolution
+        reference = (await run_in_image_pool(
+            prepare_vision_images, [image], config.provider, config.model, detail, max_edge
+        ))[0]
+
         # Directly await the async provider method
         response = await provider.generate_image(
             prompt=prompt,
             model=config.model,
-            reference_image=image,
+            reference_image=reference,
             aspect_ratio=None,  # Preserve original aspect ratio for edits
             size=size,
         )
@@ -1,11 +1,63 @@
 """
 Gemini Image Gen node - Text-to-image generation with Gemini.
 """
+import asyncio
 import torch
-from ..core import get_provider, ChatConfig
+from ..core import (
+    get_provider, stack_images, run_in_image_pool, APIError, BaseProvider, ChatConfig, ChatResponse,
+    ProcessingInterrupted,
+)
 from ..core.template import render_mustache
 
 
+def _rejects_candidate_count(error: APIError) -> bool:
+    """Whether a 400 is about the candidateCount field (e.g. "candidateCount"/"candidate_count")."""
+    body = (error.body or "").lower().replace("_", "")
+    return "candidatecount" in body
+
+
+async def generate_responses(
+    provider: BaseProvider,
+    config: ChatConfig,
+    request: dict,
+    count: int = 1,
+    use_candidate_count: bool = False,
+) -> list[ChatResponse]:
+    """
+    Run `count` generations: one candidateCount request if asked and supported,
+    otherwise `count` concurrent requests. Failed requests are logged and
+    skipped; raises only if every request failed.
+    """
+    if count > 1 and use_candidate_count:
+        try:
+            return [await provider.generate_image(candidate_count=count, **request)]
+        except APIError as e:
+            # Only a rejected candidateCount falls back; other 400s would fail N times over
+            if e.status != 400 or not _rejects_candidate_count(e):
+                raise
+            print(f"[SimpleChat] candidateCount not supported by {config.model}; using concurrent requests")
+
+    # Directly await the async provider method (N concurrent generations);
+    # with an endpoint / key pool each generation picks its own member
+    providers = [provider] + [
+        get_provider(config) if provider.pool_member is not None else provider for _ in range(count - 1)
+    ]
+    results = await asyncio.gather(
+        *[p.generate_image(**request) for p in providers],
+        return_exceptions=True,
+    )
+    errors = [r for r in results if isinstance(r, BaseException)]
+    ok = [r for r in results if not isinstance(r, BaseException)]
+    for err in errors:
+        if isinstance(err, ProcessingInterrupted):
+            raise err
+    if not ok and errors:
+        raise errors[0]
+    for err in errors:
+        print(f"[SimpleChat] Gemini generation failed: {err}")
+    return ok
+
+
 class GeminiImageGen:
     """Generate images from text using Gemini (Nano Banana / Nano Banana Pro)."""
 
@@ -20,6 +72,16 @@ class GeminiImageGen:
                 "vars": ("SIMPLECHAT_VARS",),
                 "aspect_ratio": (["1:1", "16:9", "9:16", "4:3", "3:4", "5:4", "4:5"], {"default": "1:1"}),
                 "size": (["1K", "2K", "4K"], {"default": "1K"}),
+                "count": ("INT", {
+                    "default": 1, "min": 1, "max": 16,
+                    "tooltip": "Number of images to generate. Requests run concurrently; "
+                               "results are returned as one IMAGE batch.",
+                }),
+                "use_candidate_count": ("BOOLEAN", {
+                    "default": False,
+                    "tooltip": "Ask for all images in one request via candidateCount (only some models "
+                               "support it; falls back to concurrent requests if rejected).",
+                }),
             }
         }
 
@@ -27,7 +89,10 @@ class GeminiImageGen:
     RETURN_NAMES = ("IMAGE", "text")
     FUNCTION = "generate"
     CATEGORY = "SimpleChat/Gemini"
-    DESCRIPTION = "Generate image from text using Gemini image models (gemini-2.5-flash-image or gemini-3-pro-image-preview)."
+    DESCRIPTION = (
+        "Generate image from text using Gemini image models "
+        "(gemini-2.5-flash-image or gemini-3-pro-image-preview)."
+    )
 
     async def generate(
         self,
@@ -36,6 +101,8 @@ class GeminiImageGen:
         vars=None,
         aspect_ratio: str = "1:1",
         size: str = "1K",
+        count: int = 1,
+        use_candidate_count: bool = False,
     ):
         # Template rendering ({{var}}) for prompt
         prompt = render_mustache(prompt, vars)
@@ -47,8 +114,7 @@ class GeminiImageGen:
         # Get provider
         provider = get_provider(config)
 
-        # Directly await the async provider method
-        response = await provider.generate_image(
+        request = dict(
             prompt=prompt,
             model=config.model,
             reference_image=None,
@@ -56,10 +122,15 @@ class GeminiImageGen:
             size=size,
         )
 
+        responses = await generate_responses(provider, config, request, count, use_candidate_count)
+        images = [r.image for r in responses if r.image is not None]
+        texts = [r.text for r in responses if r.text]
+
         # Ensure we have an image
-        if response.image is None:
+        if not images:
             # Return empty image if generation failed
             empty = torch.zeros((1, 512, 512, 3))
-            return (empty, response.text or "No image generated")
+            return (empty, "\n\n".join(texts) or "No image generated")
 
-        return (response.image, response.text)
+        image = await run_in_image_pool(stack_images, images)
+        return (image, "\n\n".join(texts))
@@ -0,0 +1,172 @@
+"""
+Gemini Image Gen (Save) node - generate with Gemini and save the returned files directly.
+
+The image bytes returned by the API are written to the ComfyUI output
+directory as is (workflow / prompt metadata embedded at the container level),
+skipping the decode -> float32 IMAGE -> re-encode round trip of
+Gemini Image Gen + Save Image. Only an optional small preview is decoded.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import re
+from io import BytesIO
+
+import torch
+from PIL import Image
+
+from ..core import get_provider, stack_images, run_in_image_pool, ChatConfig
+from ..core.image_save import extension_for, preview_tensor, write_image_file
+from ..core.template import render_mustache
+from .gemini_gen import generate_responses
+
+try:
+    import folder_paths
+except ImportError:
+    folder_paths = None
+
+try:
+    from comfy.cli_args import args as comfy_args
+except ImportError:
+    comfy_args = None
+
+
+def _save_target(filename_prefix: str, width: int, height: int) -> tuple[str, str, int, str]:
+    """(folder, filename, first counter, subfolder) for `filename_prefix`, like ComfyUI's SaveImage."""
+    if folder_paths is not None:
+        folder, filename, counter, subfolder, _ = folder_paths.get_save_image_path(
+            filename_prefix, folder_paths.get_output_directory(), width, height
+        )
+        return folder, filename, counter, subfolder
+
+    # Outside ComfyUI: ./output, same "<name>_<counter:05>_.<ext>" numbering
+    subfolder, filename = os.path.split(os.path.normpath(filename_prefix))
+    folder = os.path.join(os.getcwd(), "output", subfolder)
+    os.makedirs(folder, exist_ok=True)
+    pattern = re.compile(rf"^{re.escape(filename)}_(\d+)_")
+    counters = [int(m.group(1)) for f in os.listdir(folder) if (m := pattern.match(f))]
+    return folder, filename, max(counters, default=0) + 1, subfolder
+
+
+class GeminiImageGenSave:
+    """Generate images with Gemini and save the original files without decoding them."""
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "config": ("SIMPLECHAT_CONFIG",),
+                "prompt": ("STRING", {"multiline": True, "default": ""}),
+                "filename_prefix": ("STRING", {"default": "SimpleChat/gemini"}),
+            },
+            "optional": {
+                "vars": ("SIMPLECHAT_VARS",),
+                "aspect_ratio": (["1:1", "16:9", "9:16", "4:3", "3:4", "5:4", "4:5"], {"default": "1:1"}),
+                "size": (["1K", "2K", "4K"], {"default": "1K"}),
+                "count": ("INT", {
+                    "default": 1, "min": 1, "max": 16,
+                    "tooltip": "Number of images to generate. Requests run concurrently.",
+                }),
+                "use_candidate_count": ("BOOLEAN", {
+                    "default": False,
+                    "tooltip": "Ask for all images in one request via candidateCount (only some models "
+                               "support it; falls back to concurrent requests if rejected).",
+                }),
+                "preview_size": ("INT", {
+                    "default": 256, "min": 0, "max": 2048,
+                    "tooltip": "Long edge of the preview IMAGE output (0 = no preview, output is a 64x64 "
+                               "placeholder). Saved files are always full resolution.",
+                }),
+            },
+            "hidden": {
+                "prompt_info": "PROMPT",
+                "extra_pnginfo": "EXTRA_PNGINFO",
+            },
+        }
+
+    RETURN_TYPES = ("IMAGE", "STRING", "STRING")
+    RETURN_NAMES = ("preview", "text", "paths")
+    FUNCTION = "generate"
+    OUTPUT_NODE = True
+    CATEGORY = "SimpleChat/Gemini"
+    DESCRIPTION = (
+        "Generate images with Gemini and write the returned files straight to the output directory "
+        "(workflow metadata embedded, no decode / re-encode). Outputs a small preview and the saved paths."
+    )
+
+    async def generate(
+        self,
+        config: ChatConfig,
+        prompt: str,
+        filename_prefix: str = "SimpleChat/gemini",
+        vars=None,
+        aspect_ratio: str = "1:1",
+        size: str = "1K",
+        count: int = 1,
+        use_candidate_count: bool = False,
+        preview_size: int = 256,
+        prompt_info=None,
+        extra_pnginfo=None,
+    ):
+        prompt = render_mustache(prompt, vars)
+
+        if config.provider != "gemini":
+            raise ValueError("Gemini Image Gen (Save) requires Gemini provider. Please use a Gemini config.")
+
+        provider = get_provider(config)
+        request = dict(
+            prompt=prompt,
+            model=config.model,
+            reference_image=None,
+            aspect_ratio=aspect_ratio,
+            size=size,
+            decode_images=False,
+        )
+        responses = await generate_responses(provider, config, request, count, use_candidate_count)
+        files = [img for r in responses for img in (r.encoded_images or [])]
+        text = "\n\n".join(r.text for r in responses if r.text)
+        if not files:
+            raise RuntimeError("Gemini did not return an image. Try a different prompt or model.")
+
+        metadata = {}
+        if comfy_args is None or not getattr(comfy_args, "disable_metadata", False):
+            if prompt_info is not None:
+                metadata["prompt"] = prompt_info
+            for key, value in (extra_pnginfo or {}).items():
+                metadata[key] = value
+            metadata["simplechat"] = {
+                "model": config.model,
+                "prompt": prompt,
+                "aspect_ratio": aspect_ratio,
+                "size": size,
+                "text": text,
+            }
+
+        def _save() -> tuple[list[str], list[dict]]:
+            # Dimensions come from the header only; the pixels are never decoded
+            width, height = Image.open(BytesIO(files[0].data)).size
+            folder, filename, counter, subfolder = _save_target(filename_prefix, width, height)
+            paths, ui_images = [], []
+            for i, img in enumerate(files):
+                name = f"{filename}_{counter + i:05}_.{extension_for(img.mime_type)}"
+                paths.append(write_image_file(os.path.join(folder, name), img.data, img.mime_type, metadata))
+                ui_images.append({"filename": name, "subfolder": subfolder, "type": "output"})
+            return paths, ui_images
+
+        paths, ui_images = await run_in_image_pool(_save)
+        print(f"[SimpleChat] Saved {len(paths)} image(s) to {os.path.dirname(paths[0])}")
+
+        if preview_size > 0:
+            previews = await asyncio.gather(
+                *[run_in_image_pool(preview_tensor, img.data, preview_size) for img in files]
+            )
+            preview = await run_in_image_pool(stack_images, previews)
+        else:
+            preview = torch.zeros((1, 64, 64, 3))
+
+        return {
+            "ui": {"images": ui_images},
+            "result": (preview, text, "\n".join(paths)),
+        }
@@ -14,6 +14,8 @@ import numpy as np
 import torch
 from PIL import Image, ImageDraw, ImageFont
 
+from ..core.image_utils import pil_to_tensor, tensor_to_uint8, uint8_to_pil
+
 
 def _first(v: Any, default: Any = None) -> Any:
     if isinstance(v, (list, tuple)):
@@ -73,16 +75,13 @@ def _split_labels(text: str) -> List[str]:
     return out
 
 
-def _to_pil(img: torch.Tensor) -> Image.Image:
-    # img: (H,W,C) float 0..1
-    arr = (img.detach().cpu().numpy() * 255.0).clip(0, 255).astype(np.uint8)
-    return Image.fromarray(arr, mode="RGB")
+def _to_pil(img: np.ndarray) -> Image.Image:
+    # img: (H,W,C) uint8, one cell of the batch quantized by tensor_to_uint8
+    return uint8_to_pil(img)
 
 
 def _to_tensor(img: Image.Image) -> torch.Tensor:
-    arr = np.array(img).astype(np.float32) / 255.0
-    t = torch.from_numpy(arr)[None, ...]
-    return t
+    return pil_to_tensor(img)
 
 
 class SimpleChatXYPlot:
@@ -235,6 +234,9 @@ class SimpleChatXYPlot:
         mask_color = (64, 64, 64) if bg_color == "black" else (220, 220, 220)
         mask = Image.new("RGB", (w, h), color=mask_color)
 
+        # Quantize the whole batch once (on its own device) instead of per cell
+        cells = tensor_to_uint8(images)
+
         if triangle_mode == "upper_triangle":
             idx = 0
             for r in range(rows):
@@ -245,7 +247,7 @@ class SimpleChatXYPlot:
                         canvas.paste(mask, (x, y))
                         continue
                     if idx < b:
-                        canvas.paste(_to_pil(images[idx]), (x, y))
+                        canvas.paste(_to_pil(cells[idx]), (x, y))
                         idx += 1
                     else:
                         canvas.paste(mask, (x, y))
@@ -256,7 +258,7 @@ class SimpleChatXYPlot:
                     x = left_margin + col * (w + padding)
                     y = y_cursor + r * (h + padding)
                     if col == r and idx < b:
-                        canvas.paste(_to_pil(images[idx]), (x, y))
+                        canvas.paste(_to_pil(cells[idx]), (x, y))
                         idx += 1
                     else:
                         canvas.paste(mask, (x, y))
@@ -268,7 +270,7 @@ class SimpleChatXYPlot:
                 col = idx % columns
                 x = left_margin + col * (w + padding)
                 y = y_cursor + r * (h + padding)
-                canvas.paste(_to_pil(images[idx]), (x, y))
+                canvas.paste(_to_pil(cells[idx]), (x, y))
             # Fill remaining cells (if any) for a tidy grid.
             if b < max_cells:
                 for idx in range(b, max_cells):
@@ -0,0 +1,40 @@
+import { app } from "../../scripts/app.js";
+import { api } from "../../scripts/api.js";
+import { ComfyWidgets } from "../../scripts/widgets.js";
+
+const EXT_NAME = "ComfyUI.SimpleChat.StreamPreview";
+const EVENT_NAME = "simplechat.stream";
+const WIDGET_NAME = "stream_preview";
+
+function getStreamWidget(node) {
+  let widget = node.widgets?.find((w) => w.name === WIDGET_NAME);
+  if (widget) return widget;
+
+  widget = ComfyWidgets["STRING"](node, WIDGET_NAME, ["STRING", { multiline: true }], app).widget;
+  // Display-only: never saved into the workflow's widgets_values
+  widget.serialize = false;
+  if (widget.inputEl) {
+    widget.inputEl.readOnly = true;
+    widget.inputEl.style.opacity = 0.75;
+    widget.inputEl.placeholder = "Streaming response...";
+  }
+  return widget;
+}
+
+app.registerExtension({
+  name: EXT_NAME,
+  async setup() {
+    api.addEventListener(EVENT_NAME, (event) => {
+      const detail = event.detail || {};
+      const node = app.graph?.getNodeById(Number(detail.node));
+      if (!node) return;
+
+      const widget = getStreamWidget(node);
+      widget.value = detail.text || "";
+      if (widget.inputEl) {
+        widget.inputEl.scrollTop = widget.inputEl.scrollHeight;
+      }
+      node.setDirtyCanvas(true, false);
+    });
+  },
+});